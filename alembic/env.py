@@ -19,7 +19,7 @@ if config.config_file_name is not None:
 # from myapp import mymodel
 # target_metadata = mymodel.Base.metadata
 from app.core.database import Base
-from app.models import User, HabitCycle, AuthProvider, Habit, HabitEntry
+from app.models import User, HabitCycle, AuthProvider, Habit, HabitEntry, DailyCycleRollup, CycleSnapshot, HabitSnapshot, HabitEntryArchive
 
 target_metadata = Base.metadata
 
@@ -0,0 +1,33 @@
+"""add streak counters to habits
+
+Revision ID: 189546fb01f4
+Revises: bb68846c25a3
+Create Date: 2026-10-18 09:12:03.417215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '189546fb01f4'
+down_revision: Union[str, Sequence[str], None] = 'bb68846c25a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('habits', sa.Column('current_streak', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('habits', sa.Column('longest_streak', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('habits', sa.Column('last_completed_date', sa.Date(), nullable=True))
+    # Existing rows start at zero; run scripts/recompute_streaks.py to backfill
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('habits', 'last_completed_date')
+    op.drop_column('habits', 'longest_streak')
+    op.drop_column('habits', 'current_streak')
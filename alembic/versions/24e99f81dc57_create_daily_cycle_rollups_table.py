@@ -0,0 +1,40 @@
+"""create daily cycle rollups table
+
+Revision ID: 24e99f81dc57
+Revises: 53bfac1901de
+Create Date: 2026-10-18 12:41:50.662904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '24e99f81dc57'
+down_revision: Union[str, Sequence[str], None] = '53bfac1901de'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('daily_cycle_rollups',
+    sa.Column('cycle_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('habits_total', sa.Integer(), nullable=False),
+    sa.Column('habits_completed', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['cycle_id'], ['habit_cycles.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('cycle_id', 'day')
+    )
+    op.create_index('idx_rollups_user_day', 'daily_cycle_rollups', ['user_id', 'day'], unique=False)
+    # Existing history: run scripts/rebuild_rollups.py
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_rollups_user_day', table_name='daily_cycle_rollups')
+    op.drop_table('daily_cycle_rollups')
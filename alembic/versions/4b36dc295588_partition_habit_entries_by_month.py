@@ -0,0 +1,115 @@
+"""partition habit_entries by month
+
+Revision ID: 4b36dc295588
+Revises: 9c881748b610
+Create Date: 2026-10-18 16:42:07.551920
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b36dc295588'
+down_revision: Union[str, Sequence[str], None] = '9c881748b610'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Partitions created up front past the current month; later ones come from
+# PartitionManager.ensure_partitions (app startup / scripts/manage_partitions.py)
+MONTHS_AHEAD = 3
+
+
+def _months(first: date, last: date):
+    month = first.replace(day=1)
+    while month <= last:
+        following = date(month.year + month.month // 12, month.month % 12 + 1, 1)
+        yield month, following
+        month = following
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Declarative partitioning is PostgreSQL only; elsewhere habit_entries stays a plain table
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute('ALTER TABLE habit_entries RENAME TO habit_entries_unpartitioned')
+    op.execute('ALTER TABLE habit_entries_unpartitioned RENAME CONSTRAINT habit_entries_pkey TO habit_entries_unpartitioned_pkey')
+    op.execute('ALTER TABLE habit_entries_unpartitioned RENAME CONSTRAINT uniq_habit_entry_date TO uniq_habit_entry_date_unpartitioned')
+    op.execute('ALTER INDEX ix_habit_entries_entry_date RENAME TO ix_habit_entries_unpartitioned_entry_date')
+    op.execute('ALTER INDEX ix_habit_entries_id RENAME TO ix_habit_entries_unpartitioned_id')
+
+    # Primary and unique keys of a partitioned table must include the partition key
+    op.execute("""
+        CREATE TABLE habit_entries (
+            id INTEGER NOT NULL DEFAULT nextval('habit_entries_id_seq'),
+            habit_id INTEGER NOT NULL REFERENCES habits (id) ON DELETE CASCADE,
+            entry_date DATE NOT NULL,
+            completed BOOLEAN NOT NULL,
+            completed_at TIMESTAMP WITHOUT TIME ZONE,
+            created_at TIMESTAMP WITHOUT TIME ZONE,
+            CONSTRAINT habit_entries_pkey PRIMARY KEY (id, entry_date),
+            CONSTRAINT uniq_habit_entry_date UNIQUE (habit_id, entry_date)
+        ) PARTITION BY RANGE (entry_date)
+    """)
+    op.execute('ALTER SEQUENCE habit_entries_id_seq OWNED BY habit_entries.id')
+    op.create_index('ix_habit_entries_entry_date', 'habit_entries', ['entry_date'], unique=False)
+    op.create_index('ix_habit_entries_id', 'habit_entries', ['id'], unique=False)
+
+    # Catches rows for months without a partition; should stay empty
+    op.execute('CREATE TABLE habit_entries_default PARTITION OF habit_entries DEFAULT')
+
+    oldest = op.get_bind().execute(sa.text('SELECT MIN(entry_date) FROM habit_entries_unpartitioned')).scalar()
+    today = date.today()
+    month = today.month - 1 + MONTHS_AHEAD
+    last = date(today.year + month // 12, month % 12 + 1, 1)
+    for start, end in _months(min(oldest or today, today), last):
+        op.execute(
+            f"CREATE TABLE habit_entries_y{start.year}m{start.month:02d} PARTITION OF habit_entries "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+
+    op.execute("""
+        INSERT INTO habit_entries (id, habit_id, entry_date, completed, completed_at, created_at)
+        SELECT id, habit_id, entry_date, completed, completed_at, created_at FROM habit_entries_unpartitioned
+    """)
+    op.execute('DROP TABLE habit_entries_unpartitioned')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    # Rows in detached (archived) partitions are not brought back
+    op.execute('ALTER TABLE habit_entries RENAME TO habit_entries_partitioned')
+    op.execute('ALTER TABLE habit_entries_partitioned RENAME CONSTRAINT habit_entries_pkey TO habit_entries_partitioned_pkey')
+    op.execute('ALTER TABLE habit_entries_partitioned RENAME CONSTRAINT uniq_habit_entry_date TO uniq_habit_entry_date_partitioned')
+    op.execute('ALTER INDEX ix_habit_entries_entry_date RENAME TO ix_habit_entries_partitioned_entry_date')
+    op.execute('ALTER INDEX ix_habit_entries_id RENAME TO ix_habit_entries_partitioned_id')
+
+    op.execute("""
+        CREATE TABLE habit_entries (
+            id INTEGER NOT NULL DEFAULT nextval('habit_entries_id_seq'),
+            habit_id INTEGER NOT NULL REFERENCES habits (id) ON DELETE CASCADE,
+            entry_date DATE NOT NULL,
+            completed BOOLEAN NOT NULL,
+            completed_at TIMESTAMP WITHOUT TIME ZONE,
+            created_at TIMESTAMP WITHOUT TIME ZONE,
+            CONSTRAINT habit_entries_pkey PRIMARY KEY (id),
+            CONSTRAINT uniq_habit_entry_date UNIQUE (habit_id, entry_date)
+        )
+    """)
+    op.execute('ALTER SEQUENCE habit_entries_id_seq OWNED BY habit_entries.id')
+    op.create_index('ix_habit_entries_entry_date', 'habit_entries', ['entry_date'], unique=False)
+    op.create_index('ix_habit_entries_id', 'habit_entries', ['id'], unique=False)
+    op.execute("""
+        INSERT INTO habit_entries (id, habit_id, entry_date, completed, completed_at, created_at)
+        SELECT id, habit_id, entry_date, completed, completed_at, created_at FROM habit_entries_partitioned
+    """)
+    # Drops the partitions with it
+    op.execute('DROP TABLE habit_entries_partitioned')
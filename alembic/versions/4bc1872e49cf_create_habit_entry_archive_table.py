@@ -0,0 +1,43 @@
+"""create habit entry archive table
+
+Revision ID: 4bc1872e49cf
+Revises: 4b36dc295588
+Create Date: 2026-10-18 17:20:44.902731
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4bc1872e49cf'
+down_revision: Union[str, Sequence[str], None] = '4b36dc295588'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('habit_entry_archives',
+    sa.Column('habit_id', sa.Integer(), nullable=False),
+    sa.Column('cycle_id', sa.Integer(), nullable=False),
+    sa.Column('start_date', sa.Date(), nullable=False),
+    sa.Column('day_count', sa.Integer(), nullable=False),
+    sa.Column('logged_bitmap', sa.LargeBinary(), nullable=False),
+    sa.Column('completed_bitmap', sa.LargeBinary(), nullable=False),
+    sa.Column('entries_logged', sa.Integer(), nullable=False),
+    sa.Column('entries_completed', sa.Integer(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['cycle_id'], ['habit_cycles.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['habit_id'], ['habits.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('habit_id')
+    )
+    op.create_index(op.f('ix_habit_entry_archives_cycle_id'), 'habit_entry_archives', ['cycle_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_habit_entry_archives_cycle_id'), table_name='habit_entry_archives')
+    op.drop_table('habit_entry_archives')
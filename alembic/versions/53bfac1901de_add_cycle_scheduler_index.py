@@ -0,0 +1,28 @@
+"""add cycle scheduler index
+
+Revision ID: 53bfac1901de
+Revises: d978349e4089
+Create Date: 2026-10-18 11:20:15.093118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '53bfac1901de'
+down_revision: Union[str, Sequence[str], None] = 'd978349e4089'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('idx_cycles_status_type_started', 'habit_cycles', ['status', 'cycle_type', 'started_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_cycles_status_type_started', table_name='habit_cycles')
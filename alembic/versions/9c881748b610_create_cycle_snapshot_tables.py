@@ -0,0 +1,67 @@
+"""create cycle snapshot tables
+
+Revision ID: 9c881748b610
+Revises: 24e99f81dc57
+Create Date: 2026-10-18 14:05:12.318407
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c881748b610'
+down_revision: Union[str, Sequence[str], None] = '24e99f81dc57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('cycle_snapshots',
+    sa.Column('cycle_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('status', postgresql.ENUM('DRAFT', 'ACTIVE', 'COMPLETED', 'ABANDONED', name='cyclestatuses', create_type=False), nullable=False),
+    sa.Column('period_start', sa.Date(), nullable=False),
+    sa.Column('period_end', sa.Date(), nullable=False),
+    sa.Column('days_in_period', sa.Integer(), nullable=False),
+    sa.Column('habits_total', sa.Integer(), nullable=False),
+    sa.Column('entries_completed', sa.Integer(), nullable=False),
+    sa.Column('completion_rate', sa.Float(), nullable=False),
+    sa.Column('best_streak', sa.Integer(), nullable=False),
+    sa.Column('days_active', sa.Integer(), nullable=False),
+    sa.Column('first_entry_date', sa.Date(), nullable=True),
+    sa.Column('last_entry_date', sa.Date(), nullable=True),
+    sa.Column('computed_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['cycle_id'], ['habit_cycles.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('cycle_id')
+    )
+    op.create_index(op.f('ix_cycle_snapshots_user_id'), 'cycle_snapshots', ['user_id'], unique=False)
+    op.create_table('habit_snapshots',
+    sa.Column('habit_id', sa.Integer(), nullable=False),
+    sa.Column('cycle_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('entries_completed', sa.Integer(), nullable=False),
+    sa.Column('completion_rate', sa.Float(), nullable=False),
+    sa.Column('best_streak', sa.Integer(), nullable=False),
+    sa.Column('days_active', sa.Integer(), nullable=False),
+    sa.Column('first_entry_date', sa.Date(), nullable=True),
+    sa.Column('last_entry_date', sa.Date(), nullable=True),
+    sa.ForeignKeyConstraint(['cycle_id'], ['cycle_snapshots.cycle_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['habit_id'], ['habits.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('habit_id')
+    )
+    op.create_index('idx_habit_snapshots_cycle', 'habit_snapshots', ['cycle_id'], unique=False)
+    # Cycles finished before this revision: run scripts/backfill_snapshots.py
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_habit_snapshots_cycle', table_name='habit_snapshots')
+    op.drop_table('habit_snapshots')
+    op.drop_index(op.f('ix_cycle_snapshots_user_id'), table_name='cycle_snapshots')
+    op.drop_table('cycle_snapshots')
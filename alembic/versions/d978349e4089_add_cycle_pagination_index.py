@@ -0,0 +1,28 @@
+"""add cycle pagination index
+
+Revision ID: d978349e4089
+Revises: 189546fb01f4
+Create Date: 2026-10-18 10:02:41.551870
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd978349e4089'
+down_revision: Union[str, Sequence[str], None] = '189546fb01f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('idx_user_cycles_created', 'habit_cycles', ['user_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_user_cycles_created', table_name='habit_cycles')
@@ -0,0 +1,29 @@
+from datetime import date, timedelta
+from typing import Iterable, Iterator
+
+"""
+Date-indexed bitsets: bit i set means the day `start + i` is in the set.
+
+Bits are packed least significant first, so bit i lives in byte i // 8 at position
+i % 8. A year of days fits in 46 bytes. Used for archived entry history and for the
+compact history format the API can return.
+"""
+
+
+def encode_days(start: date, days: Iterable[date], length: int) -> bytes:
+  """Bitset of `length` days from `start`; days outside that range are ignored"""
+  bitmap = bytearray((length + 7) // 8)
+  for day in days:
+    offset = (day - start).days
+    if 0 <= offset < length:
+      bitmap[offset >> 3] |= 1 << (offset & 7)
+  return bytes(bitmap)
+
+
+def decode_days(start: date, bitmap: bytes) -> Iterator[date]:
+  """Days in the bitset, ascending"""
+  for index, byte in enumerate(bitmap):
+    while byte:
+      low = byte & -byte
+      yield start + timedelta(days=index * 8 + low.bit_length() - 1)
+      byte ^= low
@@ -0,0 +1,236 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Set, Tuple
+
+
+class TTLCache:
+  """
+  Bounded in-process cache with per-entry expiry.
+
+  Entries are evicted least-recently-used first once `maxsize` is reached,
+  and lazily dropped on access once their TTL has passed.
+
+  `on_evict(key)` is called, under the cache's lock, for entries dropped by either
+  rule (not for delete/clear); it must not call back into the cache.
+  """
+
+  def __init__(
+    self,
+    maxsize: int,
+    ttl: float,
+    clock: Callable[[], float] = time.monotonic,
+    on_evict: Optional[Callable[[Hashable], None]] = None
+  ):
+    self.maxsize = maxsize
+    self.ttl = ttl
+    self._clock = clock
+    self._on_evict = on_evict
+    self._data: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+    self._lock = threading.Lock()
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+
+  def get(self, key: Hashable) -> Optional[Any]:
+    with self._lock:
+      item = self._data.get(key)
+      if item is None:
+        self.misses += 1
+        return None
+
+      value, expires_at = item
+      if expires_at <= self._clock():
+        del self._data[key]
+        self.misses += 1
+        if self._on_evict is not None:
+          self._on_evict(key)
+        return None
+
+      self._data.move_to_end(key)
+      self.hits += 1
+      return value
+
+  def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+    """
+    Store a value, evicting the least recently used entry if the cache is full.
+
+    :param ttl: Overrides the default TTL for this entry (never extends past it)
+    """
+    ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+    if ttl <= 0:
+      return
+
+    with self._lock:
+      self._data[key] = (value, self._clock() + ttl)
+      self._data.move_to_end(key)
+      while len(self._data) > self.maxsize:
+        evicted, _ = self._data.popitem(last=False)
+        self.evictions += 1
+        if self._on_evict is not None:
+          self._on_evict(evicted)
+
+  def delete(self, key: Hashable) -> None:
+    with self._lock:
+      self._data.pop(key, None)
+
+  def delete_where(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+    """Drop every entry for which predicate(key, value) is true. Returns the number removed."""
+    with self._lock:
+      stale = [key for key, (value, _) in self._data.items() if predicate(key, value)]
+      for key in stale:
+        del self._data[key]
+      return len(stale)
+
+  def clear(self) -> None:
+    with self._lock:
+      self._data.clear()
+      self.hits = 0
+      self.misses = 0
+      self.evictions = 0
+
+  def __len__(self) -> int:
+    return len(self._data)
+
+  def stats(self) -> dict:
+    lookups = self.hits + self.misses
+    return {
+      "size": len(self._data),
+      "maxsize": self.maxsize,
+      "hits": self.hits,
+      "misses": self.misses,
+      "evictions": self.evictions,
+      "hit_ratio": self.hits / lookups if lookups else 0.0,
+    }
+
+
+class CacheBackend:
+  """
+  Byte store behind a read-through cache: values expire after a TTL and can be
+  dropped in groups by tag. Implementations never raise on a lookup; a backend
+  that can't answer reports a miss.
+  """
+
+  def get(self, key: str) -> Optional[bytes]:
+    raise NotImplementedError
+
+  def version(self) -> Optional[int]:
+    """
+    The current invalidation generation, or None if the backend can't tell. Read it
+    before loading a value and pass it to set(): the value is then not stored if any
+    of its tags were invalidated after this point (the load may predate that write).
+    """
+    raise NotImplementedError
+
+  def set(self, key: str, value: bytes, tags: Iterable[str], version: Optional[int] = None) -> None:
+    raise NotImplementedError
+
+  def invalidate(self, tags: Iterable[str]) -> int:
+    """Drop every entry stored under any of `tags`. Returns the number removed."""
+    raise NotImplementedError
+
+  def clear(self) -> None:
+    raise NotImplementedError
+
+  def stats(self) -> dict:
+    raise NotImplementedError
+
+
+class NullBackend(CacheBackend):
+  """Caches nothing: every lookup misses"""
+
+  def get(self, key: str) -> Optional[bytes]:
+    return None
+
+  def version(self) -> Optional[int]:
+    return None
+
+  def set(self, key: str, value: bytes, tags: Iterable[str], version: Optional[int] = None) -> None:
+    pass
+
+  def invalidate(self, tags: Iterable[str]) -> int:
+    return 0
+
+  def clear(self) -> None:
+    pass
+
+  def stats(self) -> dict:
+    return {"hits": 0, "misses": 0, "evictions": 0, "hit_ratio": 0.0}
+
+
+class MemoryBackend(CacheBackend):
+  """
+  In-process backend: a TTLCache (LRU + TTL) plus a tag -> keys index.
+  Keys leave the index when they are evicted, expire or are invalidated.
+
+  Each invalidation bumps a generation counter and records it against its tags;
+  set() with an older version skips values under any of those tags. The record is
+  bounded: past `maxsize` tags it is dropped and every older version counts as stale.
+  """
+
+  def __init__(self, maxsize: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+    self._entries = TTLCache(maxsize, ttl, clock, on_evict=self._unindex_locked)
+    self._tags: Dict[str, Set[str]] = {}
+    self._key_tags: Dict[str, Tuple[str, ...]] = {}
+    self._generation = 0
+    self._invalidated: Dict[str, int] = {}
+    self._floor = 0
+    # Every call into the TTLCache is made holding this lock, so on_evict runs under it
+    self._lock = threading.Lock()
+
+  def get(self, key: str) -> Optional[bytes]:
+    with self._lock:
+      return self._entries.get(key)
+
+  def version(self) -> Optional[int]:
+    with self._lock:
+      return self._generation
+
+  def set(self, key: str, value: bytes, tags: Iterable[str], version: Optional[int] = None) -> None:
+    tags = tuple(tags)
+    with self._lock:
+      if version is not None and self._invalidated_since(version, tags):
+        return
+      self._unindex_locked(key)
+      self._entries.set(key, value)
+      self._key_tags[key] = tags
+      for tag in tags:
+        self._tags.setdefault(tag, set()).add(key)
+
+  def invalidate(self, tags: Iterable[str]) -> int:
+    with self._lock:
+      self._generation += 1
+      keys = set()
+      for tag in tags:
+        self._invalidated[tag] = self._generation
+        keys |= self._tags.pop(tag, set())
+      if len(self._invalidated) > self._entries.maxsize:
+        self._invalidated.clear()
+        self._floor = self._generation
+
+      for key in keys:
+        self._unindex_locked(key)
+        self._entries.delete(key)
+      return len(keys)
+
+  def clear(self) -> None:
+    with self._lock:
+      self._entries.clear()
+      self._tags.clear()
+      self._key_tags.clear()
+      self._invalidated.clear()
+      self._floor = self._generation
+
+  def stats(self) -> dict:
+    return self._entries.stats()
+
+  def _invalidated_since(self, version: int, tags: Tuple[str, ...]) -> bool:
+    return version < self._floor or any(self._invalidated.get(tag, 0) > version for tag in tags)
+
+  def _unindex_locked(self, key: str) -> None:
+    for tag in self._key_tags.pop(key, ()):
+      keys = self._tags.get(tag)
+      if keys is not None:
+        keys.discard(key)
+        if not keys:
+          del self._tags[tag]
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Optional
+from typing import Optional, Set
 
 
 class Settings(BaseSettings):
@@ -10,6 +10,11 @@ class Settings(BaseSettings):
     ENVIRONMENT: str = "development"
     # Database
     DATABASE_URL: str
+    # Optional read replica for read-only routes; unset sends all reads to the primary
+    DATABASE_REPLICA_URL: Optional[str] = None
+    REPLICA_STICKY_SECONDS: int = 5      # Clients read from the primary this long after a write
+    REPLICA_RETRY_SECONDS: int = 30      # How long to avoid a replica after it fails
+    REPLICA_STICKY_MAXSIZE: int = 10000
 
     # JWT Settings
     SECRET_KEY: str  # Generate with: openssl rand -hex 32
@@ -26,8 +31,51 @@ class Settings(BaseSettings):
     # Application
     API_URL: str = "http://localhost:8000"
 
+    # Identity cache for bot requests (token + discord_user_id -> user id)
+    IDENTITY_CACHE_MAXSIZE: int = 10000
+    IDENTITY_CACHE_TTL_SECONDS: int = 300
+
+    # Read-through cache for HabitService lookups (app.services.entity_cache).
+    # "memory" is per process; with several workers use "redis" (ENTITY_CACHE_URL,
+    # e.g. redis://localhost:6379/0) so invalidations reach every worker. "none" disables it.
+    ENTITY_CACHE_BACKEND: str = "memory"
+    ENTITY_CACHE_URL: Optional[str] = None
+    ENTITY_CACHE_MAXSIZE: int = 10000
+    ENTITY_CACHE_TTL_SECONDS: int = 60
+
     # Feature specific configurations
     MIN_HABITS_REQUIRED_TO_START_CYCLE: int = 3
+    MAX_BATCH_ENTRIES: int = 500
+    STATUS_FANOUT_CHUNK_SIZE: int = 500
+    MAX_STATS_RANGE_DAYS: int = 366
+
+    # Background cycle scheduler (auto-completes cycles whose period has ended)
+    CYCLE_SCHEDULER_ENABLED: bool = False
+    CYCLE_SCHEDULER_INTERVAL_SECONDS: int = 300
+    CYCLE_SCHEDULER_BATCH_SIZE: int = 500
+
+    # Entry archiving (scripts/archive_entries.py): cycles finished this long ago move
+    # their entries out of habit_entries into per-habit bitmaps, this many cycles per batch
+    ARCHIVE_AFTER_DAYS: int = 7
+    ARCHIVE_BATCH_SIZE: int = 200
+
+    # Per-request SQL budget: warn above this many statements, or when one statement
+    # shape repeats this often (likely an N+1). Counts are sent as headers outside production.
+    QUERY_BUDGET_PER_REQUEST: int = 15
+    QUERY_REPEAT_THRESHOLD: int = 5
+
+    # PostgreSQL only: monthly habit_entries partitions are created this many months ahead
+    ENTRY_PARTITION_MONTHS_AHEAD: int = 3
+
+    # Routers (by tag) whose list endpoints skip response-model validation and encode
+    # column rows directly with pydantic_core (see app.core.serialization)
+    FAST_JSON_ROUTERS: Set[str] = {"cycles", "habits"}
+
+    # Keyset pagination
+    DEFAULT_PAGE_SIZE: int = 50
+    MAX_PAGE_SIZE: int = 200
+    # Deprecated GET /cycles?unpaged=true: the most cycles it returns in one response
+    MAX_UNPAGED_CYCLES: int = 1000
 
     model_config = SettingsConfigDict(
         env_file=".env",
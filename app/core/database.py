@@ -1,23 +1,168 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+import hashlib
+import logging
+import time
+from typing import Callable, Iterable, Optional
+from fastapi import Request
+from sqlalchemy import create_engine, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.metrics import InstrumentedQueuePool, instrument_engine
+
+logger = logging.getLogger(__name__)
+
+def _create_engine(url: str, name: str):
+  engine = create_engine(
+    url,
+    poolclass=InstrumentedQueuePool,  # Checkout wait/exhaustion metrics, see /metrics
+    pool_logging_name=name,
+    pool_pre_ping=True,   # Verify connections before using
+    pool_size=10,         # Number of connections to maintain
+    max_overflow=20,      # Max connections beyond pool_siz
+    pool_recycle=3600     # Recycle connections after 1 hour
+  )
+  instrument_engine(engine, name)
+  return engine
 
 DATABASE_URL = settings.DATABASE_URL
-engine = create_engine(
-  DATABASE_URL,
-  pool_pre_ping=True,   # Verify connections before using
-  pool_size=10,         # Number of connections to maintain
-  max_overflow=20,      # Max connections beyond pool_siz
-  pool_recycle=3600     # Recycle connections after 1 hour
-)
+engine = _create_engine(DATABASE_URL, "primary")
+
+# Optional read replica for read-only routes (see get_read_db)
+replica_engine = _create_engine(settings.DATABASE_REPLICA_URL, "replica") if settings.DATABASE_REPLICA_URL else None
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False: write paths fill responses from RETURNING rows, and
+# expiring them on commit would cost a SELECT per object when they're serialized
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+ReplicaSessionLocal = (
+  sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=replica_engine)
+  if replica_engine is not None else None
+)
 
 Base = declarative_base()
 
+# Session.info flag set on sessions the ReadRouter hands out for the replica, so code
+# that must not trust lagging data (the entity cache) can tell them apart
+REPLICA_SESSION = "read_replica"
+
+
+class ReadRouter:
+  """
+  Picks the database for read-only sessions.
+
+  Reads go to the replica unless the client wrote recently (pinned to the primary for
+  `sticky_seconds` so it reads its own writes), or the replica failed within the last
+  `retry_seconds`. Without a replica everything goes to the primary.
+  """
+
+  def __init__(
+    self,
+    primary: sessionmaker,
+    replica: Optional[sessionmaker] = None,
+    sticky_seconds: float = settings.REPLICA_STICKY_SECONDS,
+    retry_seconds: float = settings.REPLICA_RETRY_SECONDS,
+    clock: Callable[[], float] = time.monotonic
+  ):
+    self.primary = primary
+    self.replica = replica
+    self.retry_seconds = retry_seconds
+    self._clock = clock
+    self._pinned = TTLCache(maxsize=settings.REPLICA_STICKY_MAXSIZE, ttl=sticky_seconds, clock=clock)
+    self._replica_down_until = 0.0
+
+  def pin_to_primary(self, key: str) -> None:
+    if self.replica is not None:
+      self._pinned.set(key, True)
+
+  def mark_replica_down(self) -> None:
+    self._replica_down_until = self._clock() + self.retry_seconds
+
+  def replica_available(self) -> bool:
+    return self.replica is not None and self._clock() >= self._replica_down_until
+
+  def session(self, key: Optional[str] = None) -> Session:
+    if not self.replica_available() or (key is not None and self._pinned.get(key)):
+      return self.primary()
+
+    db = self.replica()
+    db.info[REPLICA_SESSION] = True
+    try:
+      # Check out a connection now (pool_pre_ping) so a dead replica fails over
+      # here instead of failing the request's first query
+      db.connection()
+    except OperationalError as e:
+      db.close()
+      self.mark_replica_down()
+      logger.warning(f"Read replica unavailable, using primary for {self.retry_seconds}s: {e}")
+      return self.primary()
+    return db
+
+  def check_replica(self) -> Optional[bool]:
+    """Health probe: None without a replica, else whether it answers"""
+    if self.replica is None:
+      return None
+    try:
+      with self.replica() as db:
+        db.execute(text("SELECT 1"))
+      return True
+    except OperationalError:
+      self.mark_replica_down()
+      return False
+
+
+read_router = ReadRouter(SessionLocal, ReplicaSessionLocal)
+
+
+def read_key(request: Request, discord_user_id: Optional[str] = None) -> str:
+  """
+  Identifies a client for read-your-writes: bot token plus the Discord user it acts for
+  (the discord_user_id query parameter unless given).
+  """
+  authorization = request.headers.get("authorization", "")
+  digest = hashlib.sha256(authorization.encode()).hexdigest()
+  if discord_user_id is None:
+    discord_user_id = request.query_params.get("discord_user_id", "")
+  return f"{digest}:{discord_user_id}"
+
+
+def pin_discord_users(request: Request, discord_user_ids: Iterable[str]) -> None:
+  """
+  Pin reads to the primary for each Discord user a write acted for. The middleware only
+  sees the query parameter; writes that name their users in the body call this.
+  """
+  for discord_user_id in set(discord_user_ids):
+    read_router.pin_to_primary(read_key(request, discord_user_id))
+
+
 def get_db():
   db = SessionLocal()
   try:
     yield db
   finally:
     db.close()
+
+
+def get_read_db(request: Request):
+  """
+  Session for read-only routes: the replica when one is configured and healthy,
+  otherwise (or right after this client wrote) the primary.
+  """
+  db = read_router.session(read_key(request))
+  try:
+    yield db
+  except OperationalError:
+    if db.get_bind() is not engine:
+      read_router.mark_replica_down()
+    raise
+  finally:
+    db.close()
+
+def dialect_insert(db: Session, model):
+  """
+  INSERT construct for the session's dialect, so callers can use ON CONFLICT.
+  PostgreSQL in production, SQLite in tests.
+  """
+  if db.get_bind().dialect.name == "postgresql":
+    return postgresql.insert(model)
+  return sqlite.insert(model)
@@ -0,0 +1,41 @@
+import hashlib
+from fastapi import Request, Response
+
+"""
+Strong ETags and If-None-Match handling for conditional GETs.
+
+A route derives its ETag from a version tuple (ids, updated_at values, counts) that
+can be read with one cheap aggregate query. When the client's If-None-Match matches,
+the route answers 304 without loading or serializing the resource.
+"""
+
+ETAG_HEADER = "ETag"
+
+
+def make_etag(*version) -> str:
+  digest = hashlib.sha256("|".join(str(part) for part in version).encode()).hexdigest()
+  return f'"{digest[:32]}"'
+
+
+def has_conditional(request: Request) -> bool:
+  return "if-none-match" in request.headers
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+  """
+  Whether If-None-Match lists `etag` (or is "*"). GETs use the weak comparison,
+  so a W/ prefix added by a proxy still matches.
+  """
+  header = request.headers.get("if-none-match")
+  if not header:
+    return False
+
+  for candidate in header.split(","):
+    candidate = candidate.strip()
+    if candidate == "*" or candidate.removeprefix("W/") == etag:
+      return True
+  return False
+
+
+def not_modified(etag: str) -> Response:
+  return Response(status_code=304, headers={ETAG_HEADER: etag})
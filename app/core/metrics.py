@@ -0,0 +1,232 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+"""
+In-process Prometheus metrics, rendered in the text exposition format at /metrics.
+
+Deliberately small instead of depending on a client library: counters and gauges
+(kept here or read from a callback at scrape time) and fixed-bucket histograms.
+Recording is a dict update under a lock; all formatting happens at scrape time.
+"""
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CHECKOUT_WAIT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+  return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+  if not names:
+    return ""
+  return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+  value = float(value)
+  if value == float("inf"):
+    return "+Inf"
+  return str(int(value)) if value.is_integer() else repr(value)
+
+
+class _Metric:
+  type_name = ""
+
+  def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+    self.name = name
+    self.documentation = documentation
+    self.labelnames = tuple(labelnames)
+    self._lock = threading.Lock()
+
+  def _key(self, labels: Dict[str, str]) -> LabelValues:
+    return tuple(str(labels[name]) for name in self.labelnames)
+
+  def samples(self) -> Iterator[Tuple[str, str, float]]:
+    raise NotImplementedError
+
+  def render(self) -> List[str]:
+    lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+    lines.extend(f"{name}{labels} {_format_value(value)}" for name, labels, value in self.samples())
+    return lines
+
+
+class _Value(_Metric):
+  """A single number per label set, kept here or read from a callback at scrape time"""
+
+  def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+    super().__init__(name, documentation, labelnames)
+    self._values: Dict[LabelValues, float] = {}
+    self._functions: Dict[LabelValues, Callable[[], float]] = {}
+
+  def _add(self, amount: float, labels: Dict[str, str]) -> None:
+    key = self._key(labels)
+    with self._lock:
+      self._values[key] = self._values.get(key, 0) + amount
+
+  def set_function(self, function: Callable[[], float], **labels) -> None:
+    """Read the value from `function` at scrape time"""
+    self._functions[self._key(labels)] = function
+
+  def value(self, **labels) -> float:
+    key = self._key(labels)
+    if key in self._functions:
+      return self._functions[key]()
+    return self._values.get(key, 0)
+
+  def samples(self):
+    with self._lock:
+      values = dict(self._values)
+    for key, function in list(self._functions.items()):
+      values[key] = function()
+    for key, value in values.items():
+      yield self.name, _format_labels(self.labelnames, key), value
+
+
+class Counter(_Value):
+  """Only goes up; a callback's value may reset to zero, which scrapers read as a restart"""
+  type_name = "counter"
+
+  def inc(self, amount: float = 1, **labels) -> None:
+    self._add(amount, labels)
+
+
+class Gauge(_Value):
+  type_name = "gauge"
+
+  def add(self, amount: float, **labels) -> None:
+    self._add(amount, labels)
+
+
+class Histogram(_Metric):
+  type_name = "histogram"
+
+  def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+    super().__init__(name, documentation, labelnames)
+    self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+    # label values -> [per-bucket counts (non-cumulative), sum, count]
+    self._values: Dict[LabelValues, list] = {}
+
+  def observe(self, value: float, **labels) -> None:
+    key = self._key(labels)
+    index = bisect_left(self.buckets, value)
+    with self._lock:
+      state = self._values.get(key)
+      if state is None:
+        state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+      state[0][index] += 1
+      state[1] += value
+      state[2] += 1
+
+  def count(self, **labels) -> int:
+    state = self._values.get(self._key(labels))
+    return state[2] if state else 0
+
+  def samples(self):
+    with self._lock:
+      values = [(key, list(counts), total, count) for key, (counts, total, count) in self._values.items()]
+    bucket_labels = self.labelnames + ("le",)
+    for key, counts, total, count in values:
+      cumulative = 0
+      for bound, bucket_count in zip(self.buckets, counts):
+        cumulative += bucket_count
+        yield f"{self.name}_bucket", _format_labels(bucket_labels, key + (_format_value(bound),)), cumulative
+      labels = _format_labels(self.labelnames, key)
+      yield f"{self.name}_sum", labels, total
+      yield f"{self.name}_count", labels, count
+
+
+class Registry:
+  def __init__(self):
+    self._metrics: Dict[str, _Metric] = {}
+
+  def register(self, metric: _Metric) -> _Metric:
+    self._metrics[metric.name] = metric
+    return metric
+
+  def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    return self.register(Counter(name, documentation, labelnames))
+
+  def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+    return self.register(Gauge(name, documentation, labelnames))
+
+  def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+    return self.register(Histogram(name, documentation, labelnames, buckets))
+
+  def render(self) -> str:
+    lines = []
+    for metric in self._metrics.values():
+      lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# HTTP
+REQUEST_LATENCY = REGISTRY.histogram(
+  "http_request_duration_seconds", "Request latency by route template", ("method", "route", "status")
+)
+APP_EXCEPTIONS = REGISTRY.counter(
+  "app_exceptions_total", "AppException responses by error code", ("code", "status")
+)
+
+# Connection pools
+POOL_SIZE = REGISTRY.gauge("db_pool_size", "Configured pool size", ("pool",))
+POOL_CHECKED_OUT = REGISTRY.gauge("db_pool_checked_out", "Connections currently checked out", ("pool",))
+POOL_OVERFLOW = REGISTRY.gauge("db_pool_overflow", "Overflow connections currently open beyond pool_size", ("pool",))
+POOL_WAITERS = REGISTRY.gauge("db_pool_waiters", "Threads currently waiting to check out a connection", ("pool",))
+POOL_CHECKOUT_WAIT = REGISTRY.histogram(
+  "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection", ("pool",), CHECKOUT_WAIT_BUCKETS
+)
+POOL_CHECKOUT_TIMEOUTS = REGISTRY.counter(
+  "db_pool_checkout_timeouts_total", "Checkouts that gave up because the pool was exhausted", ("pool",)
+)
+POOL_CONNECTIONS_CREATED = REGISTRY.counter(
+  "db_pool_connections_created_total", "New DBAPI connections opened by the pool", ("pool",)
+)
+
+# Caches (read at scrape time from each cache's stats())
+CACHE_HITS = REGISTRY.counter("cache_hits_total", "Lookups answered from the cache", ("cache",))
+CACHE_MISSES = REGISTRY.counter("cache_misses_total", "Lookups that fell through to the database", ("cache",))
+CACHE_EVICTIONS = REGISTRY.counter("cache_evictions_total", "Entries evicted to make room (or by the cache server)", ("cache",))
+CACHE_HIT_RATIO = REGISTRY.gauge("cache_hit_ratio", "hits / (hits + misses) since the cache was last cleared", ("cache",))
+
+
+class InstrumentedQueuePool(QueuePool):
+  """
+  QueuePool that records how long checkouts wait, how many threads are waiting and
+  how often the pool is exhausted. The label is the engine's pool_logging_name.
+  """
+
+  def _do_get(self):
+    name = self.logging_name or "default"
+    POOL_WAITERS.add(1, pool=name)
+    started = time.perf_counter()
+    try:
+      return super()._do_get()
+    except exc.TimeoutError:
+      POOL_CHECKOUT_TIMEOUTS.inc(pool=name)
+      raise
+    finally:
+      POOL_WAITERS.add(-1, pool=name)
+      POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started, pool=name)
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+  """Expose an engine's pool as gauges read at scrape time, plus connection counts"""
+  # Read engine.pool on every scrape: engine.dispose() swaps in a new pool
+  if isinstance(engine.pool, QueuePool):
+    POOL_SIZE.set_function(lambda: engine.pool.size(), pool=name)
+    POOL_OVERFLOW.set_function(lambda: max(engine.pool.overflow(), 0), pool=name)
+  POOL_CHECKED_OUT.set_function(lambda: engine.pool.checkedout(), pool=name)
+
+  @event.listens_for(engine, "connect")
+  def _on_connect(dbapi_connection, connection_record):
+    POOL_CONNECTIONS_CREATED.inc(pool=name)
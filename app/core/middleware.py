@@ -0,0 +1,121 @@
+import time
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+from app.core.database import read_router, read_key
+from app.core.metrics import REQUEST_LATENCY
+from app.core.query_counter import count_queries, check_budget
+
+"""
+Per-request HTTP middleware, written as plain ASGI apps rather than @app.middleware
+(BaseHTTPMiddleware), which costs every request a task group and a memory stream per
+layer. Each one wraps `send`: a response is over at the http.response.body message
+without more_body, not when its headers go out, which is what matters for streamed
+responses (POST /users/status).
+
+Routes are labelled by template (/cycles/{cycle_id}): the router stores the matched
+route in the shared scope before the endpoint runs.
+"""
+
+READ_ONLY_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+def _route_path(scope: Scope, default: str) -> str:
+  route = scope.get("route")
+  return route.path if route is not None else default
+
+
+def _is_last_body(message: Message) -> bool:
+  return message["type"] == "http.response.body" and not message.get("more_body", False)
+
+
+class PinWritersMiddleware:
+  """After a write, serve this client's reads from the primary so it sees its own changes"""
+
+  def __init__(self, app: ASGIApp):
+    self.app = app
+
+  async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+    if scope["type"] != "http" or scope["method"] in READ_ONLY_METHODS:
+      await self.app(scope, receive, send)
+      return
+
+    async def send_pinned(message: Message) -> None:
+      # Pin before the client sees the response, so its next read can't beat the pin
+      if message["type"] == "http.response.start":
+        read_router.pin_to_primary(read_key(Request(scope)))
+      await send(message)
+
+    await self.app(scope, receive, send_pinned)
+
+
+class RequestLatencyMiddleware:
+  """http_request_duration_seconds, from the request until the last byte of the body"""
+
+  def __init__(self, app: ASGIApp):
+    self.app = app
+
+  async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+    if scope["type"] != "http":
+      await self.app(scope, receive, send)
+      return
+
+    started = time.perf_counter()
+    status = 500
+    recorded = False
+
+    def record() -> None:
+      nonlocal recorded
+      recorded = True
+      REQUEST_LATENCY.observe(
+        time.perf_counter() - started,
+        method=scope["method"],
+        route=_route_path(scope, "unmatched"),
+        status=status
+      )
+
+    async def send_timed(message: Message) -> None:
+      nonlocal status
+      if message["type"] == "http.response.start":
+        status = message["status"]
+      await send(message)
+      if _is_last_body(message):
+        record()
+
+    try:
+      await self.app(scope, receive, send_timed)
+    finally:
+      # Failed before (or while) sending the body: still count it, as a 500 unless started
+      if not recorded:
+        record()
+
+
+class QueryCountMiddleware:
+  """Count SQL statements per request; warn on budget overruns and repeated statements"""
+
+  def __init__(self, app: ASGIApp):
+    self.app = app
+
+  async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+    if scope["type"] != "http":
+      await self.app(scope, receive, send)
+      return
+
+    with count_queries() as stats:
+      async def send_counted(message: Message) -> None:
+        # Headers go out before a streamed body runs its queries: these count the handler's
+        if message["type"] == "http.response.start" and settings.ENVIRONMENT != "production":
+          headers = MutableHeaders(scope=message)
+          headers["X-DB-Query-Count"] = str(len(stats))
+          headers["X-DB-Time-Ms"] = f"{stats.duration_seconds * 1000:.1f}"
+        await send(message)
+
+      await self.app(scope, receive, send_counted)
+
+    check_budget(
+      f"{scope['method']} {_route_path(scope, scope['path'])}",
+      stats,
+      budget=settings.QUERY_BUDGET_PER_REQUEST,
+      repeat_threshold=settings.QUERY_REPEAT_THRESHOLD
+    )
@@ -0,0 +1,45 @@
+import base64
+import json
+from typing import Any, Callable, List, Sequence, TypeVar
+from fastapi import Response
+from app.core.exceptions import ValidationError
+
+T = TypeVar("T")
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*values: Any) -> str:
+  """
+  Opaque keyset cursor for the sort key of the last row on a page.
+  Dates and datetimes are stored as ISO strings.
+  """
+  raw = json.dumps([v.isoformat() if hasattr(v, "isoformat") else v for v in values])
+  return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *parsers: Callable[[Any], Any]) -> tuple:
+  """
+  Decode a cursor from encode_cursor, applying one parser per sort key column.
+
+  :raises ValidationError: If the cursor is malformed
+  """
+  try:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    if len(values) != len(parsers):
+      raise ValueError("cursor length mismatch")
+    return tuple(parse(value) for parse, value in zip(parsers, values))
+  except (ValueError, TypeError):
+    raise ValidationError("Invalid pagination cursor")
+
+
+def paginate(rows: Sequence[T], limit: int, cursor_key: Callable[[T], tuple], response: Response) -> List[T]:
+  """
+  Trim a result fetched with limit + 1 rows to one page.
+  When there is another page, its cursor is returned in the X-Next-Cursor header.
+  """
+  page = list(rows[:limit])
+  if len(rows) > limit:
+    response.headers[NEXT_CURSOR_HEADER] = encode_cursor(*cursor_key(page[-1]))
+  return page
@@ -0,0 +1,102 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+"""
+Per-request SQL statement counting and N+1 detection.
+
+Listeners on every Engine record statements into whichever QueryStats collectors are
+active in the current context (count_queries). QueryCountMiddleware (app.core.middleware)
+opens one per request; tests open their own around the code under test. Collectors nest,
+so both see the same statements. With no collector active a statement costs one ContextVar read.
+"""
+
+logger = logging.getLogger(__name__)
+
+_active: ContextVar[Tuple["QueryStats", ...]] = ContextVar("query_counter_active", default=())
+
+# Bind parameter lists ("IN (?, ?, ?)" / "(%(id_1)s, %(id_2)s)") collapse to one shape
+_PARAM_LIST = re.compile(r"\(\s*(?:\?|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%\(\w+\)s|:\w+))*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+  """Normalize a statement so repeats that differ only in parameter count compare equal"""
+  return _PARAM_LIST.sub("(?)", _WHITESPACE.sub(" ", statement).strip())
+
+
+@dataclass
+class QueryStats:
+  statements: List[str] = field(default_factory=list)
+  duration_seconds: float = 0.0
+
+  def __len__(self) -> int:
+    return len(self.statements)
+
+  def __iter__(self) -> Iterator[str]:
+    return iter(self.statements)
+
+  def repeated(self, threshold: int) -> Dict[str, int]:
+    """Statement shapes executed at least `threshold` times: likely N+1 lazy loads"""
+    counts = Counter(statement_shape(statement) for statement in self.statements)
+    return {shape: count for shape, count in counts.items() if count >= threshold}
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryStats]:
+  """Collect every statement executed in this context (and tasks/threads it spawns)"""
+  stats = QueryStats()
+  token = _active.set(_active.get() + (stats,))
+  try:
+    yield stats
+  finally:
+    _active.reset(token)
+
+
+def check_budget(label: str, stats: QueryStats, budget: int, repeat_threshold: int) -> None:
+  """Log a warning when a unit of work goes over its query budget or repeats a statement"""
+  if len(stats) > budget:
+    logger.warning(
+      f"{label} ran {len(stats)} SQL statements (budget {budget}, {stats.duration_seconds * 1000:.1f}ms)"
+    )
+  for shape, count in stats.repeated(repeat_threshold).items():
+    logger.warning(f"{label} ran the same statement {count} times, likely N+1: {shape[:200]}")
+
+
+# Statements are counted before execution, so failing ones (IntegrityError) count too
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+  collectors = _active.get()
+  if not collectors:
+    return
+
+  for stats in collectors:
+    stats.statements.append(statement)
+  conn.info.setdefault("query_counter_started", []).append((time.perf_counter(), collectors))
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+  started = conn.info.get("query_counter_started")
+  if not started:
+    return
+
+  started_at, collectors = started.pop()
+  elapsed = time.perf_counter() - started_at
+  for stats in collectors:
+    stats.duration_seconds += elapsed
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+  # A failed statement never reaches after_cursor_execute; drop its start marker
+  connection = exception_context.connection
+  if connection is not None and connection.info.get("query_counter_started"):
+    connection.info["query_counter_started"].pop()
@@ -0,0 +1,246 @@
+import logging
+import socket
+import threading
+import time
+from typing import Any, Iterable, List, Optional, Sequence
+from urllib.parse import urlparse
+from app.core.cache import CacheBackend
+
+"""
+Minimal client for the Redis protocol (RESP2), and a CacheBackend on top of it.
+
+Only what the entity cache needs: GET, SET PX, DEL, INCR, SADD, SMEMBERS, PEXPIRE
+and INFO, optionally pipelined. Works against Redis, Valkey, KeyDB or anything else that
+speaks RESP. One connection per client, guarded by a lock; it is reopened on the
+next command after a network error.
+"""
+
+logger = logging.getLogger(__name__)
+
+
+class RespError(Exception):
+  """An error reply from the server"""
+
+
+class RespClient:
+  def __init__(self, url: str, timeout: float = 0.5):
+    parsed = urlparse(url)
+    if parsed.scheme not in ("redis", ""):
+      raise ValueError(f"Unsupported cache URL scheme: {parsed.scheme}")
+    self.host = parsed.hostname or "localhost"
+    self.port = parsed.port or 6379
+    self.password = parsed.password
+    self.database = int(parsed.path.lstrip("/") or 0)
+    self.timeout = timeout
+    self._sock: Optional[socket.socket] = None
+    self._reader = None
+    self._lock = threading.Lock()
+
+  def execute(self, *args) -> Any:
+    return self.pipeline([args])[0]
+
+  def pipeline(self, commands: Sequence[Sequence]) -> List[Any]:
+    """
+    Send every command in one write, then read one reply per command. Error replies
+    are returned in place as RespError instances; network errors raise OSError.
+    """
+    with self._lock:
+      try:
+        if self._sock is None:
+          self._connect()
+        self._sock.sendall(b"".join(self._encode(command) for command in commands))
+        return [self._read_reply() for _ in commands]
+      except OSError:
+        self._close()
+        raise
+
+  def close(self) -> None:
+    with self._lock:
+      self._close()
+
+  def _connect(self) -> None:
+    self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+    self._reader = self._sock.makefile("rb")
+    setup = []
+    if self.password:
+      setup.append(("AUTH", self.password))
+    if self.database:
+      setup.append(("SELECT", self.database))
+    if setup:
+      self._sock.sendall(b"".join(self._encode(command) for command in setup))
+      for _ in setup:
+        reply = self._read_reply()
+        if isinstance(reply, RespError):
+          self._close()
+          raise ConnectionError(f"Cache server rejected {setup[0][0]}: {reply}")
+
+  def _close(self) -> None:
+    if self._sock is not None:
+      try:
+        self._reader.close()
+        self._sock.close()
+      except OSError:
+        pass
+    self._sock = None
+    self._reader = None
+
+  @staticmethod
+  def _encode(command: Iterable) -> bytes:
+    parts = [arg if isinstance(arg, bytes) else str(arg).encode() for arg in command]
+    chunks = [b"*%d\r\n" % len(parts)]
+    for part in parts:
+      chunks.append(b"$%d\r\n%s\r\n" % (len(part), part))
+    return b"".join(chunks)
+
+  def _read_reply(self) -> Any:
+    line = self._reader.readline()
+    if not line.endswith(b"\r\n"):
+      raise ConnectionError("Cache server closed the connection")
+    kind, body = line[:1], line[1:-2]
+
+    if kind == b"+":
+      return body.decode()
+    if kind == b"-":
+      return RespError(body.decode())
+    if kind == b":":
+      return int(body)
+    if kind == b"$":
+      length = int(body)
+      if length < 0:
+        return None
+      data = self._reader.read(length + 2)
+      if len(data) != length + 2:
+        raise ConnectionError("Cache server closed the connection")
+      return data[:-2]
+    if kind == b"*":
+      length = int(body)
+      return None if length < 0 else [self._read_reply() for _ in range(length)]
+    raise ConnectionError(f"Unexpected reply from cache server: {line!r}")
+
+
+class RespBackend(CacheBackend):
+  """
+  Cache shared by every worker through a Redis-protocol server. Each tag is a set of
+  the keys stored under it; invalidating reads the sets and deletes keys and sets.
+  Invalidations also INCR a shared generation and add it to a per-tag version set
+  (before reading the key sets), so a set() that started from an older version can
+  see it raced one and delete what it just wrote. The version sets are sets rather
+  than single stamps because two invalidations' writes can land out of order.
+  The server does its own eviction (maxmemory-policy); `evictions` is its evicted_keys.
+  An unreachable server degrades to misses, logged; reads and writes then skip it for
+  `retry_after` seconds instead of waiting on a timeout every time. Invalidations are
+  always attempted.
+  """
+
+  def __init__(self, client: RespClient, ttl: float, prefix: str = "habit-tracker:", retry_after: float = 5.0):
+    self.client = client
+    self.ttl_ms = int(ttl * 1000)
+    self.prefix = prefix
+    self.retry_after = retry_after
+    self.hits = 0
+    self.misses = 0
+    self._down_until = 0.0
+
+  def get(self, key: str) -> Optional[bytes]:
+    replies = self._run([("GET", self.prefix + key)], skip_when_down=True)
+    value = replies[0] if replies else None
+
+    if value is None:
+      self.misses += 1
+    else:
+      self.hits += 1
+    return value
+
+  def version(self) -> Optional[int]:
+    replies = self._run([("GET", self._generation_key)], skip_when_down=True)
+    return int(replies[0] or 0) if replies else None
+
+  def set(self, key: str, value: bytes, tags: Iterable[str], version: Optional[int] = None) -> None:
+    tags = list(tags)
+    key = self.prefix + key
+    commands = [("SET", key, value, "PX", self.ttl_ms)]
+    for tag in tags:
+      # A tag's set lives as long as the newest key in it, so never shorter than any key
+      commands.append(("SADD", self.prefix + tag, key))
+      commands.append(("PEXPIRE", self.prefix + tag, self.ttl_ms))
+    if version is None:
+      self._run(commands, skip_when_down=True)
+      return
+
+    # Read the versions after indexing the key: an invalidation recorded later than
+    # this read also finds the key in its sets and deletes it
+    replies = self._run(commands + [("SMEMBERS", self._version_key(tag)) for tag in tags], skip_when_down=True)
+    versions = replies[len(commands):] if replies is not None else None
+    if versions is None or any(int(stamp) > version for stamps in versions for stamp in stamps):
+      self._run([("DEL", key)], skip_when_down=True)
+
+  def invalidate(self, tags: Iterable[str]) -> int:
+    tags = list(tags)
+    if not tags:
+      return 0
+    tag_keys = [self.prefix + tag for tag in tags]
+
+    generation = self._run([("INCR", self._generation_key)])
+    if generation is None:
+      return 0
+    stamps = []
+    for tag in tags:
+      stamps.append(("SADD", self._version_key(tag), generation[0]))
+      stamps.append(("PEXPIRE", self._version_key(tag), self.ttl_ms))
+    replies = self._run(stamps + [("SMEMBERS", tag) for tag in tag_keys])
+    if replies is None:
+      return 0
+    members = replies[len(stamps):]
+    keys = {key for keys in members if isinstance(keys, list) for key in keys}
+    deleted = self._run([("DEL", *keys, *tag_keys)])
+    return len(keys) if deleted is not None else 0
+
+  def clear(self) -> None:
+    """Resets the counters; entries on the server are left to expire"""
+    self.hits = 0
+    self.misses = 0
+
+  def stats(self) -> dict:
+    lookups = self.hits + self.misses
+    return {
+      "hits": self.hits,
+      "misses": self.misses,
+      "evictions": self._server_evictions(),
+      "hit_ratio": self.hits / lookups if lookups else 0.0,
+    }
+
+  @property
+  def _generation_key(self) -> str:
+    return self.prefix + "generation"
+
+  def _version_key(self, tag: str) -> str:
+    return self.prefix + "version:" + tag
+
+  def _server_evictions(self) -> int:
+    info = self._run([("INFO", "stats")], skip_when_down=True)
+    if not info or not isinstance(info[0], bytes):
+      return 0
+    for line in info[0].decode().splitlines():
+      if line.startswith("evicted_keys:"):
+        return int(line.split(":", 1)[1])
+    return 0
+
+  def _run(self, commands: Sequence[Sequence], skip_when_down: bool = False) -> Optional[List[Any]]:
+    """Replies to `commands`, or None if the server couldn't be reached or returned an error"""
+    if skip_when_down and time.monotonic() < self._down_until:
+      return None
+
+    try:
+      return [self._check(reply) for reply in self.client.pipeline(commands)]
+    except OSError:
+      self._down_until = time.monotonic() + self.retry_after
+      logger.warning("Entity cache %s failed, skipping the server for %ss", commands[0][0], self.retry_after, exc_info=True)
+    except RespError:
+      logger.warning("Entity cache %s failed", commands[0][0], exc_info=True)
+    return None
+
+  @staticmethod
+  def _check(reply: Any) -> Any:
+    if isinstance(reply, RespError):
+      raise reply
+    return reply
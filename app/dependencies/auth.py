@@ -6,11 +6,14 @@ from app.core.security import verify_access_token
 from app.core.database import get_db
 from app.models.user import User
 from app.services.user_service import UserService
+from app.services.identity_cache import identity_cache, identity_key, attach_user, remember_identity
 
 security = HTTPBearer()
 
+# These dependencies run blocking Session queries, so they are plain `def`:
+# FastAPI runs them in its threadpool instead of on the event loop.
 
-async def get_current_user(
+def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
 ) -> User:
@@ -29,7 +32,7 @@ async def get_current_user(
     return user
 
 
-async def get_discord_user(
+def get_discord_user(
     discord_user_id: Optional[str] = Query(None, description="Discord user ID"),
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
@@ -37,19 +40,28 @@ async def get_discord_user(
     """
     Resolve user from bot request.
 
-    1. Verify JWT is valid (bot authentication)
-    2. If discord_user_id provided, look up/create Discord user
-    3. If no discord_user_id, return the JWT's user (backward compatibility)
+    1. Return the cached identity if this token + Discord user was resolved recently
+    2. Verify JWT is valid (bot authentication)
+    3. If discord_user_id provided, look up/create Discord user
+    4. If no discord_user_id, return the JWT's user (backward compatibility)
     """
-    # Verify the JWT token
     token = credentials.credentials
+
+    # Cache hit: the token was already verified and the user resolved, skip both
+    cached_user_id = identity_cache.get(identity_key(token, discord_user_id))
+    if cached_user_id is not None:
+        return attach_user(db, cached_user_id)
+
+    # Verify the JWT token
     payload = verify_access_token(token)
     jwt_user_id = int(payload["sub"])
 
     # If discord_user_id provided, resolve to Discord user
     if discord_user_id:
         user_service = UserService(db)
-        return user_service.get_or_create_user_by_discord_id(discord_user_id)
+        user = user_service.get_or_create_user_by_discord_id(discord_user_id)
+        remember_identity(token, discord_user_id, user.id, payload)
+        return user
 
     # Fallback: return the JWT's user (bot user or direct auth)
     user = db.query(User).filter(User.id == jwt_user_id).first()
@@ -58,4 +70,5 @@ async def get_discord_user(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found"
         )
+    remember_identity(token, None, user.id, payload)
     return user
@@ -1,13 +1,20 @@
+import asyncio
 import logging
+from contextlib import asynccontextmanager, suppress
 from fastapi import Depends, FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from sqlalchemy import text
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import SessionLocal, engine, get_db, read_router
+from app.core.metrics import REGISTRY, APP_EXCEPTIONS
+from app.core.middleware import PinWritersMiddleware, RequestLatencyMiddleware, QueryCountMiddleware
 from .core.exceptions import AppException
 from .dependencies.auth import get_current_user
 from .models import User
-from .routers import habit_cycles, habits
+from .routers import habit_cycles, habits, me, users
+from .services.cycle_scheduler import CycleScheduler
+from .services.partition_service import PartitionManager
 
 # Configure logging
 logging.basicConfig(
@@ -17,16 +24,54 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if engine.dialect.name == "postgresql":
+        ensure_entry_partitions()
+
+    scheduler_task = None
+    if settings.CYCLE_SCHEDULER_ENABLED:
+        scheduler = CycleScheduler()
+        scheduler_task = asyncio.create_task(scheduler.run_forever(settings.CYCLE_SCHEDULER_INTERVAL_SECONDS))
+
+    yield
+
+    if scheduler_task is not None:
+        scheduler_task.cancel()
+        # Wait for a run in progress to finish instead of abandoning it mid-run
+        with suppress(asyncio.CancelledError):
+            await scheduler_task
+
+def ensure_entry_partitions():
+    """Create upcoming monthly habit_entries partitions; a failure here shouldn't stop the API"""
+    db = SessionLocal()
+    try:
+        PartitionManager(db).ensure_partitions()
+    except Exception:
+        logger.exception("Could not create habit_entries partitions")
+        db.rollback()
+    finally:
+        db.close()
+
 # Can declare global dependencies that will be combined with deps for each API Router
 app = FastAPI(
-    title="Habit Tracker API"
+    title="Habit Tracker API",
+    lifespan=lifespan
 )
 
 app.include_router(habit_cycles.router)
 app.include_router(habits.router)
+app.include_router(me.router)
+app.include_router(users.router)
+
+# Outermost last: query counting wraps latency, which wraps pinning
+app.add_middleware(PinWritersMiddleware)
+app.add_middleware(RequestLatencyMiddleware)
+app.add_middleware(QueryCountMiddleware)
 
 @app.exception_handler(AppException)
 async def app_exception_handler(req: Request, exc: AppException):
+    APP_EXCEPTIONS.inc(code=exc.error_code, status=exc.status_code)
     return JSONResponse(
         status_code=exc.status_code,
         content={
@@ -43,14 +88,17 @@ def read():
     return {"message": "Hello"}
 
 @app.get("/health", tags=["health"])
-async def health_check(db: Session = Depends(get_db)):
+def health_check(db: Session = Depends(get_db)):
     """Health check endpoint for monitoring"""
     try:
         # Check database connection
         db.execute(text("SELECT 1"))
+        replica = read_router.check_replica()
         return {
             "status": "healthy",
-            "database": "connected"
+            "database": "connected",
+            # Reads fall back to the primary while the replica is down
+            "replica": {None: "not configured", True: "connected", False: "disconnected"}[replica]
         }
     except Exception as e:
         logger.error(f"Health check failed: {e}")
@@ -61,4 +109,8 @@ async def health_check(db: Session = Depends(get_db)):
                 "database": "disconnected"
             }
         )
-    
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint (text exposition format)"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
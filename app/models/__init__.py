@@ -5,3 +5,6 @@ from app.models.auth_provider import AuthProvider, Providers
 from app.models.habit import Habit
 from app.models.habit_entry import HabitEntry
 
+from app.models.daily_cycle_rollup import DailyCycleRollup
+from app.models.cycle_snapshot import CycleSnapshot, HabitSnapshot
+from app.models.habit_entry_archive import HabitEntryArchive
@@ -0,0 +1,57 @@
+from typing import List
+from app.core.database import Base
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Date, Float, Enum, Index
+from sqlalchemy.orm import relationship, Mapped
+from datetime import datetime
+from app.models.habit_cycle import CycleStatuses
+
+
+class CycleSnapshot(Base):
+  """
+  Final statistics for a COMPLETED or ABANDONED cycle.
+
+  Finished cycles never change, so their stats are computed once at the transition
+  (see SnapshotService) and every later read comes from here instead of habit_entries.
+  """
+  __tablename__ = "cycle_snapshots"
+
+  cycle_id = Column(Integer, ForeignKey('habit_cycles.id', ondelete='CASCADE'), primary_key=True)
+  user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
+  status = Column(Enum(CycleStatuses), nullable=False)
+  period_start = Column(Date, nullable=False)
+  period_end = Column(Date, nullable=False)
+  days_in_period = Column(Integer, nullable=False)
+  habits_total = Column(Integer, nullable=False)
+  entries_completed = Column(Integer, nullable=False)
+  completion_rate = Column(Float, nullable=False)
+  best_streak = Column(Integer, nullable=False)
+  days_active = Column(Integer, nullable=False)
+  first_entry_date = Column(Date, nullable=True)
+  last_entry_date = Column(Date, nullable=True)
+  computed_at = Column(DateTime, nullable=False, default=datetime.now)
+
+  habits: Mapped[List["HabitSnapshot"]] = relationship(
+    "HabitSnapshot",
+    order_by="HabitSnapshot.habit_id",
+    cascade="all, delete-orphan",
+    passive_deletes=True
+  )
+
+
+class HabitSnapshot(Base):
+  """Per-habit part of a CycleSnapshot"""
+  __tablename__ = "habit_snapshots"
+
+  habit_id = Column(Integer, ForeignKey('habits.id', ondelete='CASCADE'), primary_key=True)
+  cycle_id = Column(Integer, ForeignKey('cycle_snapshots.cycle_id', ondelete='CASCADE'), nullable=False)
+  name = Column(String(50), nullable=False)
+  entries_completed = Column(Integer, nullable=False)
+  completion_rate = Column(Float, nullable=False)
+  best_streak = Column(Integer, nullable=False)
+  days_active = Column(Integer, nullable=False)
+  first_entry_date = Column(Date, nullable=True)
+  last_entry_date = Column(Date, nullable=True)
+
+  __table_args__ = (
+    Index('idx_habit_snapshots_cycle', 'cycle_id'),
+  )
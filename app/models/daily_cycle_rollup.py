@@ -0,0 +1,23 @@
+from app.core.database import Base
+from sqlalchemy import Column, Integer, ForeignKey, Date, Index
+
+
+class DailyCycleRollup(Base):
+  """
+  Per-cycle, per-day completion counts.
+
+  Maintained incrementally when entries are logged, and rebuildable for any date range
+  (see RollupService), so reporting queries never scan habit_entries.
+  Only days with at least one completion have a row.
+  """
+  __tablename__ = "daily_cycle_rollups"
+
+  cycle_id = Column(Integer, ForeignKey('habit_cycles.id', ondelete='CASCADE'), primary_key=True)
+  day = Column(Date, primary_key=True)
+  user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+  habits_total = Column(Integer, nullable=False)
+  habits_completed = Column(Integer, nullable=False, default=0)
+
+  __table_args__ = (
+    Index('idx_rollups_user_day', 'user_id', 'day'),
+  )
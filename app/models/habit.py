@@ -1,6 +1,6 @@
 from typing import TYPE_CHECKING, List
 from app.core.database import Base
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, UniqueConstraint
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Date, UniqueConstraint
 from sqlalchemy.orm import relationship, Mapped
 from datetime import datetime
 
@@ -16,6 +16,11 @@ class Habit(Base):
   created_at = Column(DateTime, default=datetime.now)
   updated_at = Column(DateTime, nullable=False, default=datetime.now, onupdate=datetime.now)
 
+  # Streak counters, maintained on write by the entry paths in HabitService
+  current_streak = Column(Integer, nullable=False, default=0, server_default="0")
+  longest_streak = Column(Integer, nullable=False, default=0, server_default="0")
+  last_completed_date = Column(Date, nullable=True)
+
   habit_cycle: Mapped["HabitCycle"] = relationship("HabitCycle", back_populates="habits")
   habit_entries: Mapped[List["HabitEntry"]] = relationship("HabitEntry", back_populates="habit", order_by="HabitEntry.entry_date.desc()", cascade="all, delete-orphan")
 
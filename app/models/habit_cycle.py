@@ -51,6 +51,11 @@ class HabitCycle(Base):
       'idx_one_active_cycle_per_type',
       'user_id', 'cycle_type',
       unique=True,
-      postgresql_where=(Column('status') == 'ACTIVE')
+      postgresql_where=(Column('status') == 'ACTIVE'),
+      sqlite_where=(Column('status') == 'ACTIVE')
     ),
+    # 2. Keyset pagination of a user's cycles, newest first
+    Index('idx_user_cycles_created', 'user_id', 'created_at', 'id'),
+    # 3. Cycle scheduler scans for expired ACTIVE cycles by type and start time
+    Index('idx_cycles_status_type_started', 'status', 'cycle_type', 'started_at'),
   )
@@ -8,6 +8,10 @@ if TYPE_CHECKING:
     from ..models.habit import Habit
     
 class HabitEntry(Base):
+  # On PostgreSQL this table is range-partitioned by month on entry_date (migration
+  # 4b36dc295588, see PartitionManager) and its primary key there is (id, entry_date).
+  # id still comes from one sequence, so it stays unique and the ORM keys on it alone.
+  # Filter on entry_date where possible so the planner can skip old partitions.
   __tablename__ = "habit_entries"
 
   id = Column(Integer, primary_key=True, index=True)
@@ -0,0 +1,25 @@
+from app.core.database import Base
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Date, LargeBinary
+from datetime import datetime
+
+
+class HabitEntryArchive(Base):
+  """
+  All entries of one habit in a finished cycle, moved out of habit_entries.
+
+  Finished cycles never get new entries, so ArchiveService packs their history into
+  two date-indexed bitsets (see app.core.bitmap) starting at start_date: days with an
+  entry, and days completed. The hot table then only holds entries of open cycles.
+  Archived entries keep their date and completion but not their id or timestamps.
+  """
+  __tablename__ = "habit_entry_archives"
+
+  habit_id = Column(Integer, ForeignKey('habits.id', ondelete='CASCADE'), primary_key=True)
+  cycle_id = Column(Integer, ForeignKey('habit_cycles.id', ondelete='CASCADE'), nullable=False, index=True)
+  start_date = Column(Date, nullable=False)
+  day_count = Column(Integer, nullable=False)
+  logged_bitmap = Column(LargeBinary, nullable=False)
+  completed_bitmap = Column(LargeBinary, nullable=False)
+  entries_logged = Column(Integer, nullable=False)
+  entries_completed = Column(Integer, nullable=False)
+  archived_at = Column(DateTime, nullable=False, default=datetime.now)
@@ -1,15 +1,22 @@
 import logging
+from datetime import date, datetime
 from typing import List, Optional
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, Depends, Query, Request, Response, status
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_db, get_read_db
+from app.core.etag import ETAG_HEADER, has_conditional, etag_matches, make_etag, not_modified
+from app.core.pagination import decode_cursor, paginate
+from app.core.serialization import fast_json_enabled, list_response, model_columns
 from app.dependencies.auth import get_discord_user
-from app.services.habit_service import HabitService
-from ..schemas.habit import CycleResponse, CycleCreate, CycleListResponse
-from ..models import User, CycleStatuses
+from app.services.habit_service import HabitService, CYCLE_WITH_HABITS
+from ..schemas.habit import CycleResponse, CycleCreate, CycleListResponse, CycleDailyStatsResponse, CycleStatsResponse
+from ..models import User, HabitCycle, CycleStatuses
 
 logger = logging.getLogger(__name__)
 
+DEPRECATION_HEADER = "Deprecation"
+
 router = APIRouter(
     prefix="/cycles",
     tags=["cycles"],
@@ -19,11 +26,26 @@ router = APIRouter(
 
 @router.get("", response_model=List[CycleListResponse])
 def list_cycles(
+    request: Request,
+    response: Response,
     status: Optional[str] = Query(None, description="Filter by status: draft, active, completed, abandoned"),
-    db: Session = Depends(get_db),
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE, description="Page size"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    unpaged: bool = Query(
+        False,
+        deprecated=True,
+        description=f"Deprecated: return up to {settings.MAX_UNPAGED_CYCLES} cycles in one response, ignoring limit. Follow X-Next-Cursor instead."
+    ),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_discord_user)
 ):
-    """List user's habit cycles, optionally filtered by status."""
+    """
+    List user's habit cycles, newest first, optionally filtered by status.
+    Paginated: when more cycles exist, the X-Next-Cursor header holds the cursor for the next page.
+    `unpaged=true` is a deprecated migration window for callers that don't follow cursors yet;
+    it is still capped (MAX_UNPAGED_CYCLES) and the response carries a Deprecation header.
+    Sends an ETag; a request whose If-None-Match still matches gets an empty 304.
+    """
     habit_service = HabitService(db)
 
     # Convert status string to CycleStatuses enum if provided
@@ -35,26 +57,93 @@ def list_cycles(
         except ValueError:
             pass  # Invalid status - return all cycles
 
+    after = decode_cursor(cursor, datetime.fromisoformat, int) if cursor else None
+    if unpaged:
+        limit = settings.MAX_UNPAGED_CYCLES
+        response.headers[DEPRECATION_HEADER] = "true"
+    # One extra row tells whether there is a next page
+    fetch_limit = limit + 1
+
+    # Revalidation: one aggregate over the page instead of loading and encoding it
+    if has_conditional(request):
+        etag = make_etag(*habit_service.get_cycle_page_version(current_user.id, status_filter, fetch_limit, after))
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+    # Fast path: only CycleListResponse's columns, encoded without per-object validation
+    fast_json = fast_json_enabled(router)
     cycles = habit_service.get_cycles_for_user(
         user_id=current_user.id,
-        statuses=status_filter
+        statuses=status_filter,
+        limit=fetch_limit,
+        after=after,
+        columns=[*model_columns(CycleListResponse, HabitCycle), HabitCycle.updated_at] if fast_json else None
     )
+    response.headers[ETAG_HEADER] = make_etag(*HabitService.cycle_page_version(cycles))
 
-    return cycles
+    page = paginate(cycles, limit, lambda cycle: (cycle.created_at, cycle.id), response)
+    if fast_json:
+        return list_response(CycleListResponse, page, response)
+    return page
 
 
 @router.get("/{cycle_id}", response_model=CycleResponse)
 def get_cycle(
     cycle_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_discord_user)
 ):
-    """Get a specific cycle with all its habits."""
+    """
+    Get a specific cycle with all its habits.
+    Sends an ETag; a request whose If-None-Match still matches gets an empty 304.
+    """
     habit_service = HabitService(db)
-    cycle = habit_service._get_cycle(cycle_id, current_user.id)
+
+    # Revalidation: one aggregate query, habits aren't loaded
+    if has_conditional(request):
+        version = habit_service.get_cycle_version(current_user.id, cycle_id)
+        if version is not None and etag_matches(request, make_etag(*version)):
+            return not_modified(make_etag(*version))
+
+    cycle = habit_service._get_cycle(cycle_id, current_user.id, CYCLE_WITH_HABITS)
+    response.headers[ETAG_HEADER] = make_etag(*HabitService.cycle_version(cycle))
     return cycle
 
 
+@router.get("/{cycle_id}/stats", response_model=CycleStatsResponse)
+def get_cycle_stats(
+    cycle_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_discord_user)
+):
+    """
+    Summary stats for a cycle. Finished cycles are served from their frozen snapshot.
+    Uses the primary: a missing snapshot is written on first read.
+    """
+    habit_service = HabitService(db)
+    return habit_service.get_cycle_stats(user_id=current_user.id, cycle_id=cycle_id)
+
+
+@router.get("/{cycle_id}/daily", response_model=CycleDailyStatsResponse)
+def get_cycle_daily_stats(
+    cycle_id: int,
+    start: Optional[date] = Query(None, description="First day (defaults to the cycle's start)"),
+    end: Optional[date] = Query(None, description="Last day (defaults to today or the cycle's completion)"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_discord_user)
+):
+    """Completion rate per day for a cycle, served from the daily rollups."""
+    habit_service = HabitService(db)
+    return habit_service.get_cycle_daily_stats(
+        user_id=current_user.id,
+        cycle_id=cycle_id,
+        start=start,
+        end=end
+    )
+
+
 @router.post("/{cycle_id}/activate", response_model=CycleResponse)
 def activate_cycle(
     cycle_id: int,
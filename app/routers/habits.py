@@ -1,12 +1,15 @@
-from typing import Optional
+from typing import List, Optional, Union
 from datetime import date
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, Request, Response, status
 from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.dependencies.auth import get_discord_user
+from app.core.config import settings
+from app.core.database import get_db, get_read_db, pin_discord_users
+from app.core.pagination import decode_cursor, paginate
+from app.core.serialization import fast_json_enabled, list_response
+from app.dependencies.auth import get_current_user, get_discord_user
 from app.models.user import User
 from app.services.habit_service import HabitService
-from ..schemas.habit import HabitAdd, HabitResponse, HabitUpdate, EntryResponse
+from ..schemas.habit import HabitAdd, HabitResponse, HabitUpdate, EntryResponse, CompletionBitmapResponse, HistoryFormat, StreakResponse, BatchEntryRequest, BatchEntryResult
 
 router = APIRouter(
     prefix="/habits",
@@ -18,7 +21,7 @@ router = APIRouter(
 @router.get("/{habit_id}/entries/today", response_model=Optional[EntryResponse])
 def get_today_entry(
     habit_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_discord_user)
 ):
     """
@@ -35,6 +38,59 @@ def get_today_entry(
     return entry
 
 
+@router.get("/{habit_id}/entries", response_model=Union[List[EntryResponse], CompletionBitmapResponse])
+def list_entries(
+    habit_id: int,
+    response: Response,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    format: HistoryFormat = Query(HistoryFormat.ENTRIES, description="entries, or bitmap for a compact bitset of completed days"),
+    start: Optional[date] = Query(None, description="bitmap only: first day (defaults to the first completion)"),
+    end: Optional[date] = Query(None, description="bitmap only: last day (defaults to the last completion)"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_discord_user)
+):
+    """
+    Entry history for a habit, newest first.
+    Paginated: when more entries exist, the X-Next-Cursor header holds the cursor for the next page.
+    With format=bitmap, returns the completed days between start and end as one base64 bitset instead.
+    """
+    habit_service = HabitService(db)
+    if format == HistoryFormat.BITMAP:
+        return habit_service.get_completion_bitmap(
+            user_id=current_user.id,
+            habit_id=habit_id,
+            start=start,
+            end=end
+        )
+
+    entries = habit_service.get_entries_for_habit(
+        user_id=current_user.id,
+        habit_id=habit_id,
+        limit=limit + 1,
+        before=decode_cursor(cursor, date.fromisoformat)[0] if cursor else None
+    )
+    page = paginate(entries, limit, lambda entry: (entry.entry_date,), response)
+    if fast_json_enabled(router):
+        return list_response(EntryResponse, page, response)
+    return page
+
+
+@router.get("/{habit_id}/streak", response_model=StreakResponse)
+def get_streak(
+    habit_id: int,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_discord_user)
+):
+    """Current and longest completion streak for a habit."""
+    habit_service = HabitService(db)
+    return habit_service.get_streak(
+        user_id=current_user.id,
+        habit_id=habit_id,
+        today=date.today()
+    )
+
+
 @router.post("", response_model=HabitResponse, status_code=status.HTTP_201_CREATED)
 def add_habit(
     new_habit: HabitAdd,
@@ -97,3 +153,23 @@ def log_habit_complete(
         completed=True
     )
     return entry
+
+
+@router.post("/entries:batch", response_model=List[BatchEntryResult])
+def log_entries_batch(
+    batch: BatchEntryRequest,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Log today's entries for many Discord users' habits in one request.
+    Used by the Discord bot to flush reactions in bursts.
+    Each item gets its own status; conflicts don't abort the rest of the batch.
+    """
+    habit_service = HabitService(db)
+    results = habit_service.add_entries_batch(batch.entries)
+
+    # The follow-up reads carry ?discord_user_id=; pin each user the batch wrote for
+    pin_discord_users(request, (item.discord_user_id for item in batch.entries))
+    return results
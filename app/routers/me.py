@@ -0,0 +1,32 @@
+from datetime import date
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from app.core.database import get_read_db
+from app.dependencies.auth import get_discord_user
+from app.models.user import User
+from app.services.habit_service import HabitService
+from ..schemas.habit import TodayBoardResponse
+
+router = APIRouter(
+    prefix="/me",
+    tags=["me"],
+    dependencies=[]
+)
+
+
+@router.get("/today", response_model=TodayBoardResponse)
+def get_today_board(
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_discord_user)
+):
+    """
+    Every habit in the user's active cycles with today's entry (null if not logged yet).
+    Used by Discord bot to check completion status in one call.
+    """
+    habit_service = HabitService(db)
+    today = date.today()
+    cycles = habit_service.get_today_board(
+        user_id=current_user.id,
+        entry_date=today
+    )
+    return {"date": today, "cycles": cycles}
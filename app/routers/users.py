@@ -0,0 +1,41 @@
+from datetime import date
+from typing import Iterator
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from app.core.database import get_read_db
+from app.dependencies.auth import get_current_user
+from app.models.user import User
+from app.services.habit_service import HabitService
+from ..schemas.habit import UserStatusRequest, UserStatusResponse
+
+router = APIRouter(
+    prefix="/users",
+    tags=["users"],
+    dependencies=[]
+)
+
+
+@router.post("/status")
+def get_users_status(
+    request: UserStatusRequest,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Today's status for many Discord users, streamed as newline-delimited JSON.
+    Each line is a UserStatusResponse. Used by Discord bot for guild-wide summaries.
+    """
+    habit_service = HabitService(db)
+    today = date.today()
+
+    def stream() -> Iterator[bytes]:
+        # The response outlives the request's dependencies, so release the session here
+        try:
+            for discord_user_id, user_id, cycles in habit_service.iter_today_status(request.discord_user_ids, today):
+                line = UserStatusResponse(discord_user_id=discord_user_id, user_id=user_id, cycles=cycles)
+                yield line.model_dump_json().encode() + b"\n"
+        finally:
+            db.close()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
@@ -1,6 +1,8 @@
 from typing import List, Optional
+from enum import Enum as PyEnum
 from pydantic import BaseModel, Field, ConfigDict
 from datetime import datetime, date
+from app.core.config import settings
 from app.models.habit_cycle import CycleTypes, CycleStatuses
 
 # =============== REQUEST MODELS ===============
@@ -20,6 +22,14 @@ class CycleCreate(BaseModel):
 class CycleUpdate(BaseModel):
   name: Optional[str] = None
   cycle_type: CycleTypes
+
+class BatchEntryItem(BaseModel):
+  discord_user_id: str
+  habit_id: int
+  completed: bool = True
+
+class BatchEntryRequest(BaseModel):
+  entries: List[BatchEntryItem] = Field(..., min_length=1, max_length=settings.MAX_BATCH_ENTRIES)
   
 
 # =============== RESPONSE MODELS ===============
@@ -32,6 +42,12 @@ class HabitResponse(BaseModel):
   created_at: datetime
   updated_at: datetime
 
+class StreakResponse(BaseModel):
+  habit_id: int
+  current_streak: int
+  longest_streak: int
+  last_completed_date: Optional[date]
+
 class CycleResponse(BaseModel):
   model_config = ConfigDict(from_attributes=True)
   id: int
@@ -58,10 +74,110 @@ class CycleListResponse(BaseModel):
 
 class EntryResponse(BaseModel):
   model_config = ConfigDict(from_attributes=True)
-  id: int
+  id: Optional[int]  # None for archived entries of finished cycles, as are the timestamps
   habit_id: int
   entry_date: date
   completed: bool
   completed_at: Optional[datetime]
-  created_at: datetime
-  habit: HabitResponse
\ No newline at end of file
+  created_at: Optional[datetime]
+  habit: HabitResponse
+
+class EntrySummaryResponse(BaseModel):
+  """Entry without its nested habit, for responses that already group by habit"""
+  model_config = ConfigDict(from_attributes=True)
+  id: int
+  entry_date: date
+  completed: bool
+  completed_at: Optional[datetime]
+
+class HistoryFormat(str, PyEnum):
+  ENTRIES = 'entries'
+  BITMAP = 'bitmap'
+
+class CompletionBitmapResponse(BaseModel):
+  """
+  Completed days of a habit as a bitset: bit i is start_date + i days, least significant
+  bit of each byte first (see app.core.bitmap), base64 encoded. A year is ~60 characters.
+  """
+  habit_id: int
+  start_date: date
+  end_date: date
+  days: int
+  completed: str
+
+class TodayHabitResponse(BaseModel):
+  id: int
+  name: str
+  entry: Optional[EntrySummaryResponse]
+
+class TodayCycleResponse(BaseModel):
+  id: int
+  name: str
+  cycle_type: CycleTypes
+  habits: List[TodayHabitResponse]
+
+class TodayBoardResponse(BaseModel):
+  date: date
+  cycles: List[TodayCycleResponse]
+
+class DailyCompletionResponse(BaseModel):
+  day: date
+  habits_total: int
+  habits_completed: int
+  completion_rate: float
+
+class CycleDailyStatsResponse(BaseModel):
+  cycle_id: int
+  start: date
+  end: date
+  completion_rate: float
+  days: List[DailyCompletionResponse]
+
+class HabitStatsResponse(BaseModel):
+  model_config = ConfigDict(from_attributes=True)
+  habit_id: int
+  name: str
+  entries_completed: int
+  completion_rate: float
+  best_streak: int
+  days_active: int
+  first_entry_date: Optional[date]
+  last_entry_date: Optional[date]
+
+class CycleStatsResponse(BaseModel):
+  model_config = ConfigDict(from_attributes=True)
+  cycle_id: int
+  status: CycleStatuses
+  period_start: date
+  period_end: date
+  days_in_period: int
+  habits_total: int
+  entries_completed: int
+  completion_rate: float
+  best_streak: int
+  days_active: int
+  first_entry_date: Optional[date]
+  last_entry_date: Optional[date]
+  computed_at: datetime
+  habits: List[HabitStatsResponse]
+
+class UserStatusRequest(BaseModel):
+  discord_user_ids: List[str] = Field(..., min_length=1)
+
+class UserStatusResponse(BaseModel):
+  discord_user_id: str
+  user_id: Optional[int]
+  cycles: List[TodayCycleResponse]
+
+class BatchEntryStatus(str, PyEnum):
+  CREATED = 'created'
+  CONFLICT = 'conflict'
+  NOT_FOUND = 'not_found'
+  INVALID = 'invalid'
+
+class BatchEntryResult(BaseModel):
+  discord_user_id: str
+  habit_id: int
+  status: BatchEntryStatus
+  entry_id: Optional[int] = None
+  message: Optional[str] = None
@@ -0,0 +1,138 @@
+from datetime import date, datetime, timedelta
+from itertools import groupby
+from typing import Dict, List, Optional
+from sqlalchemy import select, delete, exists, func
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+from app.core.bitmap import encode_days, decode_days
+from app.core.config import settings
+from ..models import Habit, HabitCycle, HabitEntry, HabitEntryArchive, CycleSnapshot
+from app.services.snapshot_service import SnapshotService, FINISHED_STATUSES, SNAPSHOT_CYCLE_COLUMNS
+from app.services.entity_cache import entity_cache, user_tag, cycle_tag
+
+"""
+Cold storage for entries of finished cycles (habit_entry_archives).
+
+COMPLETED and ABANDONED cycles never get new entries, so archive_finished() moves
+their entries out of habit_entries in batches, one bitmap row per habit. A cycle is
+archived in a single transaction, after its stats snapshot exists, so a habit's
+history is either all hot or all archived. HabitService reads fall back to the
+archive for habits of finished cycles.
+"""
+
+
+class ArchiveService:
+  def __init__(self, db: Session):
+    self.db = db
+
+  def archive_finished(
+    self,
+    batch_size: int = settings.ARCHIVE_BATCH_SIZE,
+    older_than_days: int = settings.ARCHIVE_AFTER_DAYS,
+    max_batches: Optional[int] = None
+  ) -> int:
+    """
+    Archive entries of cycles that finished more than `older_than_days` ago, committing
+    per batch of `batch_size` cycles. Returns the number of entries moved.
+    """
+    cutoff = datetime.now() - timedelta(days=older_than_days)
+    has_entries = (
+      exists()
+      .where(HabitEntry.habit_id == Habit.id, Habit.habit_cycle_id == HabitCycle.id)
+    )
+
+    moved = 0
+    batches = 0
+    last_id = 0
+    while max_batches is None or batches < max_batches:
+      cycles = self.db.execute(
+        select(*SNAPSHOT_CYCLE_COLUMNS, CycleSnapshot.cycle_id.label("snapshot_id"))
+        .outerjoin(CycleSnapshot, CycleSnapshot.cycle_id == HabitCycle.id)
+        .where(
+          HabitCycle.id > last_id,
+          HabitCycle.status.in_(FINISHED_STATUSES),
+          func.coalesce(HabitCycle.completed_at, HabitCycle.updated_at) < cutoff,
+          has_entries
+        )
+        .order_by(HabitCycle.id)
+        .limit(batch_size)
+      ).all()
+      if not cycles:
+        break
+
+      moved += self._archive_batch(cycles)
+      self.db.commit()
+      batches += 1
+      last_id = cycles[-1].id
+
+    return moved
+
+  def get_archive(self, habit_id: int) -> Optional[HabitEntryArchive]:
+    return self.db.get(HabitEntryArchive, habit_id)
+
+  def archived_entries(self, archive: HabitEntryArchive, habit: Habit) -> List[HabitEntry]:
+    """
+    The archived history as transient HabitEntry objects, newest first. They are never
+    added to the session; id, completed_at and created_at weren't kept and are None.
+    """
+    entries = []
+    for entry_date, completed in sorted(self._archived_days(archive).items(), reverse=True):
+      entry = HabitEntry(habit_id=archive.habit_id, entry_date=entry_date, completed=completed)
+      # Without triggering the backref, which would cascade the entry into the session
+      set_committed_value(entry, "habit", habit)
+      entries.append(entry)
+    return entries
+
+  def _archive_batch(self, cycles) -> int:
+    # Stats must be frozen before the entries they're computed from move
+    SnapshotService(self.db).snapshot_cycles([cycle for cycle in cycles if cycle.snapshot_id is None])
+
+    cycle_ids = [cycle.id for cycle in cycles]
+    habit_ids = select(Habit.id).where(Habit.habit_cycle_id.in_(cycle_ids))
+    rows = self.db.execute(
+      select(Habit.id, Habit.habit_cycle_id, HabitEntry.entry_date, HabitEntry.completed)
+      .join(HabitEntry, HabitEntry.habit_id == Habit.id)
+      .where(Habit.habit_cycle_id.in_(cycle_ids))
+      .order_by(Habit.id, HabitEntry.entry_date)
+    ).all()
+
+    # A late write to a finished cycle (or an interrupted run) can leave hot entries
+    # for a habit that is already archived: merge them in, the hot row winning
+    existing = {
+      archive.habit_id: archive
+      for archive in self.db.scalars(select(HabitEntryArchive).where(HabitEntryArchive.habit_id.in_(habit_ids)))
+    }
+
+    for (habit_id, cycle_id), group in groupby(rows, key=lambda row: (row[0], row[1])):
+      days = self._archived_days(existing[habit_id]) if habit_id in existing else {}
+      days.update((row.entry_date, row.completed) for row in group)
+      archive = existing.get(habit_id) or HabitEntryArchive(habit_id=habit_id, cycle_id=cycle_id)
+      self._pack(archive, days)
+      self.db.add(archive)
+    self.db.flush()
+
+    self.db.execute(
+      delete(HabitEntry)
+      .where(HabitEntry.habit_id.in_(habit_ids))
+      .execution_options(synchronize_session=False)
+    )
+    # Cached entries (and "no entry" results) of these habits now live in the archive
+    entity_cache.invalidate(self.db, *(tag for cycle in cycles for tag in (user_tag(cycle.user_id), cycle_tag(cycle.id))))
+    return len(rows)
+
+  def _archived_days(self, archive: HabitEntryArchive) -> Dict[date, bool]:
+    completed = set(decode_days(archive.start_date, archive.completed_bitmap))
+    return {day: day in completed for day in decode_days(archive.start_date, archive.logged_bitmap)}
+
+  def _pack(self, archive: HabitEntryArchive, days: Dict[date, bool]) -> None:
+    """Fill the archive's bitmaps and counters from {entry_date: completed}"""
+    start = min(days)
+    day_count = (max(days) - start).days + 1
+    completed = [day for day, done in days.items() if done]
+    archive.start_date = start
+    archive.day_count = day_count
+    archive.logged_bitmap = encode_days(start, days, day_count)
+    archive.completed_bitmap = encode_days(start, completed, day_count)
+    archive.entries_logged = len(days)
+    archive.entries_completed = len(completed)
+    archive.archived_at = datetime.now()
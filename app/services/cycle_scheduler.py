@@ -0,0 +1,206 @@
+import asyncio
+import calendar
+import logging
+import time
+from contextlib import suppress
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from sqlalchemy import select, update, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import engine as default_engine
+from ..models import HabitCycle, CycleStatuses, CycleTypes
+from app.services.snapshot_service import SnapshotService, SNAPSHOT_CYCLE_COLUMNS
+from app.services.entity_cache import entity_cache, user_tag, cycle_tag
+
+"""
+Background scheduler that moves ACTIVE cycles to COMPLETED once their period is over.
+
+A cycle's period runs from started_at for one day, week, month or year depending on its
+cycle_type. Each run completes expired cycles with chunked bulk UPDATEs (one commit per
+chunk, which also writes the chunk's final stats snapshots) instead of per-row ORM
+commits. Runs are idempotent, since only ACTIVE rows are touched. On PostgreSQL an advisory lock makes sure only one node does the work at a time.
+"""
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary application-wide key for pg_try_advisory_lock
+ADVISORY_LOCK_KEY = 0x6379636C65
+
+
+def add_months(value: datetime, months: int) -> datetime:
+  """Shift by whole calendar months, clamping the day (Jan 31 + 1 month -> Feb 28/29)"""
+  month_index = value.month - 1 + months
+  year, month = value.year + month_index // 12, month_index % 12 + 1
+  day = min(value.day, calendar.monthrange(year, month)[1])
+  return value.replace(year=year, month=month, day=day)
+
+
+def period_end(started_at: datetime, cycle_type: CycleTypes) -> datetime:
+  if cycle_type == CycleTypes.DAILY:
+    return started_at + timedelta(days=1)
+  if cycle_type == CycleTypes.WEEKLY:
+    return started_at + timedelta(weeks=1)
+  if cycle_type == CycleTypes.MONTHLY:
+    return add_months(started_at, 1)
+  return add_months(started_at, 12)
+
+
+def expiry_cutoff(now: datetime, cycle_type: CycleTypes) -> datetime:
+  """
+  Latest started_at of a cycle of this type whose period can have ended by `now`.
+
+  Exact for days and weeks. Month-based periods clamp the day (Jan 31 + 1 month is
+  Feb 28), so no single cutoff matches period_end: when `now` is a month end or the
+  cutoff got clamped, it covers the rest of that month and period_end decides per cycle.
+  """
+  if cycle_type == CycleTypes.DAILY:
+    return now - timedelta(days=1)
+  if cycle_type == CycleTypes.WEEKLY:
+    return now - timedelta(weeks=1)
+
+  cutoff = add_months(now, -1 if cycle_type == CycleTypes.MONTHLY else -12)
+  if cutoff.day != now.day or now.day == calendar.monthrange(now.year, now.month)[1]:
+    last_day = calendar.monthrange(cutoff.year, cutoff.month)[1]
+    cutoff = cutoff.replace(day=last_day, hour=23, minute=59, second=59, microsecond=999999)
+  return cutoff
+
+
+def _naive_utc(value: datetime) -> datetime:
+  """started_at is a naive UTC column; compare against it without tzinfo"""
+  return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+
+@dataclass
+class SchedulerRunStats:
+  locked: bool = True
+  batches: int = 0
+  duration_seconds: float = 0.0
+  completed_cycle_ids: List[int] = field(default_factory=list)
+
+  @property
+  def cycles_completed(self) -> int:
+    return len(self.completed_cycle_ids)
+
+  @property
+  def cycles_per_second(self) -> float:
+    return self.cycles_completed / self.duration_seconds if self.duration_seconds else 0.0
+
+
+class CycleScheduler:
+  def __init__(self, engine: Engine = default_engine, batch_size: int = settings.CYCLE_SCHEDULER_BATCH_SIZE):
+    self.engine = engine
+    self.batch_size = batch_size
+
+  def run_once(self, now: Optional[datetime] = None) -> SchedulerRunStats:
+    """Complete every expired ACTIVE cycle. Safe to call concurrently from several nodes."""
+    now = now or datetime.now(timezone.utc)
+    stats = SchedulerRunStats()
+    started = time.perf_counter()
+
+    # One connection for the whole run so a session-level advisory lock survives the
+    # per-chunk commits
+    with self.engine.connect() as connection:
+      if not self._try_lock(connection):
+        stats.locked = False
+        logger.info("Cycle scheduler run skipped: another node holds the lock")
+        return stats
+
+      try:
+        db = Session(bind=connection, expire_on_commit=False)
+        try:
+          for cycle_type in CycleTypes:
+            self._complete_expired(db, cycle_type, now, stats)
+        except Exception:
+          db.rollback()
+          raise
+        finally:
+          db.close()
+      finally:
+        # An aborted transaction would make the unlock fail too, masking the error
+        # and leaving the lock held on a pooled connection
+        connection.rollback()
+        self._unlock(connection)
+
+    stats.duration_seconds = time.perf_counter() - started
+    logger.info(
+      f"Cycle scheduler completed {stats.cycles_completed} cycles in {stats.batches} batches "
+      f"({stats.duration_seconds:.3f}s, {stats.cycles_per_second:.1f} cycles/s)"
+    )
+    return stats
+
+  async def run_forever(self, interval_seconds: float) -> None:
+    """
+    Run on an interval inside the app's event loop; database work happens in a thread.
+    Cancelling waits for a run in progress to finish (and release the lock) first.
+    """
+    while True:
+      run = asyncio.ensure_future(asyncio.to_thread(self.run_once))
+      try:
+        await asyncio.shield(run)
+      except asyncio.CancelledError:
+        with suppress(Exception):
+          await run
+        raise
+      except Exception:
+        logger.exception("Cycle scheduler run failed")
+      await asyncio.sleep(interval_seconds)
+
+  def _complete_expired(self, db: Session, cycle_type: CycleTypes, now: datetime, stats: SchedulerRunStats) -> None:
+    cutoff = expiry_cutoff(now, cycle_type)
+    last_id = 0
+
+    while True:
+      candidates = db.execute(
+        select(HabitCycle.id, HabitCycle.started_at)
+        .where(
+          HabitCycle.status == CycleStatuses.ACTIVE,
+          HabitCycle.cycle_type == cycle_type,
+          HabitCycle.started_at <= cutoff,
+          HabitCycle.id > last_id
+        )
+        .order_by(HabitCycle.id)
+        .limit(self.batch_size)
+      ).all()
+      if not candidates:
+        return
+      last_id = candidates[-1].id
+
+      # Near month ends the cutoff is wider than the period; period_end has the final say
+      expired_ids = [
+        cycle.id for cycle in candidates
+        if _naive_utc(period_end(cycle.started_at, cycle_type)) <= _naive_utc(now)
+      ]
+      if expired_ids:
+        completed = db.execute(
+          update(HabitCycle)
+          .where(HabitCycle.id.in_(expired_ids), HabitCycle.status == CycleStatuses.ACTIVE)
+          .values(status=CycleStatuses.COMPLETED, completed_at=now)
+          .returning(*SNAPSHOT_CYCLE_COLUMNS)
+          .execution_options(synchronize_session=False)
+        ).all()
+        # Freeze final stats in the same transaction as the status change
+        SnapshotService(db).snapshot_cycles(completed)
+        entity_cache.invalidate(db, *(tag for cycle in completed for tag in (user_tag(cycle.user_id), cycle_tag(cycle.id))))
+        db.commit()
+
+        stats.batches += 1
+        stats.completed_cycle_ids.extend(cycle.id for cycle in completed)
+
+      if len(candidates) < self.batch_size:
+        return
+
+  def _try_lock(self, connection) -> bool:
+    if connection.dialect.name != "postgresql":
+      return True  # Single-node dev/test databases
+    locked = connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": ADVISORY_LOCK_KEY}).scalar()
+    connection.commit()
+    return bool(locked)
+
+  def _unlock(self, connection) -> None:
+    if connection.dialect.name != "postgresql":
+      return
+    connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": ADVISORY_LOCK_KEY})
+    connection.commit()
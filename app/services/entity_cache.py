@@ -0,0 +1,151 @@
+import pickle
+from typing import Any, Callable, Iterable, Set
+from sqlalchemy import event, inspect
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+from app.core.cache import CacheBackend, MemoryBackend, NullBackend
+from app.core.config import settings
+from app.core.database import REPLICA_SESSION
+from app.core.metrics import CACHE_HITS, CACHE_MISSES, CACHE_EVICTIONS, CACHE_HIT_RATIO
+from app.core.resp import RespBackend, RespClient
+from app.models import Habit, HabitCycle, HabitEntry
+
+"""
+Read-through cache for HabitService lookups (cycles, habits, entries by date).
+
+Loaded values are pickled into a CacheBackend: an in-process LRU + TTL by default, or
+a Redis-protocol server shared by every worker (settings.ENTITY_CACHE_BACKEND). On a
+hit, ORM objects are merged into the caller's session with load=False, so they are
+persistent and usable as if just queried, without any SQL.
+
+Every value is stored under tags: the user and cycle it belongs to and the habits it
+holds. Writers queue tag invalidations on their session; they are applied once the
+transaction commits (like the identity cache) and dropped if it rolls back. A session
+with queued invalidations bypasses the cache, so a transaction never caches (or reads
+around) its own uncommitted writes.
+
+A fill can race a write: the loader's SELECT runs before another session commits,
+and its result arrives after that commit's invalidation. The backend's version is
+read before loading and the result is only stored if none of its tags were
+invalidated since.
+
+Only primary sessions fill the cache. A replica read can land after a commit's
+invalidation and still return the pre-commit state; cached, that would outlive the
+replica lag by the whole TTL and be served to the writer's own primary-pinned reads.
+Replica sessions still get hits.
+"""
+
+_PENDING_KEY = "entity_cache_invalidations"
+
+
+def user_tag(user_id: int) -> str:
+  return f"user:{user_id}"
+
+
+def cycle_tag(cycle_id: int) -> str:
+  return f"cycle:{cycle_id}"
+
+
+def habit_tag(habit_id: int) -> str:
+  return f"habit:{habit_id}"
+
+
+def tags_of(value: Any) -> Set[str]:
+  """Tags for the objects in a loaded value, following only relationships already loaded"""
+  tags = set()
+  for obj in value if isinstance(value, list) else [value]:
+    if isinstance(obj, HabitCycle):
+      tags.update((user_tag(obj.user_id), cycle_tag(obj.id)))
+      tags.update(habit_tag(habit.id) for habit in obj.__dict__.get("habits", ()))
+    elif isinstance(obj, Habit):
+      tags.update((habit_tag(obj.id), cycle_tag(obj.habit_cycle_id)))
+      cycle = obj.__dict__.get("habit_cycle")
+      if cycle is not None:
+        tags.add(user_tag(cycle.user_id))
+    elif isinstance(obj, HabitEntry):
+      tags.add(habit_tag(obj.habit_id))
+  return tags
+
+
+class EntityCache:
+  def __init__(self, backend: CacheBackend):
+    self.backend = backend
+
+  def get_or_load(self, db: Session, key: str, loader: Callable[[], Any], tags: Iterable[str] = ()) -> Any:
+    """
+    The value cached under `key`, attached to `db`; otherwise loader()'s result, which
+    is stored under `tags` plus the tags of what it holds.
+    None and column rows are cached too; transient objects (archived entries) are not,
+    and neither is anything loaded from a read replica.
+    """
+    if self._bypass(db):
+      return loader()
+
+    data = self.backend.get(key)
+    if data is not None:
+      return self._attach(db, pickle.loads(data))
+
+    version = self.backend.version()
+    value = loader()
+    if version is not None and not db.info.get(REPLICA_SESSION) and self._cacheable(value):
+      self.backend.set(key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), set(tags) | tags_of(value), version)
+    return value
+
+  def invalidate(self, db: Session, *tags: str) -> None:
+    """Drop everything stored under `tags` once `db` commits"""
+    db.info.setdefault(_PENDING_KEY, {}).setdefault(self, set()).update(tags)
+
+  def clear(self) -> None:
+    self.backend.clear()
+
+  def stats(self) -> dict:
+    return self.backend.stats()
+
+  def _bypass(self, db: Session) -> bool:
+    return bool(db.info.get(_PENDING_KEY) or db.new or db.dirty or db.deleted)
+
+  def _attach(self, db: Session, value: Any) -> Any:
+    if isinstance(value, list):
+      return [self._attach(db, item) for item in value]
+    if value is None or isinstance(value, Row):
+      return value
+    return db.merge(value, load=False)
+
+  def _cacheable(self, value: Any) -> bool:
+    if isinstance(value, list):
+      return all(self._cacheable(item) for item in value)
+    if value is None or isinstance(value, Row):
+      return True
+    return inspect(value).persistent
+
+
+def build_backend() -> CacheBackend:
+  backend = settings.ENTITY_CACHE_BACKEND
+  if backend == "memory":
+    return MemoryBackend(settings.ENTITY_CACHE_MAXSIZE, settings.ENTITY_CACHE_TTL_SECONDS)
+  if backend == "redis":
+    if not settings.ENTITY_CACHE_URL:
+      raise ValueError("ENTITY_CACHE_URL is required when ENTITY_CACHE_BACKEND is 'redis'")
+    return RespBackend(RespClient(settings.ENTITY_CACHE_URL), settings.ENTITY_CACHE_TTL_SECONDS)
+  if backend == "none":
+    return NullBackend()
+  raise ValueError(f"Unknown ENTITY_CACHE_BACKEND: {backend}")
+
+
+entity_cache = EntityCache(build_backend())
+
+CACHE_HITS.set_function(lambda: entity_cache.stats()["hits"], cache="entity")
+CACHE_MISSES.set_function(lambda: entity_cache.stats()["misses"], cache="entity")
+CACHE_EVICTIONS.set_function(lambda: entity_cache.stats()["evictions"], cache="entity")
+CACHE_HIT_RATIO.set_function(lambda: entity_cache.stats()["hit_ratio"], cache="entity")
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_invalidations(session: Session) -> None:
+  for cache, tags in session.info.pop(_PENDING_KEY, {}).items():
+    cache.backend.invalidate(tags)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_invalidations(session: Session) -> None:
+  session.info.pop(_PENDING_KEY, None)
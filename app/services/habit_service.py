@@ -1,208 +1,523 @@
-from typing import List, Optional
+import base64
+from collections import Counter
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
 import logging
-from sqlalchemy.orm import Session
+from sqlalchemy import select, insert, update, literal, func, and_, or_
+from sqlalchemy.orm import Session, selectinload, joinedload, aliased
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy.exc import IntegrityError
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+from app.core.bitmap import encode_days, decode_days
 from app.core.config import settings
+from app.core.database import dialect_insert
 from app.core.exceptions import NotFoundError, ValidationError, ConflictError
-from ..models import HabitEntry, Habit, HabitCycle, CycleStatuses, CycleTypes
-from app.schemas.habit import HabitUpdate
+from ..models import HabitEntry, Habit, HabitCycle, CycleStatuses, CycleTypes, AuthProvider, Providers, CycleSnapshot
+from app.schemas.habit import HabitUpdate, BatchEntryItem, BatchEntryResult, BatchEntryStatus
+from app.services.streak_service import Streak, StreakService
+from app.services.rollup_service import RollupService
+from app.services.snapshot_service import SnapshotService, FINISHED_STATUSES
+from app.services.archive_service import ArchiveService
+from app.services.entity_cache import EntityCache, entity_cache, user_tag, cycle_tag, habit_tag
 from datetime import date
 
 """
 Habit service layer that contains all the business logic pertaining to habit cycle management, CRUD operations for habits, and habit entries
 """
+
+# Loading profiles: loader options read methods accept so that callers (usually
+# routers, per endpoint) can fill their response model in a fixed number of queries
+# instead of lazy loading one relationship per row.
+CYCLE_WITH_HABITS = (selectinload(HabitCycle.habits),)
+HABIT_WITH_CYCLE = (joinedload(Habit.habit_cycle),)
+
 class HabitService:
-  def __init__(self, db: Session):
+  def __init__(self, db: Session, cache: Optional[EntityCache] = None):
     self.db = db
+    # Read-through cache for _get_cycle, _get_habit, get_cycles_for_user and
+    # get_entry_for_date; every write below invalidates the user's and cycle's tags
+    self.cache = cache or entity_cache
 
   # ============== CYCLE MANAGEMENT ================
   def create_cycle(self, user_id: int, name: str, cycle_type: CycleTypes) -> HabitCycle:
-    # Check if user already has an active cycle of that type
-    existing_active_cycle = self.db.query(HabitCycle).filter(
+    # Insert only if user doesn't already have an active cycle of that type.
+    # INSERT ... SELECT ... WHERE NOT EXISTS ... RETURNING: one round trip, no refresh.
+    existing_active_cycle = select(HabitCycle.id).where(
       HabitCycle.user_id == user_id,
       HabitCycle.cycle_type == cycle_type,
       HabitCycle.status == CycleStatuses.ACTIVE
-    ).first()
+    ).exists()
+
+    stmt = (
+      insert(HabitCycle)
+      .from_select(
+        ["user_id", "cycle_type", "name"],
+        select(
+          literal(user_id),
+          literal(cycle_type, HabitCycle.cycle_type.type),
+          literal(name)
+        ).where(~existing_active_cycle)
+      )
+      .returning(HabitCycle)
+    )
+    new_cycle = self.db.scalars(stmt).first()
 
-    if existing_active_cycle:
+    if new_cycle is None:
       raise ConflictError(f"Active {cycle_type.value} cycle already exists")
 
-    # Create new habit cycle
-    new_cycle = HabitCycle(
-      user_id=user_id,
-      cycle_type=cycle_type,
-      name=name
-    )
-
-    # Add to DB
-    self.db.add(new_cycle)
+    # A new cycle has no habits; mark the collection loaded so serializing it doesn't query
+    set_committed_value(new_cycle, "habits", [])
+    self._invalidate(user_id, new_cycle.id)
     self.db.commit()
-    self.db.refresh(new_cycle)
 
     return new_cycle
 
-  def get_cycles_for_user(self, user_id: int, statuses: Optional[List[CycleStatuses]] = None) -> List[HabitCycle]:
-    filters = [ HabitCycle.user_id == user_id ]
+  def get_cycles_for_user(
+    self,
+    user_id: int,
+    statuses: Optional[List[CycleStatuses]] = None,
+    options: Sequence = (),
+    limit: Optional[int] = None,
+    after: Optional[Tuple[datetime, int]] = None,
+    columns: Optional[Sequence] = None
+  ) -> List[HabitCycle]:
+    """
+    User's cycles, newest first, ordered by (created_at, id).
+    Pass `after` (the sort key of the last cycle seen) and `limit` to page with a keyset.
+    Pass `columns` to get column-only rows instead of HabitCycle objects (options are ignored).
+    """
+    query = self.db.query(*columns) if columns else self.db.query(HabitCycle).options(*options)
+    key = self._cache_key(
+      "cycles", () if columns else options, user_id,
+      ",".join(status.value for status in statuses) if statuses is not None else "*",
+      limit, after and f"{after[0].isoformat()},{after[1]}",
+      ",".join(column.key for column in columns) if columns else ""
+    )
 
-    if statuses is not None:
-      filters.append(HabitCycle.status.in_(statuses))
-    
-    cycles = self.db.query(HabitCycle).filter(*filters).all()
+    return self._cached(
+      key,
+      lambda: (
+        query
+        .filter(*self._cycle_list_filters(user_id, statuses, after))
+        .order_by(HabitCycle.created_at.desc(), HabitCycle.id.desc())
+        .limit(limit)
+        .all()
+      ),
+      user_tag(user_id)
+    )
 
-    return cycles
+  # Versions for conditional GETs (ETags). Each has a query form that reads only
+  # aggregates, and a form computed from the loaded rows that yields the same tuple.
 
-  def activate_cycle(self, user_id: int, cycle_id: int) -> HabitCycle:
-    min_habits_required_to_start_cycle = settings.MIN_HABITS_REQUIRED_TO_START_CYCLE
+  def get_cycle_version(self, user_id: int, cycle_id: int) -> Optional[tuple]:
+    """
+    The cycle's version without loading its habits: one aggregate query.
+    None if the cycle isn't the user's.
+    """
+    row = self.db.execute(
+      select(HabitCycle.id, HabitCycle.updated_at, func.count(Habit.id), func.max(Habit.updated_at))
+      .outerjoin(Habit, Habit.habit_cycle_id == HabitCycle.id)
+      .where(HabitCycle.id == cycle_id, HabitCycle.user_id == user_id)
+      .group_by(HabitCycle.id, HabitCycle.updated_at)
+    ).first()
+    return tuple(row) if row is not None else None
+
+  @staticmethod
+  def cycle_version(cycle: HabitCycle) -> tuple:
+    """(id, updated_at, habit count, newest habit updated_at): a removed habit changes the count"""
+    return (
+      cycle.id,
+      cycle.updated_at,
+      len(cycle.habits),
+      max((habit.updated_at for habit in cycle.habits), default=None)
+    )
 
-    cycle = self._get_cycle(cycle_id, user_id)
+  def get_cycle_page_version(
+    self,
+    user_id: int,
+    statuses: Optional[List[CycleStatuses]] = None,
+    limit: Optional[int] = None,
+    after: Optional[Tuple[datetime, int]] = None
+  ) -> tuple:
+    """Version of the page get_cycles_for_user would return, aggregated in the database"""
+    page = (
+      select(HabitCycle.id, HabitCycle.updated_at)
+      .where(*self._cycle_list_filters(user_id, statuses, after))
+      .order_by(HabitCycle.created_at.desc(), HabitCycle.id.desc())
+      .limit(limit)
+      .subquery()
+    )
+    row = self.db.execute(
+      select(func.count(page.c.id), func.max(page.c.updated_at), func.coalesce(func.sum(page.c.id), 0))
+    ).one()
+    return tuple(row)
+
+  @staticmethod
+  def cycle_page_version(cycles: Sequence) -> tuple:
+    """(count, newest updated_at, sum of ids) of a page: edits bump updated_at, adds and deletes change the ids"""
+    return (
+      len(cycles),
+      max((cycle.updated_at for cycle in cycles), default=None),
+      sum(cycle.id for cycle in cycles)
+    )
 
-    # Can only activate draft cycles
-    if cycle.status != CycleStatuses.DRAFT:
-      raise ValidationError("Can only activate cycles in DRAFT status")
+  def activate_cycle(self, user_id: int, cycle_id: int) -> HabitCycle:
+    min_habits_required_to_start_cycle = settings.MIN_HABITS_REQUIRED_TO_START_CYCLE
 
-    if len(cycle.habits) < min_habits_required_to_start_cycle:
-      raise ValidationError(f"Cycle needs at least {min_habits_required_to_start_cycle} habits to activate")
+    # One guarded UPDATE instead of check-then-act: the cycle must be a DRAFT with enough
+    # habits, and the user must have no ACTIVE cycle of the same type. Habits are counted
+    # in the database rather than loaded.
+    stmt = (
+      update(HabitCycle)
+      .where(
+        HabitCycle.id == cycle_id,
+        HabitCycle.user_id == user_id,
+        HabitCycle.status == CycleStatuses.DRAFT,
+        self._habit_count(cycle_id) >= min_habits_required_to_start_cycle,
+        ~self._active_cycle_of_same_type()
+      )
+      .values(status=CycleStatuses.ACTIVE, started_at=datetime.now(timezone.utc))
+      .returning(HabitCycle)
+      .options(*CYCLE_WITH_HABITS)
+    )
 
-    existing_active_cycle = self.db.query(HabitCycle).filter(
-      HabitCycle.user_id == user_id,
-      HabitCycle.cycle_type == cycle.cycle_type,
-      HabitCycle.status == CycleStatuses.ACTIVE
-    ).first()
+    try:
+      cycle = self.db.scalars(stmt).first()
+    except IntegrityError:
+      # A concurrent activation of the same type won the race (idx_one_active_cycle_per_type)
+      self.db.rollback()
+      raise ConflictError("Active cycle of this type already exists")
 
-    if existing_active_cycle is not None:
-      raise ConflictError(f"Active {cycle.cycle_type.value} cycle already exists")
-    
-    # If all those above checks pass, then update the cycle status to active, and set started_at
-    cycle.status = CycleStatuses.ACTIVE
-    cycle.started_at = datetime.now(timezone.utc)
+    if cycle is None:
+      self._raise_activation_error(user_id, cycle_id, min_habits_required_to_start_cycle)
 
+    self._invalidate(user_id, cycle_id)
     self.db.commit()
     return cycle
 
   def delete_cycle(self, user_id: int, cycle_id: int) -> None:
-    cycle = self._get_cycle(cycle_id, user_id)
+    cycle = self._get_cycle(cycle_id, user_id, cached=False)
     
     if cycle.status != CycleStatuses.DRAFT:
       raise ValidationError(f"Cannot delete cycle with '{cycle.status.value}' status. Only DRAFT cycles can be deleted.")
     
     self.db.delete(cycle)
+    self._invalidate(user_id, cycle_id)
     self.db.commit()
 
   def abandon_cycle(self, user_id: int, cycle_id: int) -> HabitCycle:
-    cycle = self._get_cycle(cycle_id, user_id)
-    
-    if cycle.status == CycleStatuses.ABANDONED:
-      raise ValidationError("Cycle already abandoned")
+    cycle = self._transition_active_cycle(user_id, cycle_id, status=CycleStatuses.ABANDONED)
+
+    if cycle is None:
+      # Nothing updated: work out why (raises NotFoundError if the cycle doesn't exist)
+      cycle = self._get_cycle(cycle_id, user_id)
+
+      if cycle.status == CycleStatuses.ABANDONED:
+        raise ValidationError("Cycle already abandoned")
 
-    if cycle.status in [CycleStatuses.DRAFT, CycleStatuses.COMPLETED]:
       raise ValidationError(f"{cycle.status.value} cycles cannot be abandoned")
-    
-    cycle.status = CycleStatuses.ABANDONED
 
+    SnapshotService(self.db).snapshot_cycles([cycle])
+    self._invalidate(user_id, cycle_id)
     self.db.commit()
-    self.db.refresh(cycle)
-
     return cycle
   
   def complete_cycle(self, user_id: int, cycle_id: int) -> HabitCycle:
-    cycle = self._get_cycle(cycle_id, user_id)
+    cycle = self._transition_active_cycle(
+      user_id,
+      cycle_id,
+      status=CycleStatuses.COMPLETED,
+      completed_at=datetime.now(timezone.utc)
+    )
+
+    if cycle is None:
+      cycle = self._get_cycle(cycle_id, user_id, CYCLE_WITH_HABITS)
 
-    if cycle.status == CycleStatuses.COMPLETED:
-      return cycle
+      if cycle.status == CycleStatuses.COMPLETED:
+        return cycle
 
-    if cycle.status != CycleStatuses.ACTIVE:
       raise ValidationError(f"Cannot mark {cycle.status.value} cycles as complete. Cycle must be of ACTIVE status")
 
-    cycle.status = CycleStatuses.COMPLETED
-    cycle.completed_at = datetime.now(timezone.utc)
-
+    SnapshotService(self.db).snapshot_cycles([cycle])
+    self._invalidate(user_id, cycle_id)
     self.db.commit()
-    self.db.refresh(cycle)
-
     return cycle
   
   def get_habits_from_cycle(self, user_id: int, cycle_id: int ) -> List[Habit]:
-    cycle = self._get_cycle(cycle_id, user_id)
+    cycle = self._get_cycle(cycle_id, user_id, CYCLE_WITH_HABITS)
     return cycle.habits 
   
   # ============== HABIT MANAGEMENT ================
 
   # Add a new habit to a draft habit cycle
   def add_habit_to_cycle(self, user_id: int, cycle_id: int, name: str) -> Habit:
-    cycle = self._get_cycle(cycle_id, user_id)
-    self._validate_cycle_is_draft(cycle)
-
-    new_habit = Habit(
-      habit_cycle_id=cycle_id,
-      name=name
+    # INSERT ... SELECT guarded on the cycle being the user's and in DRAFT, RETURNING the row
+    stmt = (
+      insert(Habit)
+      .from_select(
+        ["habit_cycle_id", "name"],
+        select(literal(cycle_id), literal(name)).where(self._draft_cycle_ids(user_id, HabitCycle.id == cycle_id).exists())
+      )
+      .returning(Habit)
     )
 
-    self.db.add(new_habit)
-
     try:
-      self.db.commit()
+      new_habit = self.db.scalars(stmt).first()
     except IntegrityError:
       self.db.rollback()
       raise ConflictError(f"Habit '{name}' already exists in this cycle")
-      
-    self.db.refresh(new_habit)
 
+    if new_habit is None:
+      # Raises NotFoundError or ValidationError
+      self._validate_cycle_is_draft(self._get_cycle(cycle_id, user_id))
+
+    self._invalidate(user_id, cycle_id)
+    self.db.commit()
     return new_habit
 
   # Remove a habit from a draft habit cycle
   def remove_habit_from_cycle(self, user_id: int, habit_id: int) -> None:
-    habit = self._get_habit(user_id, habit_id)
+    habit = self._get_habit(user_id, habit_id, HABIT_WITH_CYCLE, cached=False)
     self._validate_cycle_is_draft(habit.habit_cycle)
 
     self.db.delete(habit)
+    self._invalidate(user_id, habit.habit_cycle_id)
     self.db.commit()
 
   # Update a habit from a draft habit cycle
   def update_habit(self, user_id: int, habit_id: int, updates: HabitUpdate) -> Habit:
-    habit = self._get_habit(user_id, habit_id)
-    self._validate_cycle_is_draft(habit.habit_cycle)
-
     # Only get fields that were actually set in the request
     update_data = updates.model_dump(exclude_unset=True)
 
-    # Apply each update
-    for field, value in update_data.items():
-      setattr(habit, field, value)
+    if not update_data:
+      habit = self._get_habit(user_id, habit_id, HABIT_WITH_CYCLE)
+      self._validate_cycle_is_draft(habit.habit_cycle)
+      return habit
+
+    # UPDATE ... WHERE the habit is in one of the user's draft cycles, RETURNING the row
+    stmt = (
+      update(Habit)
+      .where(
+        Habit.id == habit_id,
+        Habit.habit_cycle_id.in_(self._draft_cycle_ids(user_id))
+      )
+      .values(**update_data)
+      .returning(Habit)
+    )
 
     try:
-      self.db.commit()
+      habit = self.db.scalars(stmt).first()
     except IntegrityError:
       self.db.rollback()
       raise ConflictError(f"Habit '{updates.name}' already exists in this cycle")
-    
-    self.db.refresh(habit)
+
+    if habit is None:
+      # Raises NotFoundError or ValidationError
+      habit = self._get_habit(user_id, habit_id, HABIT_WITH_CYCLE)
+      self._validate_cycle_is_draft(habit.habit_cycle)
+
+    self._invalidate(user_id, habit.habit_cycle_id)
+    self.db.commit()
     return habit 
 
   # ============== ENTRY MANAGEMENT ================
 
-  def get_entry_for_date(self, user_id: int, habit_id: int, entry_date: date) -> Optional[HabitEntry]:
+  def get_entry_for_date(self, user_id: int, habit_id: int, entry_date: date, options: Sequence = ()) -> Optional[HabitEntry]:
     """
     Get habit entry for a specific date.
     Returns None if no entry exists for that date.
     Validates habit ownership via _get_habit().
     """
     # Verify habit belongs to user (raises NotFoundError if not)
+    habit = self._get_habit(user_id, habit_id, HABIT_WITH_CYCLE)
+
+    def load() -> Optional[HabitEntry]:
+      # Query for entry on specific date
+      entry = self.db.query(HabitEntry).options(*options).filter(
+          HabitEntry.habit_id == habit.id,
+          HabitEntry.entry_date == entry_date
+      ).first()
+
+      if entry is None and habit.habit_cycle.status in FINISHED_STATUSES:
+        archived = self._archived_entries(habit)
+        entry = next((archived_entry for archived_entry in archived or [] if archived_entry.entry_date == entry_date), None)
+
+      return entry
+
+    return self._cached(
+      self._cache_key("entry", options, user_id, habit_id, entry_date.isoformat()),
+      load,
+      user_tag(user_id), cycle_tag(habit.habit_cycle_id), habit_tag(habit_id)
+    )
+
+  def get_entries_for_habit(self, user_id: int, habit_id: int, limit: int, before: Optional[date] = None) -> List[HabitEntry]:
+    """
+    Entry history for a habit, newest first.
+    Pages with a keyset on entry_date (unique per habit): pass the last date seen as `before`.
+    Habits of finished cycles may have been archived; their history is served from there.
+    """
+    habit = self._get_habit(user_id, habit_id, HABIT_WITH_CYCLE)
+
+    if habit.habit_cycle.status in FINISHED_STATUSES:
+      archived = self._archived_entries(habit)
+      if archived is not None:
+        return [entry for entry in archived if before is None or entry.entry_date < before][:limit]
+
+    filters = [ HabitEntry.habit_id == habit.id ]
+    if before is not None:
+      filters.append(HabitEntry.entry_date < before)
+
+    return (
+      self.db.query(HabitEntry)
+      .filter(*filters)
+      .order_by(HabitEntry.entry_date.desc())
+      .limit(limit)
+      .all()
+    )
+
+  def get_completion_bitmap(self, user_id: int, habit_id: int, start: Optional[date] = None, end: Optional[date] = None) -> dict:
+    """
+    Completed days of a habit in [start, end] as a base64 bitset, for heatmaps.
+    Built from one entry_date query (or the archive) without loading entries.
+    Missing bounds follow the completions, keeping at most MAX_STATS_RANGE_DAYS up to the last one.
+    """
+    max_days = settings.MAX_STATS_RANGE_DAYS
+    if start is not None and end is not None:
+      if end < start:
+        raise ValidationError("end must not be before start")
+      if (end - start).days >= max_days:
+        raise ValidationError(f"Date range cannot exceed {max_days} days")
+
+    habit = self._get_habit(user_id, habit_id, HABIT_WITH_CYCLE)
+
+    archive = None
+    if habit.habit_cycle.status in FINISHED_STATUSES:
+      archive = ArchiveService(self.db).get_archive(habit.id)
+
+    if archive is not None:
+      completed = [
+        day for day in decode_days(archive.start_date, archive.completed_bitmap)
+        if (start is None or day >= start) and (end is None or day <= end)
+      ]
+    else:
+      filters = [HabitEntry.habit_id == habit.id, HabitEntry.completed.is_(True)]
+      if start is not None:
+        filters.append(HabitEntry.entry_date >= start)
+      if end is not None:
+        filters.append(HabitEntry.entry_date <= end)
+      completed = self.db.scalars(
+        select(HabitEntry.entry_date).where(*filters).order_by(HabitEntry.entry_date)
+      ).all()
+
+    if end is None:
+      end = completed[-1] if completed else (start or date.today())
+      if start is not None:
+        end = min(end, start + timedelta(days=max_days - 1))
+    if start is None:
+      start = max(completed[0] if completed else end, end - timedelta(days=max_days - 1))
+
+    days = (end - start).days + 1
+    return {
+      "habit_id": habit.id,
+      "start_date": start,
+      "end_date": end,
+      "days": days,
+      "completed": base64.b64encode(encode_days(start, completed, days)).decode("ascii")
+    }
+
+  def get_today_board(self, user_id: int, entry_date: date) -> List[dict]:
+    """
+    Every habit in the user's ACTIVE cycles with its entry for entry_date (or None).
+    Built from one query: habit_cycles -> habits LEFT JOIN habit_entries on the date.
+    """
+    rows = self.db.execute(self._today_board_query(entry_date, HabitCycle.user_id == user_id))
+    return self._group_today_rows(rows).get(user_id, [])
+
+  def iter_today_status(self, discord_user_ids: List[str], entry_date: date) -> Iterator[Tuple[str, Optional[int], List[dict]]]:
+    """
+    Yield (discord_user_id, user_id, cycles) for each Discord user, in request order.
+
+    Works through the ids in chunks of STATUS_FANOUT_CHUNK_SIZE: each chunk resolves
+    its users with one auth_providers IN-query and its boards with one grouped query,
+    so memory stays flat however many users are requested.
+    Unknown Discord users are yielded with user_id None and no cycles.
+    """
+    chunk_size = settings.STATUS_FANOUT_CHUNK_SIZE
+
+    for start in range(0, len(discord_user_ids), chunk_size):
+      chunk = discord_user_ids[start:start + chunk_size]
+
+      user_ids = dict(self.db.execute(
+        select(AuthProvider.provider_user_id, AuthProvider.user_id).where(
+          AuthProvider.provider == Providers.DISCORD,
+          AuthProvider.provider_user_id.in_(chunk)
+        )
+      ).all())
+
+      boards = {}
+      if user_ids:
+        rows = self.db.execute(self._today_board_query(entry_date, HabitCycle.user_id.in_(user_ids.values())))
+        boards = self._group_today_rows(rows)
+
+      for discord_user_id in chunk:
+        user_id = user_ids.get(discord_user_id)
+        yield discord_user_id, user_id, boards.get(user_id, [])
+
+  def get_streak(self, user_id: int, habit_id: int, today: date) -> dict:
+    """Current and longest streak, read from the counters maintained on write"""
     habit = self._get_habit(user_id, habit_id)
+    streak = Streak.of(habit)
 
-    # Query for entry on specific date
-    entry = self.db.query(HabitEntry).filter(
-        HabitEntry.habit_id == habit.id,
-        HabitEntry.entry_date == entry_date
-    ).first()
+    return {
+      "habit_id": habit.id,
+      "current_streak": streak.current_as_of(today),
+      "longest_streak": streak.longest_streak,
+      "last_completed_date": streak.last_completed_date
+    }
+
+  def get_cycle_daily_stats(self, user_id: int, cycle_id: int, start: Optional[date] = None, end: Optional[date] = None) -> dict:
+    """
+    Per-day completion for a cycle, read from daily_cycle_rollups rather than entries.
+    Defaults to the cycle's whole run: until today, or until it was completed or abandoned.
+    """
+    cycle = self._get_cycle(cycle_id, user_id)
 
-    return entry
+    if start is None:
+      start = (cycle.started_at or cycle.created_at).date()
+    if end is None and cycle.status in FINISHED_STATUSES:
+      # abandon_cycle doesn't set completed_at; the status change is the cycle's last update
+      end = (cycle.completed_at or cycle.updated_at).date()
+    elif end is None:
+      end = date.today()
+
+    if end < start:
+      raise ValidationError("end must not be before start")
+    if (end - start).days >= settings.MAX_STATS_RANGE_DAYS:
+      raise ValidationError(f"Date range cannot exceed {settings.MAX_STATS_RANGE_DAYS} days")
+
+    days = RollupService(self.db).get_daily_completion(cycle, start, end)
+    possible = sum(day["habits_total"] for day in days)
+
+    return {
+      "cycle_id": cycle.id,
+      "start": start,
+      "end": end,
+      "completion_rate": sum(day["habits_completed"] for day in days) / possible if possible else 0.0,
+      "days": days
+    }
+
+  def get_cycle_stats(self, user_id: int, cycle_id: int) -> CycleSnapshot:
+    """Summary stats for a cycle; frozen snapshot for finished cycles, computed otherwise"""
+    cycle = self._get_cycle(cycle_id, user_id)
+    return SnapshotService(self.db).get_stats(user_id, cycle)
 
   # Add a habit entry
   def add_entry(self, user_id: int, habit_id: int, completed: bool) -> HabitEntry:
+    # Read past the cache: the streak counters are advanced from these values
     habit = self._get_habit(
       user_id=user_id, 
-      habit_id=habit_id
+      habit_id=habit_id,
+      options=HABIT_WITH_CYCLE,
+      cached=False
     )
 
     cycle = habit.habit_cycle
@@ -210,49 +525,309 @@ class HabitService:
     if cycle.status is not CycleStatuses.ACTIVE:
       raise ValidationError(f"Cannot add entry for a cycle that is not active")
     
-    habit_entry = HabitEntry(
-      habit_id=habit_id,
-      entry_date=date.today()
+    stmt = (
+      insert(HabitEntry)
+      .values(
+        habit_id=habit_id,
+        entry_date=date.today(),
+        completed=completed,
+        completed_at=datetime.now() if completed else None
+      )
+      .returning(HabitEntry)
     )
 
-    if completed:
-      habit_entry.mark_complete()
-
     try:
-      self.db.add(habit_entry)
-      self.db.commit()
+      habit_entry = self.db.scalars(stmt).one()
     except IntegrityError:
       # DB constraint on habit_id and entry_date to prevent duplicate entries 
       self.db.rollback()
       raise ConflictError("Entry for this habit already exists")
-      
 
-    self.db.refresh(habit_entry)
+    # EntryResponse nests the habit we already loaded
+    set_committed_value(habit_entry, "habit", habit)
+
+    if completed:
+      self._advance_streak(habit, habit_entry.entry_date)
+      RollupService(self.db).record_completions(habit_entry.entry_date, {(cycle.user_id, cycle.id): 1})
+
+    self._invalidate(user_id, cycle.id)
+    self.db.commit()
     return habit_entry
+
+  def add_entries_batch(self, items: List[BatchEntryItem]) -> List[BatchEntryResult]:
+    """
+    Log today's entries for many (discord user, habit) pairs in one transaction.
+
+    Ownership and cycle status are checked with a single set-based query, and all
+    valid entries go in with one multi-row INSERT ... ON CONFLICT DO NOTHING.
+    Items that fail validation or already have an entry today are reported per
+    item instead of aborting the batch. Results are returned in request order.
+    """
+    today = date.today()
+    discord_user_ids = {item.discord_user_id for item in items}
+    habit_ids = {item.habit_id for item in items}
+
+    # (discord_user_id, habit_id) -> cycle status, for habits the Discord user owns
+    owned = {}
+    streaks: Dict[int, Streak] = {}
+    cycle_keys: Dict[int, Tuple[int, int]] = {}  # habit_id -> (user_id, cycle_id)
+    for habit_id, discord_user_id, status, user_id, cycle_id, current, longest, last in self.db.execute(
+        select(
+          Habit.id, AuthProvider.provider_user_id, HabitCycle.status, HabitCycle.user_id, HabitCycle.id,
+          Habit.current_streak, Habit.longest_streak, Habit.last_completed_date
+        )
+        .join(HabitCycle, Habit.habit_cycle_id == HabitCycle.id)
+        .join(AuthProvider, and_(
+          AuthProvider.user_id == HabitCycle.user_id,
+          AuthProvider.provider == Providers.DISCORD
+        ))
+        .where(
+          Habit.id.in_(habit_ids),
+          AuthProvider.provider_user_id.in_(discord_user_ids)
+        )
+      ):
+      owned[(discord_user_id, habit_id)] = status
+      streaks[habit_id] = Streak(current, longest, last)
+      cycle_keys[habit_id] = (user_id, cycle_id)
+
+    results: List[BatchEntryResult] = []
+    pending = {}  # habit_id -> index of the result waiting on the insert
+    rows = []
+    now = datetime.now()
+
+    for item in items:
+      result = BatchEntryResult(
+        discord_user_id=item.discord_user_id,
+        habit_id=item.habit_id,
+        status=BatchEntryStatus.CREATED
+      )
+      results.append(result)
+      status = owned.get((item.discord_user_id, item.habit_id))
+
+      if status is None:
+        result.status = BatchEntryStatus.NOT_FOUND
+        result.message = f"Habit with id {item.habit_id} not found"
+      elif status is not CycleStatuses.ACTIVE:
+        result.status = BatchEntryStatus.INVALID
+        result.message = "Cannot add entry for a cycle that is not active"
+      elif item.habit_id in pending:
+        result.status = BatchEntryStatus.CONFLICT
+        result.message = "Duplicate habit in batch"
+      else:
+        pending[item.habit_id] = len(results) - 1
+        rows.append({
+          "habit_id": item.habit_id,
+          "entry_date": today,
+          "completed": item.completed,
+          "completed_at": now if item.completed else None,
+          "created_at": now
+        })
+
+    if rows:
+      stmt = (
+        dialect_insert(self.db, HabitEntry.__table__)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=["habit_id", "entry_date"])
+        .returning(HabitEntry.id, HabitEntry.habit_id)
+      )
+      inserted = {habit_id: entry_id for entry_id, habit_id in self.db.execute(stmt)}
+
+      completed_habit_ids = {row["habit_id"] for row in rows if row["completed"]} & inserted.keys()
+      StreakService(self.db).save({
+        habit_id: streaks[habit_id]
+        for habit_id in completed_habit_ids
+        if streaks[habit_id].advance(today)
+      })
+      RollupService(self.db).record_completions(
+        today,
+        Counter(cycle_keys[habit_id] for habit_id in completed_habit_ids)
+      )
+      for user_id, cycle_id in {cycle_keys[habit_id] for habit_id in inserted}:
+        self._invalidate(user_id, cycle_id)
+      self.db.commit()
+
+      for habit_id, index in pending.items():
+        if habit_id in inserted:
+          results[index].entry_id = inserted[habit_id]
+        else:
+          results[index].status = BatchEntryStatus.CONFLICT
+          results[index].message = "Entry for this habit already exists"
+
+    return results
   
   # Private methods
-  def _get_cycle(self, cycle_id: int, user_id: int) -> HabitCycle:
-    cycle = self.db.query(HabitCycle).filter(
+  def _get_cycle(self, cycle_id: int, user_id: int, options: Sequence = (), cached: bool = True) -> HabitCycle:
+    query = self.db.query(HabitCycle).options(*options).filter(
       HabitCycle.id == cycle_id,
       HabitCycle.user_id == user_id
-    ).first()
+    )
+    key = self._cache_key("cycle", options, user_id, cycle_id) if cached else None
+    cycle = self._cached(key, query.first, user_tag(user_id), cycle_tag(cycle_id))
 
     if cycle is None:
       raise NotFoundError("Cycle", str(cycle_id))
     
     return cycle
 
-  def _get_habit(self, user_id: int, habit_id: int) -> Habit:
-    habit = self.db.query(Habit).join(HabitCycle).filter(
+  def _cycle_list_filters(self, user_id: int, statuses: Optional[List[CycleStatuses]], after: Optional[Tuple[datetime, int]]) -> list:
+    filters = [ HabitCycle.user_id == user_id ]
+
+    if statuses is not None:
+      filters.append(HabitCycle.status.in_(statuses))
+
+    if after is not None:
+      created_at, cycle_id = after
+      filters.append(or_(
+        HabitCycle.created_at < created_at,
+        and_(HabitCycle.created_at == created_at, HabitCycle.id < cycle_id)
+      ))
+
+    return filters
+
+  def _get_habit(self, user_id: int, habit_id: int, options: Sequence = (), cached: bool = True) -> Habit:
+    query = self.db.query(Habit).join(HabitCycle).options(*options).filter(
       Habit.id == habit_id,
       HabitCycle.user_id == user_id
-    ).first()
+    )
+    key = self._cache_key("habit", options, user_id, habit_id) if cached else None
+    habit = self._cached(key, query.first, user_tag(user_id), habit_tag(habit_id))
 
     if habit is None:
       raise NotFoundError("Habit", habit_id)
 
     return habit
   
+  def _cache_key(self, kind: str, options: Sequence, *parts) -> Optional[str]:
+    """Entity cache key, or None (not cached) for loader options other than this module's profiles"""
+    if not options:
+      profile = "plain"
+    elif options is CYCLE_WITH_HABITS:
+      profile = "habits"
+    elif options is HABIT_WITH_CYCLE:
+      profile = "cycle"
+    else:
+      return None
+    return ":".join(str(part) for part in (kind, profile, *parts))
+
+  def _cached(self, key: Optional[str], loader, *tags: str):
+    if key is None:
+      return loader()
+    return self.cache.get_or_load(self.db, key, loader, tags)
+
+  def _invalidate(self, user_id: int, cycle_id: int) -> None:
+    """Queue the entity cache invalidation for a write to one of the user's cycles"""
+    self.cache.invalidate(self.db, user_tag(user_id), cycle_tag(cycle_id))
+
+  def _archived_entries(self, habit: Habit) -> Optional[List[HabitEntry]]:
+    """Archived history of a finished cycle's habit, newest first; None if it isn't archived"""
+    archive_service = ArchiveService(self.db)
+    archive = archive_service.get_archive(habit.id)
+    if archive is None:
+      return None
+    return archive_service.archived_entries(archive, habit)
+
+  def _advance_streak(self, habit: Habit, completed_on: date) -> None:
+    """Advance the habit's streak counters in the current transaction"""
+    streak = Streak.of(habit)
+    if not streak.advance(completed_on):
+      return
+
+    StreakService(self.db).save({habit.id: streak})
+    set_committed_value(habit, "current_streak", streak.current_streak)
+    set_committed_value(habit, "longest_streak", streak.longest_streak)
+    set_committed_value(habit, "last_completed_date", streak.last_completed_date)
+
+  def _transition_active_cycle(self, user_id: int, cycle_id: int, **values) -> Optional[HabitCycle]:
+    """
+    UPDATE an ACTIVE cycle ... RETURNING it, with habits loaded for CycleResponse.
+    Returns None when the cycle isn't the user's or isn't active.
+    """
+    stmt = (
+      update(HabitCycle)
+      .where(
+        HabitCycle.id == cycle_id,
+        HabitCycle.user_id == user_id,
+        HabitCycle.status == CycleStatuses.ACTIVE
+      )
+      .values(**values)
+      .returning(HabitCycle)
+      .options(*CYCLE_WITH_HABITS)
+    )
+    return self.db.scalars(stmt).first()
+
+  def _raise_activation_error(self, user_id: int, cycle_id: int, min_habits: int) -> None:
+    """Work out which activation guard failed, with a single query, and raise for it"""
+    row = self.db.execute(
+      select(
+        HabitCycle.status,
+        HabitCycle.cycle_type,
+        self._habit_count(cycle_id).label("habit_count"),
+        self._active_cycle_of_same_type().label("active_exists")
+      ).where(HabitCycle.id == cycle_id, HabitCycle.user_id == user_id)
+    ).first()
+
+    if row is None:
+      raise NotFoundError("Cycle", str(cycle_id))
+
+    # Can only activate draft cycles
+    if row.status != CycleStatuses.DRAFT:
+      raise ValidationError("Can only activate cycles in DRAFT status")
+
+    if row.habit_count < min_habits:
+      raise ValidationError(f"Cycle needs at least {min_habits} habits to activate")
+
+    raise ConflictError(f"Active {row.cycle_type.value} cycle already exists")
+
+  def _habit_count(self, cycle_id: int):
+    return select(func.count(Habit.id)).where(Habit.habit_cycle_id == cycle_id).scalar_subquery()
+
+  def _active_cycle_of_same_type(self):
+    """EXISTS another ACTIVE cycle for the same user and type, correlated to habit_cycles"""
+    other = aliased(HabitCycle)
+    return (
+      select(other.id)
+      .where(
+        other.user_id == HabitCycle.user_id,
+        other.cycle_type == HabitCycle.cycle_type,
+        other.status == CycleStatuses.ACTIVE
+      )
+      .correlate(HabitCycle)
+      .exists()
+    )
+
+  def _draft_cycle_ids(self, user_id: int, *filters):
+    return select(HabitCycle.id).where(
+      HabitCycle.user_id == user_id,
+      HabitCycle.status == CycleStatuses.DRAFT,
+      *filters
+    )
+
+  def _today_board_query(self, entry_date: date, *filters):
+    return (
+      select(HabitCycle.user_id, HabitCycle.id, HabitCycle.name, HabitCycle.cycle_type, Habit.id, Habit.name, HabitEntry)
+      .join(Habit, Habit.habit_cycle_id == HabitCycle.id)
+      .outerjoin(HabitEntry, and_(
+        HabitEntry.habit_id == Habit.id,
+        HabitEntry.entry_date == entry_date
+      ))
+      .where(HabitCycle.status == CycleStatuses.ACTIVE, *filters)
+      .order_by(HabitCycle.user_id, HabitCycle.id, Habit.created_at.desc())
+    )
+
+  def _group_today_rows(self, rows) -> Dict[int, List[dict]]:
+    """Group today-board rows into user_id -> cycles -> habits"""
+    boards: Dict[int, Dict[int, dict]] = {}
+    for user_id, cycle_id, cycle_name, cycle_type, habit_id, habit_name, entry in rows:
+      cycle = boards.setdefault(user_id, {}).setdefault(cycle_id, {
+        "id": cycle_id,
+        "name": cycle_name,
+        "cycle_type": cycle_type,
+        "habits": []
+      })
+      cycle["habits"].append({"id": habit_id, "name": habit_name, "entry": entry})
+
+    return {user_id: list(cycles.values()) for user_id, cycles in boards.items()}
+
   def _validate_cycle_is_draft(self, cycle: HabitCycle) -> None:
     if cycle.status != CycleStatuses.DRAFT:
       raise ValidationError(
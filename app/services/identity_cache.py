@@ -0,0 +1,88 @@
+import hashlib
+import time
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session, make_transient_to_detached, object_session
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models import User, AuthProvider
+
+"""
+In-process identity cache for bot requests.
+
+Maps (token digest, discord_user_id) straight to a user id so repeat requests from
+the same Discord user skip JWT verification and the auth_providers lookup.
+Entries are dropped after commit whenever a user or auth provider is created or deleted.
+"""
+
+identity_cache = TTLCache(
+  maxsize=settings.IDENTITY_CACHE_MAXSIZE,
+  ttl=settings.IDENTITY_CACHE_TTL_SECONDS
+)
+
+_PENDING_KEY = "identity_cache_invalidations"
+
+
+def identity_key(token: str, discord_user_id: Optional[str]) -> tuple:
+  """Cache key for a bot token and optional Discord user. The raw token is never stored."""
+  digest = hashlib.sha256(token.encode()).hexdigest()
+  return (digest, discord_user_id)
+
+
+def remember_identity(token: str, discord_user_id: Optional[str], user_id: int, payload: dict) -> None:
+  """Cache a resolved identity, never past the token's own expiry."""
+  ttl = None
+  if "exp" in payload:
+    ttl = payload["exp"] - time.time()
+  identity_cache.set(identity_key(token, discord_user_id), user_id, ttl=ttl)
+
+
+def attach_user(db: Session, user_id: int) -> User:
+  """
+  Return a persistent User for a known id without querying the database.
+  Columns other than id are loaded lazily if something touches them.
+  """
+  user = User(id=user_id)
+  make_transient_to_detached(user)
+  return db.merge(user, load=False)
+
+
+def invalidate_discord_user(discord_user_id: str) -> None:
+  identity_cache.delete_where(lambda key, _: key[1] == discord_user_id)
+
+
+def invalidate_user(user_id: int) -> None:
+  identity_cache.delete_where(lambda _, value: value == user_id)
+
+
+# Invalidations are queued on the session and applied once the transaction commits,
+# so concurrent requests can't re-cache the pre-commit state.
+def _queue(target, invalidation) -> None:
+  session = object_session(target)
+  if session is not None:
+    session.info.setdefault(_PENDING_KEY, []).append(invalidation)
+
+
+@event.listens_for(User, "after_insert")
+@event.listens_for(User, "after_delete")
+def _on_user_change(mapper, connection, target: User) -> None:
+  user_id = target.id
+  _queue(target, lambda: invalidate_user(user_id))
+
+
+@event.listens_for(AuthProvider, "after_insert")
+@event.listens_for(AuthProvider, "after_delete")
+def _on_auth_provider_change(mapper, connection, target: AuthProvider) -> None:
+  discord_user_id, user_id = target.provider_user_id, target.user_id
+  _queue(target, lambda: (invalidate_discord_user(discord_user_id), invalidate_user(user_id)))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_invalidations(session: Session) -> None:
+  for invalidation in session.info.pop(_PENDING_KEY, []):
+    invalidation()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_invalidations(session: Session) -> None:
+  session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,175 @@
+import logging
+import re
+from dataclasses import dataclass
+from datetime import date
+from typing import List, Optional
+from sqlalchemy import text, select, exists, or_
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models import Habit, HabitCycle, HabitEntry, HabitEntryArchive
+from app.services.snapshot_service import FINISHED_STATUSES
+
+"""
+Monthly range partitions of habit_entries (PostgreSQL only).
+
+The partitioned table is created by migration 4b36dc295588: PARTITION BY RANGE
+(entry_date), one partition per calendar month named habit_entries_yYYYYmMM, plus a
+DEFAULT partition that should stay empty. PartitionManager keeps partitions created
+ahead of time (rows for a month without a partition land in DEFAULT, and a DEFAULT
+holding rows for a range blocks creating that range's partition), and detaches old
+months so they can be moved to archive storage. On other databases habit_entries is
+a plain table and every method here is a no-op.
+
+Detaching removes a month from every read, so a month is only detached once all its
+entries belong to finished cycles whose habits have been archived (ArchiveService).
+"""
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "habit_entries"
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+_PARTITION_NAME = re.compile(rf"^{PARENT_TABLE}_y(\d{{4}})m(\d{{2}})$")
+
+
+def month_start(day: date) -> date:
+  return day.replace(day=1)
+
+
+def next_month(month: date) -> date:
+  return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+  return f"{PARENT_TABLE}_y{month.year}m{month.month:02d}"
+
+
+@dataclass(frozen=True)
+class Partition:
+  name: str
+  start: date  # Inclusive
+  end: date    # Exclusive
+
+  @classmethod
+  def for_month(cls, month: date) -> "Partition":
+    month = month_start(month)
+    return cls(partition_name(month), month, next_month(month))
+
+
+class PartitionManager:
+  def __init__(self, db: Session):
+    self.db = db
+
+  def is_partitioned(self) -> bool:
+    if self.db.get_bind().dialect.name != "postgresql":
+      return False
+    return bool(self.db.execute(
+      text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:parent))"),
+      {"parent": PARENT_TABLE}
+    ).scalar())
+
+  def list_partitions(self) -> List[Partition]:
+    """Monthly partitions currently attached, oldest first (DEFAULT excluded)"""
+    if not self.is_partitioned():
+      return []
+
+    names = self.db.execute(
+      text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE pg_inherits.inhparent = to_regclass(:parent)"
+      ),
+      {"parent": PARENT_TABLE}
+    ).scalars()
+
+    partitions = []
+    for name in names:
+      match = _PARTITION_NAME.match(name)
+      if match:
+        partitions.append(Partition.for_month(date(int(match.group(1)), int(match.group(2)), 1)))
+    return sorted(partitions, key=lambda partition: partition.start)
+
+  def ensure_partitions(self, months_ahead: int = settings.ENTRY_PARTITION_MONTHS_AHEAD, today: Optional[date] = None) -> List[str]:
+    """Create partitions for this month and `months_ahead` months after it. Returns the ones created."""
+    if not self.is_partitioned():
+      return []
+
+    existing = {partition.name for partition in self.list_partitions()}
+    month = month_start(today or date.today())
+    created = []
+    for _ in range(months_ahead + 1):
+      partition = Partition.for_month(month)
+      if partition.name not in existing:
+        self.db.execute(text(
+          f"CREATE TABLE IF NOT EXISTS {partition.name} PARTITION OF {PARENT_TABLE} "
+          f"FOR VALUES FROM ('{partition.start.isoformat()}') TO ('{partition.end.isoformat()}')"
+        ))
+        created.append(partition.name)
+      month = next_month(month)
+
+    self.db.commit()
+    if created:
+      logger.info(f"Created habit_entries partitions: {', '.join(created)}")
+    return created
+
+  def detach_before(self, cutoff: date, archive_schema: Optional[str] = None) -> List[str]:
+    """
+    Detach every monthly partition that ends on or before `cutoff`'s month.
+    Detached tables keep their data; with `archive_schema` they are also moved there
+    (e.g. a schema on a cheaper tablespace) and drop out of the app's search_path.
+    Months still holding entries that aren't archived are skipped (and logged).
+    """
+    if not self.is_partitioned():
+      return []
+
+    cutoff_month = month_start(cutoff)
+    detached = []
+    skipped = []
+    for partition in self.list_partitions():
+      if partition.end > cutoff_month:
+        break
+
+      if self.has_unarchived_entries(partition):
+        skipped.append(partition.name)
+        continue
+
+      self._detach(partition, archive_schema)
+      detached.append(partition.name)
+
+    self.db.commit()
+    if detached:
+      logger.info(f"Detached habit_entries partitions: {', '.join(detached)}")
+    if skipped:
+      logger.warning(f"Kept habit_entries partitions with entries that aren't archived yet: {', '.join(skipped)}")
+    return detached
+
+  def has_unarchived_entries(self, partition: Partition) -> bool:
+    """
+    Whether the month has entries of a cycle that isn't finished, or of a habit without
+    an archive. Runs against the parent table, so PostgreSQL only scans that partition.
+    """
+    unarchived = (
+      select(HabitEntry.id)
+      .join(Habit, Habit.id == HabitEntry.habit_id)
+      .join(HabitCycle, HabitCycle.id == Habit.habit_cycle_id)
+      .where(
+        HabitEntry.entry_date >= partition.start,
+        HabitEntry.entry_date < partition.end,
+        or_(
+          HabitCycle.status.not_in(FINISHED_STATUSES),
+          ~exists().where(HabitEntryArchive.habit_id == Habit.id)
+        )
+      )
+    )
+    return bool(self.db.scalar(select(unarchived.exists())))
+
+  def _detach(self, partition: Partition, archive_schema: Optional[str]) -> None:
+    self.db.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {partition.name}"))
+    if archive_schema:
+      self.db.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{archive_schema}"'))
+      self.db.execute(text(f'ALTER TABLE {partition.name} SET SCHEMA "{archive_schema}"'))
+
+  def default_partition_rows(self) -> int:
+    """Rows that fell into DEFAULT because their month had no partition (should be 0)"""
+    if not self.is_partitioned():
+      return 0
+    return self.db.execute(text(f"SELECT COUNT(*) FROM {DEFAULT_PARTITION}")).scalar()
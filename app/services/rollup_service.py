@@ -0,0 +1,126 @@
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select, delete, insert, func
+from sqlalchemy.orm import Session
+from app.core.database import dialect_insert
+from ..models import DailyCycleRollup, HabitEntry, HabitEntryArchive, Habit, HabitCycle
+
+"""
+Daily completion rollups (daily_cycle_rollups).
+
+Entry writes bump the per-cycle, per-day counters incrementally; rebuild() regenerates
+them from habit_entries for a date range. Analytics read only from the rollup table.
+"""
+
+
+class RollupService:
+  def __init__(self, db: Session):
+    self.db = db
+
+  def record_completions(self, day: date, completions: Dict[Tuple[int, int], int]) -> None:
+    """
+    Add completions for `day`, keyed by (user_id, cycle_id). One multi-row upsert.
+    Does not commit: callers include it in the entry write's transaction.
+    """
+    if not completions:
+      return
+
+    rows = [
+      {
+        "user_id": user_id,
+        "cycle_id": cycle_id,
+        "day": day,
+        "habits_total": self._habits_total(cycle_id).scalar_subquery(),
+        "habits_completed": count
+      }
+      for (user_id, cycle_id), count in completions.items()
+    ]
+
+    stmt = dialect_insert(self.db, DailyCycleRollup).values(rows)
+    stmt = stmt.on_conflict_do_update(
+      index_elements=["cycle_id", "day"],
+      set_={
+        "habits_total": stmt.excluded.habits_total,
+        "habits_completed": DailyCycleRollup.habits_completed + stmt.excluded.habits_completed
+      }
+    )
+    self.db.execute(stmt)
+
+  def rebuild(self, start: date, end: date) -> int:
+    """
+    Regenerate rollups for days in [start, end] from habit_entries and commit.
+    Cycles whose entries were archived keep their rollups: they can no longer change.
+    Returns the number of rollup rows written.
+    """
+    self.db.execute(
+      delete(DailyCycleRollup).where(
+        DailyCycleRollup.day.between(start, end),
+        DailyCycleRollup.cycle_id.not_in(select(HabitEntryArchive.cycle_id))
+      )
+    )
+
+    habit_totals = (
+      select(Habit.habit_cycle_id, func.count(Habit.id).label("habits_total"))
+      .group_by(Habit.habit_cycle_id)
+      .subquery()
+    )
+
+    completed = (
+      select(
+        HabitCycle.id,
+        HabitEntry.entry_date,
+        HabitCycle.user_id,
+        habit_totals.c.habits_total,
+        func.count(HabitEntry.id)
+      )
+      .select_from(HabitEntry)
+      .join(Habit, HabitEntry.habit_id == Habit.id)
+      .join(HabitCycle, Habit.habit_cycle_id == HabitCycle.id)
+      .join(habit_totals, habit_totals.c.habit_cycle_id == HabitCycle.id)
+      .where(
+        HabitEntry.completed.is_(True),
+        HabitEntry.entry_date.between(start, end)
+      )
+      .group_by(HabitCycle.id, HabitEntry.entry_date, HabitCycle.user_id, habit_totals.c.habits_total)
+    )
+
+    result = self.db.execute(
+      insert(DailyCycleRollup).from_select(
+        ["cycle_id", "day", "user_id", "habits_total", "habits_completed"],
+        completed
+      )
+    )
+    self.db.commit()
+    return result.rowcount
+
+  def get_daily_completion(self, cycle: HabitCycle, start: date, end: date, habits_total: Optional[int] = None) -> List[dict]:
+    """
+    Completion per day in [start, end] for a cycle, read from rollups only.
+    Days without a rollup row had no completions.
+    """
+    if habits_total is None:
+      habits_total = self.db.scalar(self._habits_total(cycle.id))
+
+    counts = dict(self.db.execute(
+      select(DailyCycleRollup.day, DailyCycleRollup.habits_completed).where(
+        DailyCycleRollup.cycle_id == cycle.id,
+        DailyCycleRollup.day.between(start, end)
+      )
+    ).all())
+
+    days = []
+    day = start
+    while day <= end:
+      completed = counts.get(day, 0)
+      days.append({
+        "day": day,
+        "habits_total": habits_total,
+        "habits_completed": completed,
+        "completion_rate": completed / habits_total if habits_total else 0.0
+      })
+      day += timedelta(days=1)
+
+    return days
+
+  def _habits_total(self, cycle_id: int):
+    return select(func.count(Habit.id)).where(Habit.habit_cycle_id == cycle_id)
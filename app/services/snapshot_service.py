@@ -0,0 +1,180 @@
+from datetime import date, datetime
+from itertools import groupby
+from typing import Dict, Iterable, List, Optional, Sequence
+from sqlalchemy import select, insert, exists
+from sqlalchemy.orm import Session, selectinload
+from app.core.database import dialect_insert
+from ..models import CycleSnapshot, HabitSnapshot, HabitCycle, Habit, HabitEntry, CycleStatuses
+from app.services.streak_service import Streak
+
+"""
+Frozen final statistics for finished cycles (cycle_snapshots / habit_snapshots).
+
+complete_cycle, abandon_cycle and the cycle scheduler write a snapshot in the same
+transaction as the status change. Stats for finished cycles are then read from the
+snapshot only; unfinished cycles are computed on the fly with the same code.
+"""
+
+FINISHED_STATUSES = (CycleStatuses.COMPLETED, CycleStatuses.ABANDONED)
+
+# Cycle columns the snapshot needs. Anything with these attributes works: ORM
+# objects, or rows from an UPDATE ... RETURNING
+SNAPSHOT_CYCLE_COLUMNS = (
+  HabitCycle.id, HabitCycle.user_id, HabitCycle.status,
+  HabitCycle.created_at, HabitCycle.started_at, HabitCycle.completed_at, HabitCycle.updated_at
+)
+
+
+class SnapshotService:
+  def __init__(self, db: Session):
+    self.db = db
+
+  def snapshot_cycles(self, cycles: Sequence, if_missing: bool = False) -> None:
+    """
+    Persist snapshots for cycles that just finished. Does not commit: callers
+    include it in the transition's transaction.
+
+    :param if_missing: Skip cycles that already have a snapshot (ON CONFLICT DO NOTHING),
+      for lazy writes that can race each other
+    """
+    if not cycles:
+      return
+
+    def insert_into(model):
+      if if_missing:
+        return dialect_insert(self.db, model).on_conflict_do_nothing()
+      return insert(model)
+
+    snapshots = self.compute(cycles)
+    self.db.execute(insert_into(CycleSnapshot), [
+      self._columns(snapshot, CycleSnapshot) for snapshot in snapshots
+    ])
+
+    habit_rows = [
+      self._columns(habit, HabitSnapshot)
+      for snapshot in snapshots
+      for habit in snapshot.habits
+    ]
+    if habit_rows:
+      self.db.execute(insert_into(HabitSnapshot), habit_rows)
+
+  def compute(self, cycles: Sequence, today: Optional[date] = None) -> List[CycleSnapshot]:
+    """
+    Build (unsaved) snapshots from habits and entries, with one query for all cycles.
+    Cycles that haven't finished are measured up to `today`.
+    """
+    today = today or date.today()
+    rows = self.db.execute(
+      select(Habit.habit_cycle_id, Habit.id, Habit.name, HabitEntry.entry_date, HabitEntry.completed)
+      .outerjoin(HabitEntry, HabitEntry.habit_id == Habit.id)
+      .where(Habit.habit_cycle_id.in_([cycle.id for cycle in cycles]))
+      .order_by(Habit.habit_cycle_id, Habit.id, HabitEntry.entry_date)
+    )
+    entries_by_cycle = {
+      cycle_id: list(group)
+      for cycle_id, group in groupby(rows, key=lambda row: row.habit_cycle_id)
+    }
+
+    return [
+      self._build(cycle, entries_by_cycle.get(cycle.id, []), today)
+      for cycle in cycles
+    ]
+
+  def get_stats(self, user_id: int, cycle: HabitCycle) -> CycleSnapshot:
+    """
+    Stats for one of the user's cycles. Finished cycles are read from their snapshot
+    (written now if the cycle finished before snapshots existed); others are computed.
+    """
+    if cycle.status not in FINISHED_STATUSES:
+      return self.compute([cycle])[0]
+
+    snapshot = self.db.scalars(
+      select(CycleSnapshot)
+      .where(CycleSnapshot.cycle_id == cycle.id, CycleSnapshot.user_id == user_id)
+      .options(selectinload(CycleSnapshot.habits))
+    ).first()
+
+    if snapshot is None:
+      # Two requests for the same legacy cycle can get here at once; the loser's insert
+      # is a no-op and it reads the winner's snapshot
+      self.snapshot_cycles([cycle], if_missing=True)
+      self.db.commit()
+      return self.get_stats(user_id, cycle)
+
+    return snapshot
+
+  def backfill(self, batch_size: int = 500) -> int:
+    """Snapshot finished cycles that don't have one yet, committing per batch. Returns the count."""
+    written = 0
+    last_id = 0
+    while True:
+      cycles = self.db.execute(
+        select(*SNAPSHOT_CYCLE_COLUMNS)
+        .where(
+          HabitCycle.id > last_id,
+          HabitCycle.status.in_(FINISHED_STATUSES),
+          ~exists().where(CycleSnapshot.cycle_id == HabitCycle.id)
+        )
+        .order_by(HabitCycle.id)
+        .limit(batch_size)
+      ).all()
+      if not cycles:
+        return written
+
+      self.snapshot_cycles(cycles)
+      self.db.commit()
+      written += len(cycles)
+      last_id = cycles[-1].id
+
+  def _build(self, cycle, rows: Iterable, today: date) -> CycleSnapshot:
+    period_start = (cycle.started_at or cycle.created_at).date()
+    if cycle.status in FINISHED_STATUSES:
+      # Abandoned cycles have no completed_at; the transition is their last update
+      period_end = (cycle.completed_at or cycle.updated_at).date()
+    else:
+      period_end = today
+    days_in_period = max((period_end - period_start).days + 1, 1)
+
+    habits = []
+    active_days = set()
+    for (_, habit_id, name), group in groupby(rows, key=lambda row: row[:3]):
+      logged = [row for row in group if row.entry_date is not None]
+      completed_dates = [row.entry_date for row in logged if row.completed]
+      active_days.update(row.entry_date for row in logged)
+
+      habits.append(HabitSnapshot(
+        habit_id=habit_id,
+        cycle_id=cycle.id,
+        name=name,
+        entries_completed=len(completed_dates),
+        completion_rate=len(completed_dates) / days_in_period,
+        best_streak=Streak.from_dates(completed_dates).longest_streak,
+        days_active=len(logged),
+        first_entry_date=logged[0].entry_date if logged else None,
+        last_entry_date=logged[-1].entry_date if logged else None
+      ))
+
+    first_dates = [habit.first_entry_date for habit in habits if habit.first_entry_date]
+    last_dates = [habit.last_entry_date for habit in habits if habit.last_entry_date]
+    entries_completed = sum(habit.entries_completed for habit in habits)
+
+    return CycleSnapshot(
+      cycle_id=cycle.id,
+      user_id=cycle.user_id,
+      status=cycle.status,
+      period_start=period_start,
+      period_end=period_end,
+      days_in_period=days_in_period,
+      habits_total=len(habits),
+      entries_completed=entries_completed,
+      completion_rate=entries_completed / (len(habits) * days_in_period) if habits else 0.0,
+      best_streak=max((habit.best_streak for habit in habits), default=0),
+      days_active=len(active_days),
+      first_entry_date=min(first_dates, default=None),
+      last_entry_date=max(last_dates, default=None),
+      computed_at=datetime.now(),
+      habits=habits
+    )
+
+  def _columns(self, obj, model) -> Dict:
+    return {column.key: getattr(obj, column.key) for column in model.__table__.columns}
@@ -0,0 +1,157 @@
+from dataclasses import dataclass
+from datetime import date, timedelta
+from itertools import groupby
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from sqlalchemy import select, update, bindparam
+from sqlalchemy.orm import Session
+from app.core.bitmap import decode_days
+from ..models import Habit, HabitEntry, HabitEntryArchive
+from app.services.entity_cache import entity_cache, habit_tag
+
+"""
+Streak counters for habits.
+
+Habits carry current_streak, longest_streak and last_completed_date so streak
+reads are O(1). The entry write paths advance them incrementally; this module
+also recomputes them from habit_entries (and archived history, see ArchiveService)
+for backfills and consistency checks.
+"""
+
+
+@dataclass
+class Streak:
+  current_streak: int = 0
+  longest_streak: int = 0
+  last_completed_date: Optional[date] = None
+
+  @classmethod
+  def of(cls, habit: Habit) -> "Streak":
+    return cls(habit.current_streak or 0, habit.longest_streak or 0, habit.last_completed_date)
+
+  @classmethod
+  def from_dates(cls, completed_dates: Iterable[date]) -> "Streak":
+    """Recompute from scratch. Dates must be ascending."""
+    streak = cls()
+    for completed_on in completed_dates:
+      streak.advance(completed_on)
+    return streak
+
+  def advance(self, completed_on: date) -> bool:
+    """
+    Apply a completion. Returns False if it doesn't move the streak forward
+    (same day, or a date before the last completion, which needs a recompute).
+    """
+    last = self.last_completed_date
+    if last is not None and completed_on <= last:
+      return False
+
+    if last is not None and completed_on - last == timedelta(days=1):
+      self.current_streak += 1
+    else:
+      self.current_streak = 1
+
+    self.longest_streak = max(self.longest_streak, self.current_streak)
+    self.last_completed_date = completed_on
+    return True
+
+  def current_as_of(self, today: date) -> int:
+    """The stored streak is broken once a full day passes without a completion"""
+    if self.last_completed_date is None or today - self.last_completed_date > timedelta(days=1):
+      return 0
+    return self.current_streak
+
+
+class StreakService:
+  def __init__(self, db: Session):
+    self.db = db
+
+  def save(self, streaks: Dict[int, Streak]) -> None:
+    """
+    Write counters for many habits in one executemany UPDATE.
+    Leaves updated_at alone: counters are derived data, not an edit to the habit.
+    Does not commit.
+    """
+    if not streaks:
+      return
+
+    habits = Habit.__table__
+    stmt = (
+      update(habits)
+      .where(habits.c.id == bindparam("b_id"))
+      .values(
+        current_streak=bindparam("b_current"),
+        longest_streak=bindparam("b_longest"),
+        last_completed_date=bindparam("b_last"),
+        updated_at=habits.c.updated_at
+      )
+    )
+    self.db.execute(stmt, [
+      {
+        "b_id": habit_id,
+        "b_current": streak.current_streak,
+        "b_longest": streak.longest_streak,
+        "b_last": streak.last_completed_date
+      }
+      for habit_id, streak in streaks.items()
+    ])
+
+  def recompute(self, batch_size: int = 1000) -> int:
+    """Rewrite every habit whose counters disagree with its entries. Returns the number fixed."""
+    fixed = 0
+    for batch in self._iter_batches(batch_size):
+      changed = {habit_id: expected for habit_id, stored, expected in batch if stored != expected}
+      self.save(changed)
+      entity_cache.invalidate(self.db, *(habit_tag(habit_id) for habit_id in changed))
+      self.db.commit()
+      fixed += len(changed)
+    return fixed
+
+  def find_inconsistencies(self, batch_size: int = 1000) -> List[Tuple[int, Streak, Streak]]:
+    """(habit_id, stored, expected) for every habit whose counters are out of date"""
+    return [
+      row
+      for batch in self._iter_batches(batch_size)
+      for row in batch
+      if row[1] != row[2]
+    ]
+
+  def _iter_batches(self, batch_size: int) -> Iterator[List[Tuple[int, Streak, Streak]]]:
+    """Walk habits in id order, comparing stored counters with a recomputation from entries"""
+    last_id = 0
+    while True:
+      habits = self.db.execute(
+        select(Habit.id, Habit.current_streak, Habit.longest_streak, Habit.last_completed_date)
+        .where(Habit.id > last_id)
+        .order_by(Habit.id)
+        .limit(batch_size)
+      ).all()
+      if not habits:
+        return
+
+      habit_ids = [habit.id for habit in habits]
+      rows = self.db.execute(
+        select(HabitEntry.habit_id, HabitEntry.entry_date)
+        .where(
+          HabitEntry.habit_id.in_(habit_ids),
+          HabitEntry.completed.is_(True)
+        )
+        .order_by(HabitEntry.habit_id, HabitEntry.entry_date)
+      )
+      expected = {
+        habit_id: Streak.from_dates(entry_date for _, entry_date in group)
+        for habit_id, group in groupby(rows, key=lambda row: row[0])
+      }
+
+      # Archived habits have no rows left in habit_entries
+      archived = self.db.execute(
+        select(HabitEntryArchive.habit_id, HabitEntryArchive.start_date, HabitEntryArchive.completed_bitmap)
+        .where(HabitEntryArchive.habit_id.in_(habit_ids))
+      )
+      for habit_id, start, bitmap in archived:
+        expected[habit_id] = Streak.from_dates(decode_days(start, bitmap))
+
+      yield [
+        (habit_id, Streak(current, longest, last), expected.get(habit_id, Streak()))
+        for habit_id, current, longest, last in habits
+      ]
+      last_id = habits[-1].id
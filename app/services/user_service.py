@@ -1,7 +1,14 @@
-from typing import Optional
-from sqlalchemy.orm import Session
-from sqlalchemy.exc import IntegrityError
+from datetime import datetime
+from sqlalchemy import select, exists, literal, delete, insert, true, false
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session, make_transient_to_detached
+from app.core.database import dialect_insert
 from app.models import User, AuthProvider, Providers
+from app.services.identity_cache import invalidate_discord_user
+
+users = User.__table__
+auth_providers = AuthProvider.__table__
 
 
 class UserService:
@@ -13,50 +20,132 @@ class UserService:
     def get_or_create_user_by_discord_id(self, discord_user_id: str) -> User:
         """
         Look up user by Discord ID, or create new User + AuthProvider if not found.
-        Handles concurrent creation race conditions via IntegrityError catch.
+
+        Uses INSERT ... ON CONFLICT on the (provider, provider_user_id) unique index
+        instead of SELECT-then-INSERT, so concurrent first requests for the same Discord
+        user never abort a transaction. On PostgreSQL the lookup and both inserts are a
+        single statement.
 
         :param discord_user_id: The Discord user's ID (string)
         :return: User object (existing or newly created)
         """
-        # Try to find existing AuthProvider for this Discord user
-        auth_provider = self._find_discord_auth_provider(discord_user_id)
-
-        if auth_provider:
-            return auth_provider.user
-
-        # Create new user + auth provider in transaction
-        try:
-            return self._create_user_with_discord_auth(discord_user_id)
-        except IntegrityError:
-            # Concurrent creation - another request created the user
-            self.db.rollback()
-            auth_provider = self._find_discord_auth_provider(discord_user_id)
-            if auth_provider:
-                return auth_provider.user
-            raise  # Re-raise if still not found (unexpected)
-
-    def _find_discord_auth_provider(self, discord_user_id: str) -> Optional[AuthProvider]:
-        """Query AuthProvider by Discord provider and user ID."""
-        return self.db.query(AuthProvider).filter(
-            AuthProvider.provider == Providers.DISCORD,
-            AuthProvider.provider_user_id == discord_user_id
+        if self.db.get_bind().dialect.name == "postgresql":
+            row, created = self._upsert_discord_user_postgresql(discord_user_id)
+        else:
+            row, created = self._upsert_discord_user(discord_user_id)
+
+        if created:
+            self.db.commit()
+            invalidate_discord_user(discord_user_id)
+
+        return self._attach_user(row)
+
+    def _upsert_discord_user_postgresql(self, discord_user_id: str) -> tuple[Row, bool]:
+        """
+        One round trip: resolve the existing user, or insert users + auth_providers
+        through data-modifying CTEs.
+        """
+        now = datetime.now()
+
+        existing = self._discord_user_query(discord_user_id).cte("existing")
+
+        new_user = (
+            insert(users)
+            .from_select(
+                ["created_at", "updated_at"],
+                select(literal(now), literal(now)).where(~exists(select(existing.c.id)))
+            )
+            .returning(users.c.id, users.c.created_at, users.c.updated_at)
+            .cte("new_user")
+        )
+
+        new_provider = (
+            postgresql.insert(auth_providers)
+            .from_select(
+                ["user_id", "provider", "provider_user_id", "created_at", "updated_at"],
+                select(
+                    new_user.c.id,
+                    literal(Providers.DISCORD, auth_providers.c.provider.type),
+                    literal(discord_user_id),
+                    literal(now),
+                    literal(now)
+                )
+            )
+            .on_conflict_do_nothing(index_elements=["provider", "provider_user_id"])
+            .returning(auth_providers.c.user_id)
+            .cte("new_provider")
+        )
+
+        stmt = select(
+            existing.c.id, existing.c.created_at, existing.c.updated_at,
+            false().label("created"), true().label("linked")
+        ).union_all(
+            select(
+                new_user.c.id, new_user.c.created_at, new_user.c.updated_at,
+                true().label("created"), exists(select(new_provider.c.user_id)).label("linked")
+            )
+        )
+
+        row = self.db.execute(stmt).one()
+
+        if not row.linked:
+            # Another request linked this Discord user first; drop our orphaned user
+            return self._discard_orphan_user(row.id, discord_user_id), True
+
+        return row, row.created
+
+    def _upsert_discord_user(self, discord_user_id: str) -> tuple[Row, bool]:
+        """
+        Dialects without writable CTEs (SQLite in tests): lookup, then insert the
+        user and claim the Discord id with ON CONFLICT DO NOTHING.
+        """
+        row = self.db.execute(self._discord_user_query(discord_user_id)).first()
+        if row is not None:
+            return row, False
+
+        now = datetime.now()
+        row = self.db.execute(
+            insert(users)
+            .values(created_at=now, updated_at=now)
+            .returning(users.c.id, users.c.created_at, users.c.updated_at)
+        ).one()
+
+        linked = self.db.execute(
+            dialect_insert(self.db, auth_providers)
+            .values(
+                user_id=row.id,
+                provider=Providers.DISCORD,
+                provider_user_id=discord_user_id,
+                created_at=now,
+                updated_at=now
+            )
+            .on_conflict_do_nothing(index_elements=["provider", "provider_user_id"])
+            .returning(auth_providers.c.user_id)
         ).first()
 
-    def _create_user_with_discord_auth(self, discord_user_id: str) -> User:
-        """Create User and linked AuthProvider in a single transaction."""
-        # Create minimal user (just timestamps, which have defaults)
-        user = User()
-        self.db.add(user)
-        self.db.flush()  # Get user.id without committing
-
-        # Create AuthProvider linking to Discord
-        auth_provider = AuthProvider(
-            user_id=user.id,
-            provider=Providers.DISCORD,
-            provider_user_id=discord_user_id
+        if linked is None:
+            return self._discard_orphan_user(row.id, discord_user_id), True
+
+        return row, True
+
+    def _discard_orphan_user(self, orphan_user_id: int, discord_user_id: str) -> Row:
+        """Lost a creation race: delete the user we inserted and return the winner's"""
+        self.db.execute(delete(users).where(users.c.id == orphan_user_id))
+        return self.db.execute(self._discord_user_query(discord_user_id)).one()
+
+    def _discord_user_query(self, discord_user_id: str):
+        """User columns for the Discord provider ID, resolved in one joined query."""
+        return (
+            select(users.c.id, users.c.created_at, users.c.updated_at)
+            .join(auth_providers, auth_providers.c.user_id == users.c.id)
+            .where(
+                auth_providers.c.provider == Providers.DISCORD,
+                auth_providers.c.provider_user_id == discord_user_id
+            )
         )
-        self.db.add(auth_provider)
-        self.db.commit()
-        self.db.refresh(user)
 
-        return user
+    def _attach_user(self, row: Row) -> User:
+        """Build a persistent User from returned columns without another SELECT."""
+        user = User(id=row.id, created_at=row.created_at, updated_at=row.updated_at)
+        make_transient_to_detached(user)
+        return self.db.merge(user, load=False)
@@ -0,0 +1,182 @@
+import asyncio
+import math
+import socket
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Tuple
+import httpx
+
+"""
+Load generation and reporting for the benchmark runner.
+
+A scenario yields (method, url) requests; `run_level` sends them with a fixed number
+of concurrent workers and records per-request latency. Results are plain dicts so they
+can be written to JSON and compared with a stored baseline.
+"""
+
+RequestSpec = Tuple[str, str]
+
+
+@dataclass
+class Scenario:
+  name: str
+  requests: Callable[[], Iterator[RequestSpec]]
+  # Requests that change data can only be issued once per target (POST .../complete)
+  consumes_targets: bool = False
+
+
+@dataclass
+class LevelResult:
+  concurrency: int
+  requests: int = 0
+  errors: int = 0
+  duration_seconds: float = 0.0
+  latencies_ms: List[float] = field(default_factory=list, repr=False)
+
+  def summary(self) -> dict:
+    latencies = sorted(self.latencies_ms)
+    return {
+      "concurrency": self.concurrency,
+      "requests": self.requests,
+      "errors": self.errors,
+      "duration_seconds": round(self.duration_seconds, 4),
+      "throughput_rps": round(self.requests / self.duration_seconds, 2) if self.duration_seconds else 0.0,
+      "p50_ms": round(percentile(latencies, 50), 3),
+      "p95_ms": round(percentile(latencies, 95), 3),
+      "p99_ms": round(percentile(latencies, 99), 3),
+    }
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+  """Nearest-rank percentile of an already sorted list"""
+  if not sorted_values:
+    return 0.0
+  rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+  return sorted_values[rank - 1]
+
+
+async def run_level(
+  client: httpx.AsyncClient,
+  requests: Iterator[RequestSpec],
+  concurrency: int,
+  total: int,
+  headers: Dict[str, str]
+) -> LevelResult:
+  """Send up to `total` requests from `requests` with `concurrency` workers"""
+  result = LevelResult(concurrency=concurrency)
+  remaining = iter(_take(requests, total))
+
+  async def worker():
+    for method, url in remaining:
+      started = time.perf_counter()
+      try:
+        response = await client.request(method, url, headers=headers)
+        failed = response.status_code >= 400
+      except httpx.HTTPError:
+        failed = True
+      result.latencies_ms.append((time.perf_counter() - started) * 1000)
+      result.requests += 1
+      result.errors += failed
+
+  started = time.perf_counter()
+  await asyncio.gather(*(worker() for _ in range(concurrency)))
+  result.duration_seconds = time.perf_counter() - started
+  return result
+
+
+def _take(iterator: Iterator[RequestSpec], count: int) -> Iterator[RequestSpec]:
+  for _ in range(count):
+    try:
+      yield next(iterator)
+    except StopIteration:
+      return
+
+
+async def run_scenarios(
+  client: httpx.AsyncClient,
+  scenarios: List[Scenario],
+  concurrency_levels: List[int],
+  requests_per_level: int,
+  headers: Dict[str, str],
+  warmup: int = 20
+) -> Dict[str, Dict[str, dict]]:
+  results = {}
+  for scenario in scenarios:
+    requests = scenario.requests()
+    if not scenario.consumes_targets:
+      # Warm caches and connection pools; write scenarios can't spare targets
+      await run_level(client, requests, concurrency=1, total=warmup, headers=headers)
+
+    results[scenario.name] = {}
+    for concurrency in concurrency_levels:
+      level = await run_level(client, requests, concurrency, requests_per_level, headers)
+      results[scenario.name][str(concurrency)] = level.summary()
+  return results
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> List[str]:
+  """
+  Regressions of `current` against `baseline` results: p95 latency up, or throughput
+  down, by more than `tolerance` (0.2 = 20%). Scenarios missing from either are skipped.
+  """
+  regressions = []
+  for scenario, levels in current["results"].items():
+    for concurrency, stats in levels.items():
+      base = baseline.get("results", {}).get(scenario, {}).get(concurrency)
+      if base is None:
+        continue
+
+      label = f"{scenario} @ {concurrency}"
+      if base["p95_ms"] and stats["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+        regressions.append(f"{label}: p95 {stats['p95_ms']:.2f}ms vs baseline {base['p95_ms']:.2f}ms")
+      if base["throughput_rps"] and stats["throughput_rps"] < base["throughput_rps"] * (1 - tolerance):
+        regressions.append(f"{label}: {stats['throughput_rps']:.1f} req/s vs baseline {base['throughput_rps']:.1f} req/s")
+      if stats["errors"] > base["errors"]:
+        regressions.append(f"{label}: {stats['errors']} errors vs baseline {base['errors']}")
+  return regressions
+
+
+def format_table(results: Dict[str, Dict[str, dict]]) -> str:
+  lines = [f"{'scenario':<22}{'conc':>6}{'reqs':>7}{'err':>5}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"]
+  for scenario, levels in results.items():
+    for stats in levels.values():
+      lines.append(
+        f"{scenario:<22}{stats['concurrency']:>6}{stats['requests']:>7}{stats['errors']:>5}"
+        f"{stats['throughput_rps']:>10.1f}{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}"
+      )
+  return "\n".join(lines)
+
+
+class UvicornServer:
+  """Runs the app over real HTTP on a free local port, in a background thread"""
+
+  def __init__(self, app, log_level: str = "warning"):
+    import uvicorn
+
+    self.port = self._free_port()
+    self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level=log_level))
+    self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+  @property
+  def base_url(self) -> str:
+    return f"http://127.0.0.1:{self.port}"
+
+  def __enter__(self) -> "UvicornServer":
+    self.thread.start()
+    deadline = time.monotonic() + 10
+    while not self.server.started:
+      if time.monotonic() > deadline:
+        raise RuntimeError("uvicorn did not start within 10s")
+      time.sleep(0.05)
+    return self
+
+  def __exit__(self, *exc_info) -> None:
+    self.server.should_exit = True
+    self.thread.join(timeout=10)
+
+  @staticmethod
+  def _free_port() -> int:
+    with socket.socket() as sock:
+      sock.bind(("127.0.0.1", 0))
+      return sock.getsockname()[1]
@@ -0,0 +1,178 @@
+"""
+HTTP benchmarks for the bot's hot endpoints.
+
+Seeds a dedicated database, then drives app.main.app either in-process (httpx ASGI
+transport, no network) or over uvicorn on a local port:
+
+  python -m benchmarks.run --scale small --concurrency 1,8,32
+  python -m benchmarks.run --mode uvicorn --database-url postgresql://.../habits_bench
+  python -m benchmarks.run --save-baseline          # record benchmarks/baseline.json
+  python -m benchmarks.run --baseline benchmarks/baseline.json --tolerance 0.2
+
+Results are written as JSON to benchmarks/results/. With --baseline, the run exits 1
+when any scenario's p95 or throughput is more than --tolerance worse than the baseline.
+Baselines depend on the machine, so they are kept locally (see .gitignore).
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import platform
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+BENCH_DIR = Path(__file__).parent
+DEFAULT_BASELINE = BENCH_DIR / "baseline.json"
+DEFAULT_DATABASE_URL = f"sqlite:///{BENCH_DIR / 'results' / 'bench.db'}"
+
+
+def parse_args():
+  parser = argparse.ArgumentParser(description="Benchmark the hot API endpoints against a seeded database")
+  parser.add_argument("--scale", default="small", help="Dataset size: small, medium or large")
+  parser.add_argument("--seed", type=int, default=42, help="Random seed for the dataset")
+  parser.add_argument("--database-url", default=DEFAULT_DATABASE_URL, help="Database to (re)create and seed. Its contents are dropped.")
+  parser.add_argument("--mode", choices=["inprocess", "uvicorn"], default="inprocess")
+  parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated concurrency levels")
+  parser.add_argument("--requests", type=int, default=200, help="Requests per scenario and concurrency level")
+  parser.add_argument("--scenarios", default=None, help="Comma-separated subset of scenarios to run")
+  parser.add_argument("--output", type=Path, default=None, help="Results file (default: benchmarks/results/<timestamp>.json)")
+  parser.add_argument("--baseline", type=Path, default=None, help="Compare with this results file and fail on regressions")
+  parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed regression against the baseline (0.2 = 20%%)")
+  parser.add_argument("--save-baseline", action="store_true", help=f"Also write the results to {DEFAULT_BASELINE}")
+  return parser.parse_args()
+
+
+def configure_environment(database_url: str) -> None:
+  """Settings are read at import time, so point the app at the benchmark database first"""
+  os.environ["DATABASE_URL"] = database_url
+  os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+  os.environ.setdefault("DISCORD_CLIENT_ID", "benchmark")
+  os.environ.setdefault("DISCORD_CLIENT_SECRET", "benchmark")
+  os.environ.setdefault("BOT_JWT", "benchmark")
+  os.environ["ENVIRONMENT"] = "benchmark"
+  os.environ["CYCLE_SCHEDULER_ENABLED"] = "false"
+
+
+def build_scenarios(data):
+  from benchmarks.harness import Scenario
+
+  def cycled(items):
+    return itertools.cycle(items)
+
+  def list_cycles():
+    for discord_id in cycled(data.discord_ids):
+      yield "GET", f"/cycles?discord_user_id={discord_id}"
+
+  def get_cycle():
+    for discord_id, cycle_id in cycled(data.cycles):
+      yield "GET", f"/cycles/{cycle_id}?discord_user_id={discord_id}"
+
+  def get_today_entry():
+    for discord_id, habit_id in cycled(data.active_habits):
+      yield "GET", f"/habits/{habit_id}/entries/today?discord_user_id={discord_id}"
+
+  def complete_habit():
+    # One completion per active habit per day, so targets are used up, never repeated
+    for discord_id, habit_id in data.active_habits:
+      yield "POST", f"/habits/{habit_id}/complete?discord_user_id={discord_id}"
+
+  return [
+    Scenario("list_cycles", list_cycles),
+    Scenario("get_cycle", get_cycle),
+    Scenario("get_today_entry", get_today_entry),
+    Scenario("complete_habit", complete_habit, consumes_targets=True),
+  ]
+
+
+async def drive(app, base_url, scenarios, concurrency_levels, requests_per_level, headers, mode):
+  import httpx
+  from benchmarks.harness import run_scenarios
+
+  limits = httpx.Limits(max_connections=max(concurrency_levels), max_keepalive_connections=max(concurrency_levels))
+  if mode == "inprocess":
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+  else:
+    client = httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30)
+
+  async with client:
+    return await run_scenarios(client, scenarios, concurrency_levels, requests_per_level, headers)
+
+
+def main() -> int:
+  args = parse_args()
+  (BENCH_DIR / "results").mkdir(exist_ok=True)
+  configure_environment(args.database_url)
+  logging.getLogger("httpx").setLevel(logging.WARNING)
+
+  from sqlalchemy import create_engine
+  from app.core.database import Base
+  from app.core.security import create_access_token
+  from app.main import app
+  from benchmarks.harness import UvicornServer, compare, format_table
+  from benchmarks.seed import SCALES, seed
+
+  scale = SCALES[args.scale]
+  engine = create_engine(args.database_url)
+  Base.metadata.drop_all(engine)
+  Base.metadata.create_all(engine)
+  print(f"Seeding {args.scale} dataset ({scale}) into {engine.url.render_as_string(hide_password=True)}...")
+  data = seed(engine, scale, args.seed)
+  engine.dispose()
+
+  concurrency_levels = [int(level) for level in args.concurrency.split(",")]
+  scenarios = build_scenarios(data)
+  if args.scenarios:
+    wanted = set(args.scenarios.split(","))
+    scenarios = [scenario for scenario in scenarios if scenario.name in wanted]
+
+  headers = {"Authorization": f"Bearer {create_access_token(user_id=data.bot_user_id)}"}
+  print(f"Running {[s.name for s in scenarios]} at concurrency {concurrency_levels} ({args.mode})...")
+
+  if args.mode == "uvicorn":
+    with UvicornServer(app) as server:
+      results = asyncio.run(drive(app, server.base_url, scenarios, concurrency_levels, args.requests, headers, args.mode))
+  else:
+    results = asyncio.run(drive(app, None, scenarios, concurrency_levels, args.requests, headers, args.mode))
+
+  report = {
+    "meta": {
+      "timestamp": datetime.now().isoformat(timespec="seconds"),
+      "mode": args.mode,
+      "scale": args.scale,
+      "seed": args.seed,
+      "database": engine.dialect.name,
+      "requests_per_level": args.requests,
+      "python": platform.python_version(),
+      "machine": platform.machine(),
+    },
+    "results": results,
+  }
+
+  print(format_table(results))
+
+  output = args.output or BENCH_DIR / "results" / f"{datetime.now():%Y%m%d-%H%M%S}-{args.mode}-{args.scale}.json"
+  output.write_text(json.dumps(report, indent=2))
+  print(f"Results written to {output}")
+  if args.save_baseline:
+    DEFAULT_BASELINE.write_text(json.dumps(report, indent=2))
+    print(f"Baseline written to {DEFAULT_BASELINE}")
+
+  if args.baseline:
+    regressions = compare(report, json.loads(args.baseline.read_text()), args.tolerance)
+    if regressions:
+      print(f"❌ {len(regressions)} regression(s) against {args.baseline}:")
+      for regression in regressions:
+        print(f"  {regression}")
+      return 1
+    print(f"✅ No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+  return 0
+
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -0,0 +1,148 @@
+import random
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Iterable, List, Tuple
+from sqlalchemy import insert
+from sqlalchemy.engine import Engine
+from app.models import User, AuthProvider, Providers, HabitCycle, CycleTypes, CycleStatuses, Habit, HabitEntry
+
+"""
+Deterministic benchmark dataset.
+
+Every user gets an ACTIVE daily and an ACTIVE weekly cycle (the bot's hot path) plus a
+COMPLETED monthly cycle, each with `habits_per_cycle` habits and `history_days` of
+entries before today. Nothing is logged for today, so POST /habits/{id}/complete has
+one fresh target per active habit.
+"""
+
+USERS = User.__table__
+AUTH_PROVIDERS = AuthProvider.__table__
+CYCLES = HabitCycle.__table__
+HABITS = Habit.__table__
+ENTRIES = HabitEntry.__table__
+
+
+@dataclass(frozen=True)
+class Scale:
+  users: int
+  habits_per_cycle: int
+  history_days: int
+
+
+SCALES = {
+  "small": Scale(users=100, habits_per_cycle=5, history_days=30),
+  "medium": Scale(users=1000, habits_per_cycle=5, history_days=90),
+  "large": Scale(users=5000, habits_per_cycle=8, history_days=365),
+}
+
+
+@dataclass
+class SeededData:
+  bot_user_id: int
+  discord_ids: List[str] = field(default_factory=list)
+  # (discord_user_id, cycle_id) for every cycle, and (discord_user_id, habit_id) for active habits
+  cycles: List[Tuple[str, int]] = field(default_factory=list)
+  active_habits: List[Tuple[str, int]] = field(default_factory=list)
+
+
+def _insert_returning_ids(connection, table, rows: List[dict], batch_size: int = 5000) -> List[int]:
+  ids = []
+  for start in range(0, len(rows), batch_size):
+    result = connection.execute(
+      insert(table).returning(table.c.id, sort_by_parameter_order=True),
+      rows[start:start + batch_size]
+    )
+    ids.extend(result.scalars())
+  return ids
+
+
+def _insert(connection, table, rows: Iterable[dict], batch_size: int = 5000) -> None:
+  batch = []
+  for row in rows:
+    batch.append(row)
+    if len(batch) == batch_size:
+      connection.execute(insert(table), batch)
+      batch = []
+  if batch:
+    connection.execute(insert(table), batch)
+
+
+def seed(engine: Engine, scale: Scale, seed_value: int = 42) -> SeededData:
+  rng = random.Random(seed_value)
+  now = datetime.now()
+  today = date.today()
+
+  with engine.begin() as connection:
+    bot_user_id = _insert_returning_ids(connection, USERS, [{"created_at": now, "updated_at": now}])[0]
+    user_ids = _insert_returning_ids(connection, USERS, [{"created_at": now, "updated_at": now} for _ in range(scale.users)])
+
+    data = SeededData(bot_user_id=bot_user_id, discord_ids=[f"bench-{user_id}" for user_id in user_ids])
+    _insert(connection, AUTH_PROVIDERS, (
+      {
+        "user_id": user_id,
+        "provider": Providers.DISCORD,
+        "provider_user_id": discord_id,
+        "created_at": now,
+        "updated_at": now
+      }
+      for user_id, discord_id in zip(user_ids, data.discord_ids)
+    ))
+
+    started = now - timedelta(days=scale.history_days)
+    cycle_specs = [
+      (CycleTypes.DAILY, CycleStatuses.ACTIVE, None),
+      (CycleTypes.WEEKLY, CycleStatuses.ACTIVE, None),
+      (CycleTypes.MONTHLY, CycleStatuses.COMPLETED, now - timedelta(days=1)),
+    ]
+    cycle_rows = [
+      {
+        "user_id": user_id,
+        "name": f"{cycle_type.value} cycle",
+        "cycle_type": cycle_type,
+        "status": status,
+        "created_at": started,
+        "started_at": started,
+        "completed_at": completed_at,
+        "updated_at": now
+      }
+      for user_id in user_ids
+      for cycle_type, status, completed_at in cycle_specs
+    ]
+    cycle_ids = _insert_returning_ids(connection, CYCLES, cycle_rows)
+    cycle_owner = {}
+    for index, cycle_id in enumerate(cycle_ids):
+      discord_id = data.discord_ids[index // len(cycle_specs)]
+      cycle_owner[cycle_id] = (discord_id, cycle_rows[index]["status"])
+      data.cycles.append((discord_id, cycle_id))
+
+    habit_rows = [
+      {"habit_cycle_id": cycle_id, "name": f"Habit {i}", "created_at": started, "updated_at": now}
+      for cycle_id in cycle_ids
+      for i in range(scale.habits_per_cycle)
+    ]
+    habit_ids = _insert_returning_ids(connection, HABITS, habit_rows)
+
+    # Each habit has its own completion rate, so history isn't uniform
+    def entries():
+      for habit_id, habit_row in zip(habit_ids, habit_rows):
+        rate = rng.uniform(0.4, 0.95)
+        for days_ago in range(scale.history_days, 0, -1):
+          completed = rng.random() < rate
+          entry_date = today - timedelta(days=days_ago)
+          yield {
+            "habit_id": habit_id,
+            "entry_date": entry_date,
+            "completed": completed,
+            "completed_at": datetime.combine(entry_date, datetime.min.time()) + timedelta(hours=20) if completed else None,
+            "created_at": now
+          }
+
+    _insert(connection, ENTRIES, entries())
+
+    for habit_id, habit_row in zip(habit_ids, habit_rows):
+      discord_id, status = cycle_owner[habit_row["habit_cycle_id"]]
+      if status == CycleStatuses.ACTIVE:
+        data.active_habits.append((discord_id, habit_id))
+
+  rng.shuffle(data.active_habits)
+  return data
@@ -0,0 +1,125 @@
+"""
+Serialization cost of list responses: FastAPI's default path against the fast path.
+
+  python -m benchmarks.serialization --rows 1000 --repeat 50
+
+Default: HabitCycle ORM objects validated into List[CycleListResponse] (from_attributes),
+then jsonable_encoder and json.dumps, as FastAPI does for a response_model.
+Fast: column-only rows encoded with app.core.serialization.dump_list.
+
+Both sides load from the same in-memory SQLite table, and loading is timed separately
+so the numbers show the query and the serialization cost per page of rows.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+
+def parse_args():
+  parser = argparse.ArgumentParser(description="Compare list response serialization paths")
+  parser.add_argument("--rows", type=int, default=1000, help="Cycles per response")
+  parser.add_argument("--repeat", type=int, default=50, help="Timed runs per measurement (median is reported)")
+  return parser.parse_args()
+
+
+def timed(fn, repeat: int) -> float:
+  """Median milliseconds per call"""
+  fn()  # warm up
+  samples = []
+  for _ in range(repeat):
+    started = time.perf_counter()
+    fn()
+    samples.append((time.perf_counter() - started) * 1000)
+  return statistics.median(samples)
+
+
+def main() -> int:
+  args = parse_args()
+  os.environ["DATABASE_URL"] = "sqlite://"
+  for name in ("SECRET_KEY", "DISCORD_CLIENT_ID", "DISCORD_CLIENT_SECRET", "BOT_JWT"):
+    os.environ.setdefault(name, "benchmark")
+
+  import json
+  from typing import List
+  from fastapi.encoders import jsonable_encoder
+  from pydantic import TypeAdapter
+  from sqlalchemy import create_engine, select
+  from sqlalchemy.orm import Session
+  from app.core.database import Base
+  from app.core.serialization import dump_list, model_columns
+  from app.models import User, HabitCycle, CycleTypes, CycleStatuses
+  from app.schemas.habit import CycleListResponse
+
+  engine = create_engine("sqlite://")
+  Base.metadata.create_all(engine)
+  with Session(engine) as db:
+    user = User()
+    db.add(user)
+    db.flush()
+    created = datetime(2025, 1, 1, 8, 0)
+    db.add_all(
+      HabitCycle(
+        user_id=user.id,
+        name=f"Cycle {i}",
+        cycle_type=list(CycleTypes)[i % len(CycleTypes)],
+        # One ACTIVE cycle per type at most; the newest ones, with no completed_at
+        status=CycleStatuses.ACTIVE if i >= args.rows - len(CycleTypes) else CycleStatuses.COMPLETED,
+        created_at=created + timedelta(minutes=i),
+        started_at=created + timedelta(minutes=i, seconds=30),
+        completed_at=None if i >= args.rows - len(CycleTypes) else created + timedelta(days=7, minutes=i)
+      )
+      for i in range(args.rows)
+    )
+    db.commit()
+
+    adapter = TypeAdapter(List[CycleListResponse])
+    query = select(HabitCycle).order_by(HabitCycle.id)
+    column_query = select(*model_columns(CycleListResponse, HabitCycle)).order_by(HabitCycle.id)
+
+    def load_objects():
+      db.expunge_all()
+      return db.scalars(query).all()
+
+    def load_rows():
+      return db.execute(column_query).all()
+
+    objects = load_objects()
+    rows = load_rows()
+
+    def default_path():
+      content = jsonable_encoder(adapter.validate_python(objects, from_attributes=True))
+      return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+    def fast_path():
+      return dump_list(CycleListResponse, rows)
+
+    if default_path() != fast_path():
+      print("❌ The two paths produce different JSON")
+      return 1
+
+    per_1k = 1000 / args.rows
+    results = [
+      ("load ORM objects", timed(load_objects, args.repeat)),
+      ("load column rows", timed(load_rows, args.repeat)),
+      ("serialize (default)", timed(default_path, args.repeat)),
+      ("serialize (fast)", timed(fast_path, args.repeat)),
+    ]
+
+  print(f"{args.rows} cycles, median of {args.repeat} runs, scaled to 1k cycles:")
+  for label, ms in results:
+    print(f"  {label:<22}{ms * per_1k:>9.2f} ms")
+  default_total = results[0][1] + results[2][1]
+  fast_total = results[1][1] + results[3][1]
+  print(f"  {'total (default)':<22}{default_total * per_1k:>9.2f} ms")
+  print(f"  {'total (fast)':<22}{fast_total * per_1k:>9.2f} ms  ({default_total / fast_total:.1f}x)")
+  return 0
+
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -0,0 +1,31 @@
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services.archive_service import ArchiveService
+
+def archive_entries(batch_size: int, older_than_days: int, max_batches: int = None):
+  db = SessionLocal()
+  try:
+    print(f"Archiving entries of cycles finished more than {older_than_days} day(s) ago...")
+    moved = ArchiveService(db).archive_finished(
+      batch_size=batch_size, older_than_days=older_than_days, max_batches=max_batches
+    )
+    print(f"✅ Moved {moved} entr{'y' if moved == 1 else 'ies'} to habit_entry_archives")
+  except Exception as e:
+    print(f"Error archiving entries: {e}")
+    db.rollback()
+  finally:
+    db.close()
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Move entries of finished cycles into compact per-habit archives (run off-peak, e.g. nightly from cron)")
+  parser.add_argument("--batch-size", type=int, default=settings.ARCHIVE_BATCH_SIZE, help="Cycles per transaction")
+  parser.add_argument("--older-than-days", type=int, default=settings.ARCHIVE_AFTER_DAYS)
+  parser.add_argument("--max-batches", type=int, default=None, help="Stop after this many batches, to fit an off-peak window")
+  args = parser.parse_args()
+  archive_entries(args.batch_size, args.older_than_days, args.max_batches)
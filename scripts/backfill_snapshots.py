@@ -0,0 +1,26 @@
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.database import SessionLocal
+from app.services.snapshot_service import SnapshotService
+
+def backfill_snapshots(batch_size: int):
+  db = SessionLocal()
+  try:
+    print("Snapshotting finished cycles without final stats...")
+    written = SnapshotService(db).backfill(batch_size=batch_size)
+    print(f"✅ Wrote snapshots for {written} cycle(s)")
+  except Exception as e:
+    print(f"Error backfilling snapshots: {e}")
+    db.rollback()
+  finally:
+    db.close()
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Write frozen stats snapshots for cycles that finished before snapshots existed")
+  parser.add_argument("--batch-size", type=int, default=500)
+  args = parser.parse_args()
+  backfill_snapshots(args.batch_size)
@@ -0,0 +1,39 @@
+import argparse
+import asyncio
+import logging
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.config import settings
+from app.services.cycle_scheduler import CycleScheduler
+
+def run_cycle_scheduler(once: bool, interval: int, batch_size: int):
+  scheduler = CycleScheduler(batch_size=batch_size)
+
+  if once:
+    stats = scheduler.run_once()
+    if not stats.locked:
+      print("Another scheduler holds the lock, nothing done")
+      return
+    print(f"✅ Completed {stats.cycles_completed} cycle(s) in {stats.batches} batch(es), "
+          f"{stats.duration_seconds:.3f}s ({stats.cycles_per_second:.1f} cycles/s)")
+    return
+
+  print(f"Cycle scheduler running every {interval}s (Ctrl+C to stop)")
+  asyncio.run(scheduler.run_forever(interval))
+
+if __name__ == "__main__":
+  logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+  parser = argparse.ArgumentParser(description="Auto-complete ACTIVE cycles whose period has ended")
+  parser.add_argument("--once", action="store_true", help="Run a single pass and exit")
+  parser.add_argument("--interval", type=int, default=settings.CYCLE_SCHEDULER_INTERVAL_SECONDS)
+  parser.add_argument("--batch-size", type=int, default=settings.CYCLE_SCHEDULER_BATCH_SIZE)
+  args = parser.parse_args()
+
+  try:
+    run_cycle_scheduler(args.once, args.interval, args.batch_size)
+  except KeyboardInterrupt:
+    pass
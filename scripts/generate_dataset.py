@@ -0,0 +1,364 @@
+import argparse
+import csv
+import io
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, time as dt_time, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, text
+from app.models import CycleTypes, CycleStatuses, Providers
+from app.services.cycle_scheduler import period_end
+from app.services.streak_service import Streak
+
+"""
+Synthetic dataset generator for load testing.
+
+Bulk-loads users with Discord auth providers, a history of cycles across every
+CycleType and CycleStatus, and years of habit_entries with per-habit completion
+habits: a base rate, weekend dips, streaky day-to-day behaviour and some
+abandoned cycles. PostgreSQL is loaded with COPY; SQLite with executemany.
+
+Output is deterministic for a given --seed, --end-date and starting (empty) database:
+every user draws from its own RNG, so batch sizes don't change the data.
+
+  python scripts/generate_dataset.py --users 10000 --years 3 --seed 7
+  python scripts/generate_dataset.py --database-url sqlite:///load.db --create-tables --users 500
+
+Derived tables (rollups, snapshots) aren't written; see the hint printed at the end.
+"""
+
+HABIT_NAMES = [
+  "Exercise", "Read", "Meditate", "Drink water", "Journal", "Stretch", "Study", "Walk",
+  "Sleep by 11", "No sugar", "Practice guitar", "Cook at home", "Floss", "Language lesson",
+]
+
+# How often users pick each cycle length
+CYCLE_TYPE_WEIGHTS = {
+  CycleTypes.DAILY: 0.1,
+  CycleTypes.WEEKLY: 0.35,
+  CycleTypes.MONTHLY: 0.4,
+  CycleTypes.YEARLY: 0.15,
+}
+
+USER_COLUMNS = ("id", "created_at", "updated_at")
+AUTH_PROVIDER_COLUMNS = ("user_id", "provider", "provider_user_id", "created_at", "updated_at")
+CYCLE_COLUMNS = ("id", "user_id", "name", "cycle_type", "status", "created_at", "started_at", "completed_at", "updated_at")
+HABIT_COLUMNS = (
+  "id", "habit_cycle_id", "name", "created_at", "updated_at",
+  "current_streak", "longest_streak", "last_completed_date"
+)
+ENTRY_COLUMNS = ("habit_id", "entry_date", "completed", "completed_at", "created_at")
+
+
+@dataclass
+class DatasetConfig:
+  users: int
+  years: float
+  seed: int
+  end_date: date
+  min_habits: int = 3
+  max_habits: int = 6
+  abandon_rate: float = 0.15      # Chance a cycle is abandoned part-way through
+  draft_rate: float = 0.2         # Chance a user also has an unstarted DRAFT cycle
+  skipped_logged_rate: float = 0.3  # Chance a missed day still gets a completed=False entry
+
+
+@dataclass
+class Batch:
+  users: List[tuple] = field(default_factory=list)
+  auth_providers: List[tuple] = field(default_factory=list)
+  cycles: List[tuple] = field(default_factory=list)
+  habits: List[tuple] = field(default_factory=list)
+  entries: List[tuple] = field(default_factory=list)
+
+  def tables(self) -> List[Tuple[str, Sequence[str], List[tuple]]]:
+    """In foreign key order"""
+    return [
+      ("users", USER_COLUMNS, self.users),
+      ("auth_providers", AUTH_PROVIDER_COLUMNS, self.auth_providers),
+      ("habit_cycles", CYCLE_COLUMNS, self.cycles),
+      ("habits", HABIT_COLUMNS, self.habits),
+      ("habit_entries", ENTRY_COLUMNS, self.entries),
+    ]
+
+
+class DatasetGenerator:
+  """Builds rows user by user. Ids are allocated here so parents and children can be linked without RETURNING."""
+
+  def __init__(self, config: DatasetConfig, next_ids: Dict[str, int]):
+    self.config = config
+    self.next_ids = dict(next_ids)
+    self.start_date = config.end_date - timedelta(days=int(config.years * 365))
+
+  def _id(self, table: str) -> int:
+    value = self.next_ids[table]
+    self.next_ids[table] = value + 1
+    return value
+
+  def generate_user(self, index: int, batch: Batch) -> None:
+    rng = random.Random(f"{self.config.seed}:{index}")
+    user_id = self._id("users")
+    joined = _timestamp(_at(self.start_date - timedelta(days=rng.randint(0, 30)), rng))
+
+    batch.users.append((user_id, joined, joined))
+    batch.auth_providers.append((user_id, Providers.DISCORD.name, str(10**17 + user_id), joined, joined))
+
+    cycle_types = list(CYCLE_TYPE_WEIGHTS)
+    weights = list(CYCLE_TYPE_WEIGHTS.values())
+    # Some users drift away: their last cycle ends well before end_date
+    last_active = self.config.end_date if rng.random() > 0.1 else self.start_date + timedelta(
+      days=rng.randint(0, max((self.config.end_date - self.start_date).days, 1))
+    )
+    # Users differ in how consistent they are; habits vary around that
+    consistency = rng.betavariate(4, 2)
+
+    day = self.start_date + timedelta(days=rng.randint(0, 14))
+    while day < last_active:
+      cycle_type = rng.choices(cycle_types, weights)[0]
+      started = _at(day, rng)
+      ends = period_end(started, cycle_type)
+
+      if ends.date() > self.config.end_date:
+        if last_active == self.config.end_date:
+          self._cycle(batch, rng, user_id, cycle_type, CycleStatuses.ACTIVE, started, None, consistency)
+        break
+
+      if rng.random() < self.config.abandon_rate and (ends - started).days > 1:
+        stopped = started + timedelta(days=rng.randint(1, (ends - started).days - 1))
+        self._cycle(batch, rng, user_id, cycle_type, CycleStatuses.ABANDONED, started, stopped, consistency)
+        day = stopped.date()
+      else:
+        self._cycle(batch, rng, user_id, cycle_type, CycleStatuses.COMPLETED, started, ends, consistency)
+        day = ends.date()
+      day += timedelta(days=rng.choice((0, 0, 0, 1, 2, 7, 14)))
+
+    if rng.random() < self.config.draft_rate:
+      created = _at(self.config.end_date - timedelta(days=rng.randint(0, 7)), rng)
+      cycle_type = rng.choices(cycle_types, weights)[0]
+      self._cycle(batch, rng, user_id, cycle_type, CycleStatuses.DRAFT, created, None, consistency)
+
+  def _cycle(self, batch, rng, user_id, cycle_type, status, started, ended, consistency) -> None:
+    cycle_id = self._id("habit_cycles")
+    draft = status == CycleStatuses.DRAFT
+    completed_at = ended if status == CycleStatuses.COMPLETED else None
+    updated = ended or started
+
+    batch.cycles.append((
+      cycle_id, user_id, f"{cycle_type.value.title()} cycle", cycle_type.name, status.name,
+      _timestamp(started), None if draft else _timestamp(started), _timestamp(completed_at), _timestamp(updated)
+    ))
+
+    # Entries run up to the day before end_date, so "complete today" is always open
+    last_day = self.config.end_date - timedelta(days=1)
+    if ended is not None:
+      last_day = min(last_day, ended.date() - timedelta(days=1))
+    days = [] if draft else _days(started.date(), last_day)
+
+    names = rng.sample(HABIT_NAMES, rng.randint(self.config.min_habits, self.config.max_habits))
+    for name in names:
+      habit_id = self._id("habits")
+      streak = self._entries(batch, rng, habit_id, days, consistency)
+      batch.habits.append((
+        habit_id, cycle_id, name, _timestamp(started), _timestamp(updated),
+        streak.current_streak, streak.longest_streak, _datestamp(streak.last_completed_date)
+      ))
+
+  def _entries(self, batch, rng, habit_id, days, consistency) -> Streak:
+    base = min(max(rng.gauss(consistency, 0.15), 0.05), 0.98)
+    weekend_dip = rng.uniform(0.7, 1.0)
+    fatigue = rng.uniform(0.0, 0.002)  # Motivation fades slowly over a long cycle
+    completed_yesterday = True
+    skipped_logged_rate = self.config.skipped_logged_rate
+    random_ = rng.random
+    append = batch.entries.append
+    # Days are consecutive, so the streak is a run length (same result as Streak.from_dates)
+    run = longest = 0
+    last_completed = None
+
+    for day_number, (day, day_iso, weekend) in enumerate(days):
+      rate = base - fatigue * day_number
+      if weekend:
+        rate *= weekend_dip
+      # Streaky: doing it yesterday makes today more likely, missing makes it less
+      rate += 0.15 if completed_yesterday else -0.2
+      completed = random_() < rate
+
+      if completed:
+        logged_at = _time_of_day(day_iso, random_())
+        append((habit_id, day_iso, True, logged_at, logged_at))
+        run = run + 1 if last_completed is not None and completed_yesterday else 1
+        longest = max(longest, run)
+        last_completed = day
+      elif random_() < skipped_logged_rate:
+        append((habit_id, day_iso, False, None, _time_of_day(day_iso, random_())))
+
+      completed_yesterday = completed
+
+    return Streak(run, longest, last_completed)
+
+
+# Rows are built with values already in the form both writers send (ISO strings,
+# enum names), so loading doesn't convert 50M values a second time
+LOGGING_HOURS = (7, 8, 9, 12, 18, 19, 20, 21, 22)
+
+
+def _days(first: date, last: date) -> List[Tuple[date, str, bool]]:
+  days = []
+  day = first
+  while day <= last:
+    days.append((day, day.isoformat(), day.weekday() >= 5))
+    day += timedelta(days=1)
+  return days
+
+
+def _time_of_day(day_iso: str, r: float) -> str:
+  """A plausible time of day from one random draw: mostly mornings and evenings"""
+  seconds = int(r * 3600 * len(LOGGING_HOURS))
+  hour, rest = LOGGING_HOURS[seconds // 3600], seconds % 3600
+  return f"{day_iso} {hour:02d}:{rest // 60:02d}:{rest % 60:02d}"
+
+
+def _at(day: date, rng: random.Random) -> datetime:
+  return datetime.combine(day, dt_time(rng.choice(LOGGING_HOURS), rng.randint(0, 59), rng.randint(0, 59)))
+
+
+def _timestamp(value: Optional[datetime]) -> Optional[str]:
+  return value.isoformat(sep=" ") if value is not None else None
+
+
+def _datestamp(value: Optional[date]) -> Optional[str]:
+  return value.isoformat() if value is not None else None
+
+
+class ExecutemanyWriter:
+  """Multi-row inserts through the DBAPI cursor. Used for SQLite, or PostgreSQL with --no-copy."""
+
+  def __init__(self, dbapi_connection, paramstyle: str):
+    self.dbapi_connection = dbapi_connection
+    self.placeholder = "?" if paramstyle == "qmark" else "%s"
+
+  def write(self, table: str, columns: Sequence[str], rows: List[tuple]) -> None:
+    if not rows:
+      return
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join([self.placeholder] * len(columns))})"
+    cursor = self.dbapi_connection.cursor()
+    cursor.executemany(sql, rows)
+    cursor.close()
+
+
+class CopyWriter:
+  """COPY ... FROM STDIN (CSV) for PostgreSQL via psycopg2"""
+
+  def __init__(self, dbapi_connection):
+    self.dbapi_connection = dbapi_connection
+
+  def write(self, table: str, columns: Sequence[str], rows: List[tuple]) -> None:
+    if not rows:
+      return
+    buffer = io.StringIO()
+    # csv writes None as an unquoted empty field, which COPY reads as NULL
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    cursor = self.dbapi_connection.cursor()
+    cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    cursor.close()
+
+
+def _next_ids(connection) -> Dict[str, int]:
+  return {
+    table: connection.execute(text(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {table}")).scalar()
+    for table in ("users", "habit_cycles", "habits")
+  }
+
+
+def generate_dataset(database_url: str, config: DatasetConfig, users_per_batch: int, use_copy: bool, create_tables: bool):
+  engine = create_engine(database_url)
+  postgres = engine.dialect.name == "postgresql"
+
+  if create_tables:
+    from app.core.database import Base
+    Base.metadata.create_all(engine)
+
+  with engine.connect() as connection:
+    generator = DatasetGenerator(config, _next_ids(connection))
+    dbapi_connection = connection.connection.dbapi_connection
+    if postgres and use_copy:
+      writer = CopyWriter(dbapi_connection)
+    else:
+      writer = ExecutemanyWriter(dbapi_connection, engine.dialect.paramstyle)
+    if not postgres:
+      # Bulk load: durability of each batch doesn't matter until the end
+      connection.exec_driver_sql("PRAGMA synchronous = OFF")
+
+    print(f"Generating {config.users} users, {config.years} years ending {config.end_date} (seed {config.seed})...")
+    started = time.perf_counter()
+    totals = {table: 0 for table in ("users", "auth_providers", "habit_cycles", "habits", "habit_entries")}
+
+    for first in range(0, config.users, users_per_batch):
+      batch = Batch()
+      for index in range(first, min(first + users_per_batch, config.users)):
+        generator.generate_user(index, batch)
+
+      for table, columns, rows in batch.tables():
+        writer.write(table, columns, rows)
+        totals[table] += len(rows)
+      dbapi_connection.commit()
+
+      elapsed = time.perf_counter() - started
+      print(
+        f"  {totals['users']:>9,} users  {totals['habit_entries']:>12,} entries  "
+        f"{totals['habit_entries'] / elapsed:>10,.0f} entries/s"
+      )
+
+    if postgres:
+      # Ids were assigned here; move the sequences past them
+      for table in ("users", "habit_cycles", "habits"):
+        connection.execute(text(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT MAX(id) FROM {table}))"))
+      connection.commit()
+
+  engine.dispose()
+  elapsed = time.perf_counter() - started
+  print(f"✅ Loaded {', '.join(f'{count:,} {table}' for table, count in totals.items())} in {elapsed:.1f}s")
+  print("Derived data: run scripts/rebuild_rollups.py and scripts/backfill_snapshots.py")
+  return totals
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Bulk-load a deterministic synthetic dataset for load testing")
+  parser.add_argument("--database-url", default=None, help="Target database (default: DATABASE_URL from settings)")
+  parser.add_argument("--users", type=int, default=1000)
+  parser.add_argument("--years", type=float, default=1.0, help="Years of history per user")
+  parser.add_argument("--seed", type=int, default=42)
+  parser.add_argument("--end-date", type=date.fromisoformat, default=date.today(), help="Last day of history, YYYY-MM-DD (default: today)")
+  parser.add_argument("--min-habits", type=int, default=3)
+  parser.add_argument("--max-habits", type=int, default=6)
+  parser.add_argument("--users-per-batch", type=int, default=200, help="Users generated and written per transaction")
+  parser.add_argument("--no-copy", action="store_true", help="Use multi-row INSERTs on PostgreSQL instead of COPY")
+  parser.add_argument("--create-tables", action="store_true", help="Create missing tables from the models first (for scratch SQLite files)")
+  args = parser.parse_args()
+
+  database_url = args.database_url
+  if database_url is None:
+    from app.core.config import settings
+    database_url = settings.DATABASE_URL
+
+  generate_dataset(
+    database_url,
+    DatasetConfig(
+      users=args.users,
+      years=args.years,
+      seed=args.seed,
+      end_date=args.end_date,
+      min_habits=args.min_habits,
+      max_habits=args.max_habits
+    ),
+    users_per_batch=args.users_per_batch,
+    use_copy=not args.no_copy,
+    create_tables=args.create_tables
+  )
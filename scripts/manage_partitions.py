@@ -0,0 +1,46 @@
+import argparse
+import sys
+from datetime import date
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services.partition_service import PartitionManager
+
+def manage_partitions(months_ahead: int, detach_before: date = None, archive_schema: str = None):
+  db = SessionLocal()
+  try:
+    manager = PartitionManager(db)
+    if not manager.is_partitioned():
+      print("habit_entries is not partitioned (PostgreSQL only, migration 4b36dc295588); nothing to do")
+      return
+
+    created = manager.ensure_partitions(months_ahead=months_ahead)
+    print(f"✅ Created {len(created)} partition(s): {', '.join(created) or '-'}")
+
+    if detach_before is not None:
+      detached = manager.detach_before(detach_before, archive_schema=archive_schema)
+      print(f"✅ Detached {len(detached)} partition(s): {', '.join(detached) or '-'}")
+
+    stray = manager.default_partition_rows()
+    if stray:
+      print(f"⚠️ {stray} row(s) in habit_entries_default; create their months' partitions after moving them out")
+
+    partitions = manager.list_partitions()
+    if partitions:
+      print(f"Attached: {partitions[0].name} .. {partitions[-1].name} ({len(partitions)} months)")
+  except Exception as e:
+    print(f"Error managing partitions: {e}")
+    db.rollback()
+  finally:
+    db.close()
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Create upcoming monthly habit_entries partitions and detach old ones (run e.g. daily from cron)")
+  parser.add_argument("--months-ahead", type=int, default=settings.ENTRY_PARTITION_MONTHS_AHEAD)
+  parser.add_argument("--detach-before", type=date.fromisoformat, default=None, help="Detach months that end on or before this date's month, YYYY-MM-DD")
+  parser.add_argument("--archive-schema", default=None, help="Move detached partitions into this schema")
+  args = parser.parse_args()
+  manage_partitions(args.months_ahead, args.detach_before, args.archive_schema)
@@ -0,0 +1,28 @@
+import argparse
+import sys
+from datetime import date
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.database import SessionLocal
+from app.services.rollup_service import RollupService
+
+def rebuild_rollups(start: date, end: date):
+  db = SessionLocal()
+  try:
+    print(f"Rebuilding daily cycle rollups from {start} to {end}...")
+    written = RollupService(db).rebuild(start, end)
+    print(f"✅ Wrote {written} rollup row(s)")
+  except Exception as e:
+    print(f"Error rebuilding rollups: {e}")
+    db.rollback()
+  finally:
+    db.close()
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Regenerate daily_cycle_rollups from habit_entries for a date range")
+  parser.add_argument("--start", type=date.fromisoformat, required=True, help="First day, YYYY-MM-DD")
+  parser.add_argument("--end", type=date.fromisoformat, default=date.today(), help="Last day, YYYY-MM-DD (default: today)")
+  args = parser.parse_args()
+  rebuild_rollups(args.start, args.end)
@@ -0,0 +1,34 @@
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.database import SessionLocal
+from app.services.streak_service import StreakService
+
+def recompute_streaks(check_only: bool, batch_size: int) -> int:
+  db = SessionLocal()
+  try:
+    service = StreakService(db)
+
+    if check_only:
+      mismatches = service.find_inconsistencies(batch_size=batch_size)
+      for habit_id, stored, expected in mismatches:
+        print(f"Habit {habit_id}: stored {stored}, expected {expected}")
+      print(f"{len(mismatches)} habit(s) with inconsistent streak counters")
+      return 1 if mismatches else 0
+
+    print("Recomputing streak counters...")
+    fixed = service.recompute(batch_size=batch_size)
+    print(f"✅ Updated streak counters for {fixed} habit(s)")
+    return 0
+  finally:
+    db.close()
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Backfill or verify habit streak counters against habit_entries")
+  parser.add_argument("--check", action="store_true", help="Only report habits whose counters disagree with a recomputation")
+  parser.add_argument("--batch-size", type=int, default=1000)
+  args = parser.parse_args()
+  sys.exit(recompute_streaks(args.check, args.batch_size))
@@ -12,24 +12,30 @@ from typing import Any, Generator
 import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import StaticPool
 from fastapi.testclient import TestClient
-from app.core.database import Base, get_db
+from app.core.database import Base, get_db, get_read_db
 from app.main import app
 from app.models import User, HabitCycle, Habit
 from app.core.security import create_access_token
+from app.services.identity_cache import identity_cache
+from app.services.entity_cache import entity_cache
+from app.core import query_counter
 
 # Database fixtures
 @pytest.fixture(scope="function")
 def db_session() -> Generator[Session, Any, None]:
   """Create a fresh database for each test"""
-  # Use in-memory SQLite for speed
+  # Use in-memory SQLite for speed. StaticPool shares the one connection with the
+  # threadpool that TestClient runs sync routes in.
   engine = create_engine(
     "sqlite:///:memory:",
-    connect_args={"check_same_thread": False}
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool
   )
 
   Base.metadata.create_all(bind=engine) # Creates all the tables
-  TestingSessionLocal = sessionmaker(bind=engine)
+  TestingSessionLocal = sessionmaker(autoflush=False, expire_on_commit=False, bind=engine)
   db = TestingSessionLocal()
 
   yield db
@@ -41,7 +47,7 @@ def db_session() -> Generator[Session, Any, None]:
 def client(db_session):
   """
   Create a new FastAPI TestClient that uses the `db_session` fixture to override
-  the `get_db` dependency that is injected into routes.
+  the `get_db` and `get_read_db` dependencies that are injected into routes.
   """
   def _get_test_db():
     try:
@@ -50,12 +56,35 @@ def client(db_session):
       pass
 
   app.dependency_overrides[get_db] = _get_test_db
+  app.dependency_overrides[get_read_db] = _get_test_db
 
   with TestClient(app) as test_client:
     yield test_client
 
   app.dependency_overrides.clear()
 
+@pytest.fixture(autouse=True)
+def clear_identity_cache():
+  """Cached identities point at user ids from a previous test's database"""
+  identity_cache.clear()
+  yield
+  identity_cache.clear()
+
+@pytest.fixture(autouse=True)
+def clear_entity_cache():
+  """Same for cached cycles, habits and entries"""
+  entity_cache.clear()
+  yield
+  entity_cache.clear()
+
+@pytest.fixture
+def count_queries():
+  """
+  Context manager collecting the SQL statements run inside it (len() gives the count).
+  Same collector the per-request middleware uses, so it also sees queries made by routes.
+  """
+  return query_counter.count_queries
+
 # Model fixtures
 @pytest.fixture
 def test_user(db_session):
@@ -98,5 +127,5 @@ def test_habit(db_session, test_cycle):
 @pytest.fixture
 def auth_headers(test_user):
   """Generate auth headers with JWT"""
-  token = create_access_token(data={"sub": str(test_user.id)})
+  token = create_access_token(user_id=test_user.id)
   return {"Authorization": f"Bearer {token}"}
\ No newline at end of file
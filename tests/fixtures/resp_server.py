@@ -0,0 +1,113 @@
+import socketserver
+import threading
+import time
+from typing import Dict, Set, Tuple
+
+"""
+In-process stand-in for a Redis server: the handful of RESP2 commands the entity
+cache's RespBackend uses, with key expiry. Not a general-purpose fake.
+"""
+
+
+class _Store:
+  def __init__(self):
+    self.values: Dict[bytes, Tuple[bytes, float]] = {}
+    self.sets: Dict[bytes, Tuple[Set[bytes], float]] = {}
+    self.lock = threading.Lock()
+
+  def _live(self, table: dict, key: bytes):
+    item = table.get(key)
+    if item is not None and item[1] <= time.monotonic():
+      del table[key]
+      return None
+    return item
+
+  def run(self, command: bytes, args: list):
+    now = time.monotonic()
+    with self.lock:
+      if command in (b"PING",):
+        return "+PONG"
+      if command in (b"AUTH", b"SELECT"):
+        return "+OK"
+      if command == b"GET":
+        item = self._live(self.values, args[0])
+        return item[0] if item else None
+      if command == b"SET":
+        ttl = float("inf")
+        if len(args) == 4 and args[2].upper() == b"PX":
+          ttl = int(args[3]) / 1000
+        self.values[args[0]] = (args[1], now + ttl)
+        return "+OK"
+      if command == b"INCR":
+        item = self._live(self.values, args[0])
+        value = int(item[0]) + 1 if item else 1
+        self.values[args[0]] = (str(value).encode(), item[1] if item else float("inf"))
+        return value
+      if command == b"DEL":
+        return sum((self.values.pop(key, None) or self.sets.pop(key, None)) is not None for key in args)
+      if command == b"SADD":
+        members, expires_at = self._live(self.sets, args[0]) or (set(), float("inf"))
+        added = len(set(args[1:]) - members)
+        self.sets[args[0]] = (members | set(args[1:]), expires_at)
+        return added
+      if command == b"SMEMBERS":
+        item = self._live(self.sets, args[0])
+        return sorted(item[0]) if item else []
+      if command == b"PEXPIRE":
+        for table in (self.values, self.sets):
+          item = self._live(table, args[0])
+          if item:
+            table[args[0]] = (item[0], now + int(args[1]) / 1000)
+            return 1
+        return 0
+      if command == b"INFO":
+        return b"# Stats\r\nevicted_keys:0\r\n"
+    return f"-ERR unknown command '{command.decode()}'"
+
+
+class _Handler(socketserver.StreamRequestHandler):
+  def handle(self):
+    while True:
+      line = self.rfile.readline()
+      if not line:
+        return
+      parts = []
+      for _ in range(int(line[1:])):
+        length = int(self.rfile.readline()[1:])
+        parts.append(self.rfile.read(length + 2)[:-2])
+      self.wfile.write(_encode(self.server.store.run(parts[0].upper(), parts[1:])))
+
+
+def _encode(reply) -> bytes:
+  if reply is None:
+    return b"$-1\r\n"
+  if isinstance(reply, str):  # status or error line
+    return reply.encode() + b"\r\n"
+  if isinstance(reply, int):
+    return b":%d\r\n" % reply
+  if isinstance(reply, list):
+    return b"*%d\r\n" % len(reply) + b"".join(_encode(item) for item in reply)
+  return b"$%d\r\n%s\r\n" % (len(reply), reply)
+
+
+class RespServer(socketserver.ThreadingTCPServer):
+  daemon_threads = True
+  allow_reuse_address = True
+
+  def __init__(self):
+    super().__init__(("127.0.0.1", 0), _Handler)
+    self.store = _Store()
+    self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+  @property
+  def url(self) -> str:
+    host, port = self.server_address
+    return f"redis://{host}:{port}/0"
+
+  def start(self) -> "RespServer":
+    self._thread.start()
+    return self
+
+  def stop(self) -> None:
+    self.shutdown()
+    self.server_close()
@@ -0,0 +1,103 @@
+from datetime import date, datetime
+from app.core.bitmap import encode_days, decode_days
+from app.models import CycleStatuses, CycleTypes, HabitEntry, HabitEntryArchive
+from app.services.archive_service import ArchiveService
+from app.services.habit_service import HabitService
+from app.services.streak_service import StreakService
+from tests.fixtures.factories import CycleFactory, HabitFactory, EntryFactory
+
+
+def test_bitmap_round_trip():
+  start = date(2025, 1, 1)
+  days = [date(2025, 1, 1), date(2025, 1, 8), date(2025, 1, 9), date(2025, 12, 31)]
+
+  bitmap = encode_days(start, days, 365)
+
+  assert len(bitmap) == 46
+  assert list(decode_days(start, bitmap)) == days
+
+
+def _history(service, user_id, habit_id):
+  return [(e.entry_date, e.completed) for e in service.get_entries_for_habit(user_id, habit_id, limit=100)]
+
+
+class TestArchive:
+  """Entries of finished cycles move to bitmaps and are still served by HabitService"""
+
+  def _finished_cycle(self, db_session, user_id):
+    cycle = CycleFactory.create(db_session, user_id, status=CycleStatuses.ACTIVE, started_at=datetime(2025, 1, 1, 9, 0))
+    run = HabitFactory.create(db_session, habit_cycle_id=cycle.id, name="Run")
+    read = HabitFactory.create(db_session, habit_cycle_id=cycle.id, name="Read")
+    for day in (1, 2, 3, 5):
+      EntryFactory.create(db_session, habit_id=run.id, entry_date=date(2025, 1, day), completed=True)
+    EntryFactory.create(db_session, habit_id=read.id, entry_date=date(2025, 1, 4), completed=False)
+    HabitService(db_session).abandon_cycle(user_id, cycle.id)
+    return cycle, run, read
+
+  def test_archive_moves_finished_entries_only(self, db_session, test_user):
+    cycle, run, read = self._finished_cycle(db_session, test_user.id)
+    active = CycleFactory.create(db_session, test_user.id, status=CycleStatuses.ACTIVE, cycle_type=CycleTypes.WEEKLY)
+    walk = HabitFactory.create(db_session, habit_cycle_id=active.id, name="Walk")
+    EntryFactory.create(db_session, habit_id=walk.id, entry_date=date.today(), completed=True)
+
+    service = HabitService(db_session)
+    before = {habit.id: _history(service, test_user.id, habit.id) for habit in (run, read, walk)}
+    streaks_before = StreakService(db_session).find_inconsistencies()
+
+    moved = ArchiveService(db_session).archive_finished(older_than_days=-1)
+
+    assert moved == 5
+    assert db_session.query(HabitEntry).filter(HabitEntry.habit_id.in_([run.id, read.id])).count() == 0
+    assert db_session.query(HabitEntry).filter(HabitEntry.habit_id == walk.id).count() == 1
+
+    archive = db_session.get(HabitEntryArchive, run.id)
+    assert (archive.start_date, archive.day_count, archive.entries_logged, archive.entries_completed) == (date(2025, 1, 1), 5, 4, 4)
+
+    db_session.expire_all()
+    assert {habit.id: _history(service, test_user.id, habit.id) for habit in (run, read, walk)} == before
+    assert StreakService(db_session).find_inconsistencies() == streaks_before
+    assert service.get_cycle_stats(test_user.id, cycle.id).entries_completed == 4
+
+    # Nothing left to move
+    assert ArchiveService(db_session).archive_finished(older_than_days=-1) == 0
+
+  def test_archived_reads(self, db_session, test_user):
+    _, run, read = self._finished_cycle(db_session, test_user.id)
+    ArchiveService(db_session).archive_finished(older_than_days=-1)
+    service = HabitService(db_session)
+
+    page = service.get_entries_for_habit(test_user.id, run.id, limit=2, before=date(2025, 1, 5))
+    assert [(e.entry_date, e.id) for e in page] == [(date(2025, 1, 3), None), (date(2025, 1, 2), None)]
+    assert page[0].habit is run
+
+    assert service.get_entry_for_date(test_user.id, read.id, date(2025, 1, 4)).completed is False
+    assert service.get_entry_for_date(test_user.id, read.id, date(2025, 1, 5)) is None
+    assert not db_session.new
+
+  def test_recent_cycles_wait(self, db_session, test_user):
+    self._finished_cycle(db_session, test_user.id)
+
+    assert ArchiveService(db_session).archive_finished(older_than_days=7) == 0
+
+  def test_late_entries_merge_into_archive(self, db_session, test_user):
+    _, run, _ = self._finished_cycle(db_session, test_user.id)
+    ArchiveService(db_session).archive_finished(older_than_days=-1)
+
+    EntryFactory.create(db_session, habit_id=run.id, entry_date=date(2025, 1, 4), completed=True)
+    assert ArchiveService(db_session).archive_finished(older_than_days=-1) == 1
+
+    db_session.expire_all()
+    archive = db_session.get(HabitEntryArchive, run.id)
+    assert archive.entries_completed == 5
+    assert list(decode_days(archive.start_date, archive.completed_bitmap)) == [date(2025, 1, day) for day in range(1, 6)]
+
+  def test_archived_history_endpoint(self, client, auth_headers, db_session, test_user):
+    _, run, _ = self._finished_cycle(db_session, test_user.id)
+    ArchiveService(db_session).archive_finished(older_than_days=-1)
+
+    response = client.get(f"/habits/{run.id}/entries", headers=auth_headers)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [e["entry_date"] for e in body] == ["2025-01-05", "2025-01-03", "2025-01-02", "2025-01-01"]
+    assert body[0]["id"] is None and body[0]["habit"]["name"] == "Run"
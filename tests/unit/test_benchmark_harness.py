@@ -0,0 +1,42 @@
+import asyncio
+import httpx
+from fastapi import FastAPI
+from benchmarks.harness import compare, percentile, run_level
+
+
+def _report(p95_ms, throughput_rps, errors=0):
+  return {"results": {"get_cycle": {"8": {"p95_ms": p95_ms, "throughput_rps": throughput_rps, "errors": errors}}}}
+
+
+def test_percentile_nearest_rank():
+  values = [float(v) for v in range(1, 101)]
+  assert percentile(values, 50) == 50.0
+  assert percentile(values, 95) == 95.0
+  assert percentile(values, 99) == 99.0
+  assert percentile([], 95) == 0.0
+
+
+def test_compare_flags_only_regressions_beyond_tolerance():
+  baseline = _report(p95_ms=10.0, throughput_rps=100.0)
+
+  assert compare(_report(11.5, 90.0), baseline, tolerance=0.2) == []
+  regressions = compare(_report(13.0, 70.0, errors=2), baseline, tolerance=0.2)
+  assert len(regressions) == 3
+  assert regressions[0].startswith("get_cycle @ 8: p95 13.00ms")
+
+
+def test_run_level_counts_requests_and_errors():
+  app = FastAPI()
+
+  @app.get("/ok")
+  def ok():
+    return {}
+
+  async def run():
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+      requests = iter([("GET", "/ok")] * 7 + [("GET", "/missing")] * 3)
+      return await run_level(client, requests, concurrency=4, total=20, headers={})
+
+  result = asyncio.run(run())
+  assert (result.requests, result.errors) == (10, 3)
+  assert result.summary()["throughput_rps"] > 0
@@ -0,0 +1,70 @@
+import base64
+from datetime import date, datetime
+from app.core.bitmap import decode_days
+from app.models import CycleStatuses
+from app.services.archive_service import ArchiveService
+from app.services.habit_service import HabitService
+from tests.fixtures.factories import CycleFactory, HabitFactory, EntryFactory
+
+
+def _completed_days(body):
+  return list(decode_days(date.fromisoformat(body["start_date"]), base64.b64decode(body["completed"])))
+
+
+class TestCompletionBitmap:
+  """format=bitmap on entry history returns the completed days as one bitset"""
+
+  def _habit(self, db_session, user_id):
+    cycle = CycleFactory.create(db_session, user_id, status=CycleStatuses.ACTIVE, started_at=datetime(2025, 1, 1, 9, 0))
+    habit = HabitFactory.create(db_session, habit_cycle_id=cycle.id, name="Run")
+    for day in (2, 3, 5, 20):
+      EntryFactory.create(db_session, habit_id=habit.id, entry_date=date(2025, 1, day), completed=True)
+    EntryFactory.create(db_session, habit_id=habit.id, entry_date=date(2025, 1, 4), completed=False)
+    return cycle, habit
+
+  def test_bitmap_spans_completions(self, client, auth_headers, db_session, test_user):
+    _, habit = self._habit(db_session, test_user.id)
+
+    response = client.get(f"/habits/{habit.id}/entries", params={"format": "bitmap"}, headers=auth_headers)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["start_date"], body["end_date"], body["days"]) == ("2025-01-02", "2025-01-20", 19)
+    assert len(base64.b64decode(body["completed"])) == 3
+    assert _completed_days(body) == [date(2025, 1, day) for day in (2, 3, 5, 20)]
+
+  def test_bitmap_range(self, client, auth_headers, db_session, test_user):
+    _, habit = self._habit(db_session, test_user.id)
+
+    body = client.get(
+      f"/habits/{habit.id}/entries",
+      params={"format": "bitmap", "start": "2025-01-01", "end": "2025-01-04"},
+      headers=auth_headers
+    ).json()
+
+    assert (body["start_date"], body["days"]) == ("2025-01-01", 4)
+    assert _completed_days(body) == [date(2025, 1, 2), date(2025, 1, 3)]
+
+    response = client.get(
+      f"/habits/{habit.id}/entries",
+      params={"format": "bitmap", "start": "2025-01-04", "end": "2025-01-01"},
+      headers=auth_headers
+    )
+    assert response.status_code == 400
+
+  def test_archived_habit_matches_hot(self, db_session, test_user):
+    cycle, habit = self._habit(db_session, test_user.id)
+    service = HabitService(db_session)
+    service.abandon_cycle(test_user.id, cycle.id)
+    hot = service.get_completion_bitmap(test_user.id, habit.id)
+
+    ArchiveService(db_session).archive_finished(older_than_days=-1)
+
+    assert service.get_completion_bitmap(test_user.id, habit.id) == hot
+
+  def test_entries_format_unchanged(self, client, auth_headers, db_session, test_user):
+    _, habit = self._habit(db_session, test_user.id)
+
+    response = client.get(f"/habits/{habit.id}/entries", headers=auth_headers)
+
+    assert [e["entry_date"] for e in response.json()][:2] == ["2025-01-20", "2025-01-05"]
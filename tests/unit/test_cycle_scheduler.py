@@ -0,0 +1,117 @@
+import asyncio
+import time
+import pytest
+from datetime import datetime, timezone
+from app.models import CycleStatuses, CycleTypes, HabitCycle
+from app.services.cycle_scheduler import CycleScheduler, add_months, period_end
+from app.services.snapshot_service import SnapshotService
+from tests.fixtures.factories import UserFactory, CycleFactory
+
+NOW = datetime(2025, 3, 31, 12, 0, tzinfo=timezone.utc)
+
+
+def test_add_months_clamps_day():
+  assert add_months(datetime(2025, 1, 31), 1) == datetime(2025, 2, 28)
+  assert add_months(datetime(2025, 3, 31), -1) == datetime(2025, 2, 28)
+  assert add_months(datetime(2024, 12, 15), 1) == datetime(2025, 1, 15)
+
+
+def test_period_end_per_cycle_type():
+  started = datetime(2025, 1, 31, 9, 0)
+
+  assert period_end(started, CycleTypes.DAILY) == datetime(2025, 2, 1, 9, 0)
+  assert period_end(started, CycleTypes.WEEKLY) == datetime(2025, 2, 7, 9, 0)
+  assert period_end(started, CycleTypes.MONTHLY) == datetime(2025, 2, 28, 9, 0)
+  assert period_end(started, CycleTypes.YEARLY) == datetime(2026, 1, 31, 9, 0)
+
+
+class TestCycleScheduler:
+  """Expired ACTIVE cycles are completed in chunks; everything else is left alone"""
+
+  def _active(self, db_session, cycle_type, started_at):
+    user = UserFactory.create(db_session)
+    return CycleFactory.create(db_session, user.id, cycle_type=cycle_type, status=CycleStatuses.ACTIVE, started_at=started_at).id
+
+  def test_completes_only_expired_cycles(self, db_session):
+    expired = [
+      self._active(db_session, CycleTypes.DAILY, datetime(2025, 3, 30, 11, 0)),
+      self._active(db_session, CycleTypes.WEEKLY, datetime(2025, 3, 20)),
+      self._active(db_session, CycleTypes.MONTHLY, datetime(2025, 2, 28)),
+      self._active(db_session, CycleTypes.YEARLY, datetime(2024, 3, 1)),
+    ]
+    running = [
+      self._active(db_session, CycleTypes.DAILY, datetime(2025, 3, 31, 8, 0)),
+      self._active(db_session, CycleTypes.MONTHLY, datetime(2025, 3, 1)),
+    ]
+    draft_id = CycleFactory.create(db_session, UserFactory.create(db_session).id).id
+
+    stats = CycleScheduler(engine=db_session.bind, batch_size=2).run_once(now=NOW)
+
+    assert sorted(stats.completed_cycle_ids) == sorted(expired)
+    db_session.expire_all()
+    statuses = {c.id: c.status for c in db_session.query(HabitCycle)}
+    assert all(statuses[i] == CycleStatuses.COMPLETED for i in expired)
+    assert all(statuses[i] == CycleStatuses.ACTIVE for i in running)
+    assert statuses[draft_id] == CycleStatuses.DRAFT
+
+  def test_chunks_and_is_idempotent(self, db_session):
+    for day in range(1, 6):
+      self._active(db_session, CycleTypes.DAILY, datetime(2025, 3, day))
+
+    scheduler = CycleScheduler(engine=db_session.bind, batch_size=2)
+    first = scheduler.run_once(now=NOW)
+    second = scheduler.run_once(now=NOW)
+
+    assert first.cycles_completed == 5
+    assert first.batches == 3
+    assert second.cycles_completed == 0
+
+  def test_month_end_starts_complete_at_period_end(self, db_session):
+    jan_31 = self._active(db_session, CycleTypes.MONTHLY, datetime(2025, 1, 31, 9, 0))
+    jan_30 = self._active(db_session, CycleTypes.MONTHLY, datetime(2025, 1, 30, 10, 0))
+    scheduler = CycleScheduler(engine=db_session.bind)
+
+    # period_end: Feb 28 09:00 and Feb 28 10:00
+    assert scheduler.run_once(now=datetime(2025, 2, 28, 8, 59)).completed_cycle_ids == []
+    assert scheduler.run_once(now=datetime(2025, 2, 28, 9, 0)).completed_cycle_ids == [jan_31]
+    assert scheduler.run_once(now=datetime(2025, 2, 28, 10, 0, tzinfo=timezone.utc)).completed_cycle_ids == [jan_30]
+
+  def test_clamped_cutoff_includes_later_starts_that_day(self, db_session):
+    # Mar 30 minus a month clamps to Feb 28 12:00; Feb 28 15:00 ended on Mar 28 15:00
+    late_start = self._active(db_session, CycleTypes.MONTHLY, datetime(2025, 2, 28, 15, 0))
+
+    assert CycleScheduler(engine=db_session.bind).run_once(now=datetime(2025, 3, 30, 12, 0)).completed_cycle_ids == [late_start]
+
+  def test_failed_run_rolls_back_before_unlocking(self, db_session, monkeypatch):
+    cycle_id = self._active(db_session, CycleTypes.DAILY, datetime(2025, 3, 1))
+
+    def fail(self, cycles):
+      raise RuntimeError("snapshot insert failed")
+    monkeypatch.setattr(SnapshotService, "snapshot_cycles", fail)
+    unlocked_in_transaction = []
+    monkeypatch.setattr(CycleScheduler, "_unlock", lambda self, connection: unlocked_in_transaction.append(connection.in_transaction()))
+
+    with pytest.raises(RuntimeError, match="snapshot insert failed"):
+      CycleScheduler(engine=db_session.bind).run_once(now=NOW)
+
+    assert unlocked_in_transaction == [False]
+    db_session.expire_all()
+    assert db_session.get(HabitCycle, cycle_id).status == CycleStatuses.ACTIVE
+
+  def test_cancel_waits_for_run_in_progress(self, monkeypatch):
+    finished = []
+
+    def slow_run(self):
+      time.sleep(0.2)
+      finished.append(True)
+    monkeypatch.setattr(CycleScheduler, "run_once", slow_run)
+
+    async def start_and_cancel():
+      task = asyncio.create_task(CycleScheduler(engine=None).run_forever(60))
+      await asyncio.sleep(0.05)
+      task.cancel()
+      with pytest.raises(asyncio.CancelledError):
+        await task
+
+    asyncio.run(start_and_cancel())
+    assert finished == [True]
@@ -0,0 +1,26 @@
+import inspect
+from fastapi.routing import APIRoute
+from app.core.database import get_db, get_read_db
+from app.main import app
+
+SESSION_DEPENDENCIES = (get_db, get_read_db)
+
+
+def _async_session_users(dependant, found):
+  """Names of `async def` endpoints and dependencies that take a Session, anywhere in the tree"""
+  takes_session = any(sub.call in SESSION_DEPENDENCIES for sub in dependant.dependencies)
+  if takes_session and inspect.iscoroutinefunction(dependant.call):
+    found.add(dependant.call.__qualname__)
+  for sub in dependant.dependencies:
+    _async_session_users(sub, found)
+  return found
+
+
+def test_session_users_are_sync():
+  # Session queries block; in an async def they would stall the event loop for every request
+  found = set()
+  for route in app.routes:
+    if isinstance(route, APIRoute):
+      _async_session_users(route.dependant, found)
+
+  assert found == set()
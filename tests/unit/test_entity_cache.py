@@ -0,0 +1,240 @@
+import pytest
+from datetime import date, datetime
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+from app.core.cache import MemoryBackend
+from app.core.database import Base, REPLICA_SESSION
+from app.core.metrics import REGISTRY
+from app.core.resp import RespBackend, RespClient
+from app.models import CycleStatuses, CycleTypes, HabitCycle
+from app.services.cycle_scheduler import CycleScheduler
+from app.services.entity_cache import EntityCache, entity_cache, user_tag, cycle_tag
+from app.services.habit_service import HabitService, CYCLE_WITH_HABITS
+from tests.fixtures.factories import UserFactory, CycleFactory, HabitFactory
+from tests.fixtures.resp_server import RespServer
+
+
+class FakeClock:
+  def __init__(self):
+    self.now = 0.0
+
+  def __call__(self):
+    return self.now
+
+
+@pytest.fixture
+def resp_server():
+  server = RespServer().start()
+  yield server
+  server.stop()
+
+
+@pytest.fixture
+def other_session(db_session):
+  """A second session on the same database, as another request would have"""
+  session = Session(bind=db_session.get_bind(), expire_on_commit=False)
+  yield session
+  session.close()
+
+
+@pytest.fixture
+def lagging_replica():
+  """A replica session on its own database, which only gets what a test copies into it"""
+  engine = create_engine("sqlite:///:memory:", poolclass=StaticPool)
+  Base.metadata.create_all(engine)
+  session = Session(bind=engine, expire_on_commit=False, info={REPLICA_SESSION: True})
+  yield session
+  session.close()
+  engine.dispose()
+
+
+class TestMemoryBackend:
+  """LRU + TTL storage with a tag index"""
+
+  def test_invalidate_by_tag(self):
+    backend = MemoryBackend(maxsize=10, ttl=60)
+    backend.set("a", b"1", ["user:1", "cycle:1"])
+    backend.set("b", b"2", ["user:1", "cycle:2"])
+    backend.set("c", b"3", ["user:2"])
+
+    assert backend.invalidate(["cycle:2"]) == 1
+    assert (backend.get("a"), backend.get("b"), backend.get("c")) == (b"1", None, b"3")
+    assert backend.invalidate(["user:1"]) == 1
+    assert backend.get("a") is None
+
+  def test_set_skips_tags_invalidated_since_its_version(self):
+    backend = MemoryBackend(maxsize=2, ttl=60)
+    version = backend.version()
+    backend.invalidate(["cycle:1"])
+
+    backend.set("a", b"1", ["user:1", "cycle:1"], version)
+    backend.set("b", b"2", ["user:1", "cycle:2"], version)
+    assert (backend.get("a"), backend.get("b")) == (None, b"2")
+
+    # Past maxsize tags the record is dropped and every older version counts as stale
+    backend.invalidate(["cycle:2", "cycle:3", "cycle:4"])
+    backend.set("c", b"3", ["user:2"], version)
+    assert backend.get("c") is None
+    backend.set("c", b"3", ["user:2"], backend.version())
+    assert backend.get("c") == b"3"
+
+  def test_eviction_and_expiry_leave_the_tag_index(self):
+    clock = FakeClock()
+    backend = MemoryBackend(maxsize=2, ttl=60, clock=clock)
+    for key in ("a", "b", "c"):
+      backend.set(key, key.encode(), ["user:1", f"key:{key}"])
+
+    assert backend.get("a") is None
+    assert "key:a" not in backend._tags
+
+    clock.now = 61
+    assert backend.get("b") is None
+    assert backend._tags["user:1"] == {"c"}
+
+    stats = backend.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (0, 2, 1)
+
+
+class TestEntityCache:
+  """HabitService reads go through the cache; writes invalidate after commit"""
+
+  def test_hit_costs_no_queries(self, db_session, other_session, test_user, count_queries):
+    cycle = CycleFactory.create(db_session, test_user.id)
+    HabitFactory.create(db_session, habit_cycle_id=cycle.id, name="Read")
+    HabitService(db_session)._get_cycle(cycle.id, test_user.id, CYCLE_WITH_HABITS)
+
+    with count_queries() as statements:
+      cached = HabitService(other_session)._get_cycle(cycle.id, test_user.id, CYCLE_WITH_HABITS)
+
+    assert len(statements) == 0
+    assert cached in other_session
+    assert [habit.name for habit in cached.habits] == ["Read"]
+    assert entity_cache.stats()["hits"] == 1
+
+  def test_writes_invalidate_after_commit(self, db_session, other_session, test_user):
+    cycle = CycleFactory.create(db_session, test_user.id)
+    service = HabitService(db_session)
+    assert service.get_cycles_for_user(test_user.id, options=CYCLE_WITH_HABITS)[0].habits == []
+
+    service.add_habit_to_cycle(test_user.id, cycle.id, "Run")
+
+    cycles = HabitService(other_session).get_cycles_for_user(test_user.id, options=CYCLE_WITH_HABITS)
+    assert [habit.name for habit in cycles[0].habits] == ["Run"]
+
+  def test_rollback_keeps_entries(self, db_session, test_user):
+    cycle = CycleFactory.create(db_session, test_user.id)
+    service = HabitService(db_session)
+    service._get_cycle(cycle.id, test_user.id)
+
+    service._invalidate(test_user.id, cycle.id)
+    db_session.rollback()
+
+    assert service._get_cycle(cycle.id, test_user.id).id == cycle.id
+    assert entity_cache.stats()["hits"] == 1
+
+  def test_missing_entry_is_cached_until_logged(self, db_session, other_session, test_user):
+    cycle = CycleFactory.create(db_session, test_user.id, status=CycleStatuses.ACTIVE, started_at=datetime.now())
+    habit = HabitFactory.create(db_session, habit_cycle_id=cycle.id, name="Run")
+    service = HabitService(db_session)
+    assert service.get_entry_for_date(test_user.id, habit.id, date.today()) is None
+
+    service.add_entry(test_user.id, habit.id, completed=True)
+
+    entry = HabitService(other_session).get_entry_for_date(test_user.id, habit.id, date.today())
+    assert entry.completed
+    assert entry.habit.current_streak == 1
+
+  def test_replica_reads_are_not_cached(self, db_session, lagging_replica, test_user):
+    # Same user, cycle and habit on both; the replica hasn't received today's entry yet
+    for db in (db_session, lagging_replica):
+      user = test_user if db is db_session else UserFactory.create(db)
+      cycle = CycleFactory.create(db, user.id, status=CycleStatuses.ACTIVE, started_at=datetime.now())
+      habit = HabitFactory.create(db, habit_cycle_id=cycle.id, name="Run")
+    HabitService(db_session).add_entry(test_user.id, habit.id, completed=True)
+
+    assert HabitService(lagging_replica).get_entry_for_date(test_user.id, habit.id, date.today()) is None
+
+    # The writer's next read (pinned to the primary) must not get the replica's answer
+    db_session.expunge_all()
+    assert HabitService(db_session).get_entry_for_date(test_user.id, habit.id, date.today()).completed
+
+  @pytest.mark.parametrize("backend", ["memory", "resp"])
+  def test_write_during_a_load_is_not_overwritten(self, request, backend, db_session, other_session, test_user):
+    if backend == "memory":
+      cache = EntityCache(MemoryBackend(100, 60))
+    else:
+      cache = EntityCache(RespBackend(RespClient(request.getfixturevalue("resp_server").url), ttl=60))
+    cycle = CycleFactory.create(db_session, test_user.id, status=CycleStatuses.ACTIVE, started_at=datetime.now())
+    reader = HabitService(other_session, cache=cache)
+
+    def load_while_a_writer_commits():
+      loaded = other_session.get(HabitCycle, cycle.id)
+      HabitService(db_session, cache=cache).abandon_cycle(test_user.id, cycle.id)
+      return loaded
+
+    key = reader._cache_key("cycle", (), test_user.id, cycle.id)
+    stale = cache.get_or_load(other_session, key, load_while_a_writer_commits, (user_tag(test_user.id), cycle_tag(cycle.id)))
+    assert stale.status == CycleStatuses.ACTIVE
+
+    with Session(bind=db_session.get_bind(), expire_on_commit=False) as fresh:
+      assert HabitService(fresh, cache=cache)._get_cycle(cycle.id, test_user.id).status == CycleStatuses.ABANDONED
+
+  def test_scheduler_completion_invalidates(self, db_session, other_session, test_user):
+    cycle = CycleFactory.create(
+      db_session, test_user.id, cycle_type=CycleTypes.DAILY, status=CycleStatuses.ACTIVE, started_at=datetime(2025, 1, 1)
+    )
+    assert HabitService(db_session)._get_cycle(cycle.id, test_user.id).status == CycleStatuses.ACTIVE
+
+    CycleScheduler(engine=db_session.bind).run_once(now=datetime(2025, 3, 1))
+
+    assert HabitService(other_session)._get_cycle(cycle.id, test_user.id).status == CycleStatuses.COMPLETED
+
+  def test_stats_are_exported(self, db_session, test_user):
+    cycle = CycleFactory.create(db_session, test_user.id)
+    service = HabitService(db_session)
+    service._get_cycle(cycle.id, test_user.id)
+    service._get_cycle(cycle.id, test_user.id)
+
+    rendered = REGISTRY.render()
+    assert "# TYPE cache_hits_total counter" in rendered
+    assert 'cache_hits_total{cache="entity"} 1' in rendered
+    assert 'cache_hit_ratio{cache="entity"} 0.5' in rendered
+
+
+class TestRespBackend:
+  """The Redis-protocol backend, against an in-process stand-in server"""
+
+  def test_set_get_invalidate(self, resp_server):
+    backend = RespBackend(RespClient(resp_server.url), ttl=60)
+    backend.set("a", b"\x00value\r\n", ["user:1"])
+    backend.set("b", b"2", ["user:2"])
+
+    assert backend.get("a") == b"\x00value\r\n"
+    assert backend.invalidate(["user:1"]) == 1
+    assert backend.get("a") is None
+    assert backend.get("b") == b"2"
+    assert backend.stats()["hit_ratio"] == pytest.approx(2 / 3)
+
+  def test_unreachable_server_is_a_miss(self, resp_server):
+    url = resp_server.url
+    resp_server.stop()
+    backend = RespBackend(RespClient(url, timeout=0.1), ttl=60)
+
+    backend.set("a", b"1", ["user:1"])
+    assert backend.get("a") is None
+    assert backend.invalidate(["user:1"]) == 0
+    assert backend.stats()["misses"] == 1
+
+  def test_habit_service_through_resp(self, resp_server, db_session, other_session, test_user, count_queries):
+    cache = EntityCache(RespBackend(RespClient(resp_server.url), ttl=60))
+    cycle = CycleFactory.create(db_session, test_user.id)
+    HabitService(db_session, cache=cache)._get_cycle(cycle.id, test_user.id, CYCLE_WITH_HABITS)
+
+    with count_queries() as statements:
+      HabitService(other_session, cache=cache)._get_cycle(cycle.id, test_user.id, CYCLE_WITH_HABITS)
+    assert len(statements) == 0
+
+    HabitService(db_session, cache=cache).add_habit_to_cycle(test_user.id, cycle.id, "Run")
+    cached = HabitService(other_session, cache=cache)._get_cycle(cycle.id, test_user.id, CYCLE_WITH_HABITS)
+    assert [habit.name for habit in cached.habits] == ["Run"]
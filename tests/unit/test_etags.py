@@ -0,0 +1,72 @@
+from app.models import CycleStatuses, CycleTypes
+from app.schemas.habit import HabitUpdate
+from app.services.habit_service import HabitService
+from tests.fixtures.factories import CycleFactory, HabitFactory
+
+
+def _revalidate(client, url, headers, etag):
+  return client.get(url, headers={**headers, "If-None-Match": etag})
+
+
+class TestConditionalGets:
+  """ETags change with the resource, and a matching If-None-Match gets an empty 304"""
+
+  def test_cycle_etag_tracks_cycle_and_habits(self, client, auth_headers, db_session, test_user):
+    cycle = CycleFactory.create(db_session, test_user.id)
+    habit = HabitFactory.create(db_session, habit_cycle_id=cycle.id, name="Run")
+    url = f"/cycles/{cycle.id}"
+    service = HabitService(db_session)
+
+    first = client.get(url, headers=auth_headers)
+    etag = first.headers["ETag"]
+    assert etag.startswith('"') and etag.endswith('"')
+
+    not_modified = _revalidate(client, url, auth_headers, etag)
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["ETag"] == etag
+
+    # Habit edited, habit added, habit removed: each yields a new ETag
+    changes = [
+      lambda: service.update_habit(test_user.id, habit.id, HabitUpdate(name="Run 5k")),
+      lambda: service.add_habit_to_cycle(test_user.id, cycle.id, "Read"),
+      lambda: service.remove_habit_from_cycle(test_user.id, habit.id),
+    ]
+    seen = {etag}
+    for change in changes:
+      change()
+      db_session.expire_all()  # The test client shares this session
+      response = _revalidate(client, url, auth_headers, etag)
+      assert response.status_code == 200
+      etag = response.headers["ETag"]
+      assert etag not in seen
+      seen.add(etag)
+
+  def test_cycle_list_etag(self, client, auth_headers, db_session, test_user):
+    CycleFactory.create(db_session, test_user.id, cycle_type=CycleTypes.DAILY)
+    etag = client.get("/cycles", headers=auth_headers).headers["ETag"]
+
+    assert _revalidate(client, "/cycles", auth_headers, etag).status_code == 304
+    assert _revalidate(client, "/cycles", auth_headers, f'W/{etag}, "other"').status_code == 304
+    assert _revalidate(client, "/cycles", auth_headers, '"other"').status_code == 200
+
+    CycleFactory.create(db_session, test_user.id, cycle_type=CycleTypes.WEEKLY, status=CycleStatuses.ACTIVE)
+    assert _revalidate(client, "/cycles", auth_headers, etag).status_code == 200
+
+  def test_page_etag_and_cursor(self, client, auth_headers, db_session, test_user):
+    for cycle_type in CycleTypes:
+      CycleFactory.create(db_session, test_user.id, cycle_type=cycle_type)
+
+    first = client.get("/cycles", params={"limit": 1}, headers=auth_headers)
+    second = client.get("/cycles", params={"limit": 1, "cursor": first.headers["X-Next-Cursor"]}, headers=auth_headers)
+
+    assert first.headers["ETag"] != second.headers["ETag"]
+    again = client.get(
+      "/cycles",
+      params={"limit": 1, "cursor": first.headers["X-Next-Cursor"]},
+      headers={**auth_headers, "If-None-Match": second.headers["ETag"]}
+    )
+    assert again.status_code == 304
+
+  def test_unknown_cycle_is_still_404(self, client, auth_headers):
+    assert _revalidate(client, "/cycles/999999", auth_headers, '"anything"').status_code == 404
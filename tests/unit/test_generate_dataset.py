@@ -0,0 +1,47 @@
+from datetime import date
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+from app.models import CycleStatuses, CycleTypes
+from app.services.streak_service import StreakService
+from scripts.generate_dataset import DatasetConfig, generate_dataset
+
+CONFIG = DatasetConfig(users=60, years=1, seed=3, end_date=date(2025, 6, 30))
+
+
+def _load(tmp_path, name, users_per_batch):
+  url = f"sqlite:///{tmp_path / name}.db"
+  generate_dataset(url, CONFIG, users_per_batch=users_per_batch, use_copy=True, create_tables=True)
+  return create_engine(url)
+
+
+def _dump(engine, sql):
+  with engine.connect() as connection:
+    return connection.execute(text(sql)).all()
+
+
+def test_same_seed_gives_same_data_regardless_of_batching(tmp_path):
+  first = _load(tmp_path, "a", users_per_batch=7)
+  second = _load(tmp_path, "b", users_per_batch=60)
+
+  for sql in (
+    "SELECT * FROM habit_cycles ORDER BY id",
+    "SELECT * FROM habits ORDER BY id",
+    "SELECT habit_id, entry_date, completed, completed_at FROM habit_entries ORDER BY habit_id, entry_date",
+  ):
+    assert _dump(first, sql) == _dump(second, sql)
+
+
+def test_covers_every_type_and_status_with_consistent_counters(tmp_path):
+  engine = _load(tmp_path, "c", users_per_batch=20)
+
+  types = {row[0] for row in _dump(engine, "SELECT DISTINCT cycle_type FROM habit_cycles")}
+  statuses = {row[0] for row in _dump(engine, "SELECT DISTINCT status FROM habit_cycles")}
+  assert types == {t.name for t in CycleTypes}
+  assert statuses == {s.name for s in CycleStatuses}
+
+  # Nothing logged on or after end_date; at most one ACTIVE cycle per user and type
+  assert _dump(engine, "SELECT COUNT(*) FROM habit_entries WHERE entry_date >= '2025-06-30'") == [(0,)]
+  assert _dump(engine, "SELECT COUNT(*) FROM habit_cycles WHERE status = 'ACTIVE' GROUP BY user_id, cycle_type HAVING COUNT(*) > 1") == []
+
+  with Session(engine) as db:
+    assert StreakService(db).find_inconsistencies() == []
@@ -0,0 +1,166 @@
+import pytest
+from datetime import date
+from app.models import CycleStatuses, CycleTypes, HabitEntry, Providers
+from app.schemas.habit import BatchEntryItem, BatchEntryStatus
+from app.core.config import settings
+from app.core.exceptions import NotFoundError, ValidationError, ConflictError
+from app.services.habit_service import HabitService
+from app.services.streak_service import StreakService
+from tests.fixtures.factories import UserFactory, AuthProviderFactory, CycleFactory, HabitFactory, EntryFactory
+
+
+@pytest.fixture
+def discord_user(db_session):
+  user = UserFactory.create(db_session)
+  AuthProviderFactory.create(db_session, user_id=user.id, provider=Providers.DISCORD, provider_user_id="discord_1")
+  return user
+
+
+@pytest.fixture
+def active_habits(db_session, discord_user):
+  cycle = CycleFactory.create(db_session, discord_user.id, status=CycleStatuses.ACTIVE)
+  return [HabitFactory.create(db_session, habit_cycle_id=cycle.id, name=f"Habit {i}") for i in range(3)]
+
+
+class TestAddEntriesBatch:
+  """Tests for HabitService.add_entries_batch"""
+
+  def test_creates_entries_for_owned_active_habits(self, db_session, active_habits):
+    service = HabitService(db_session)
+    items = [BatchEntryItem(discord_user_id="discord_1", habit_id=habit.id) for habit in active_habits]
+
+    results = service.add_entries_batch(items)
+
+    assert [r.status for r in results] == [BatchEntryStatus.CREATED] * 3
+    assert db_session.query(HabitEntry).filter(HabitEntry.entry_date == date.today()).count() == 3
+    assert all(r.entry_id is not None for r in results)
+    assert StreakService(db_session).find_inconsistencies() == []
+
+  def test_reports_failures_per_item(self, db_session, discord_user, active_habits):
+    draft = CycleFactory.create(db_session, discord_user.id, cycle_type=CycleTypes.WEEKLY, name="Draft")
+    draft_habit = HabitFactory.create(db_session, habit_cycle_id=draft.id, name="Draft habit")
+    EntryFactory.create(db_session, habit_id=active_habits[0].id, entry_date=date.today(), completed=True)
+
+    service = HabitService(db_session)
+    results = service.add_entries_batch([
+      BatchEntryItem(discord_user_id="discord_1", habit_id=active_habits[0].id),  # already logged today
+      BatchEntryItem(discord_user_id="discord_1", habit_id=active_habits[1].id),
+      BatchEntryItem(discord_user_id="discord_1", habit_id=active_habits[1].id),  # duplicate in batch
+      BatchEntryItem(discord_user_id="someone_else", habit_id=active_habits[2].id),
+      BatchEntryItem(discord_user_id="discord_1", habit_id=draft_habit.id),
+    ])
+
+    assert [r.status for r in results] == [
+      BatchEntryStatus.CONFLICT,
+      BatchEntryStatus.CREATED,
+      BatchEntryStatus.CONFLICT,
+      BatchEntryStatus.NOT_FOUND,
+      BatchEntryStatus.INVALID,
+    ]
+    assert db_session.query(HabitEntry).count() == 2
+
+
+class TestGetTodayBoard:
+  """Tests for HabitService.get_today_board"""
+
+  def test_returns_active_habits_with_todays_entry(self, db_session, discord_user, active_habits):
+    EntryFactory.create(db_session, habit_id=active_habits[0].id, entry_date=date.today(), completed=True)
+    EntryFactory.create(db_session, habit_id=active_habits[1].id, entry_date=date(2025, 1, 1), completed=True)
+    draft = CycleFactory.create(db_session, discord_user.id, cycle_type=CycleTypes.WEEKLY)
+    HabitFactory.create(db_session, habit_cycle_id=draft.id, name="Draft habit")  # draft cycle, excluded
+
+    board = HabitService(db_session).get_today_board(discord_user.id, date.today())
+
+    assert len(board) == 1
+    entries = {habit["id"]: habit["entry"] for habit in board[0]["habits"]}
+    assert entries[active_habits[0].id].completed is True
+    assert entries[active_habits[1].id] is None
+    assert entries[active_habits[2].id] is None
+
+
+class TestIterTodayStatus:
+  """Tests for HabitService.iter_today_status"""
+
+  def test_yields_every_requested_user_in_order(self, db_session, discord_user, active_habits, monkeypatch):
+    monkeypatch.setattr(settings, "STATUS_FANOUT_CHUNK_SIZE", 1)
+    other = UserFactory.create(db_session)
+    AuthProviderFactory.create(db_session, user_id=other.id, provider=Providers.DISCORD, provider_user_id="discord_2")
+    EntryFactory.create(db_session, habit_id=active_habits[0].id, entry_date=date.today(), completed=True)
+
+    statuses = list(HabitService(db_session).iter_today_status(["unknown", "discord_2", "discord_1"], date.today()))
+
+    assert [(d, u) for d, u, _ in statuses] == [("unknown", None), ("discord_2", other.id), ("discord_1", discord_user.id)]
+    assert statuses[1][2] == []
+    habits = statuses[2][2][0]["habits"]
+    assert sum(habit["entry"] is not None for habit in habits) == 1
+
+
+class TestCycleTransitions:
+  """Guarded UPDATE ... RETURNING transitions still report why they didn't apply"""
+
+  def test_complete_is_idempotent(self, db_session, discord_user, active_habits):
+    service = HabitService(db_session)
+    cycle_id = active_habits[0].habit_cycle_id
+
+    completed = service.complete_cycle(discord_user.id, cycle_id)
+    assert completed.status == CycleStatuses.COMPLETED
+    assert completed.completed_at is not None
+
+    assert service.complete_cycle(discord_user.id, cycle_id).status == CycleStatuses.COMPLETED
+
+  def test_abandon_rejects_non_active_cycles(self, db_session, discord_user):
+    service = HabitService(db_session)
+    draft = CycleFactory.create(db_session, discord_user.id)
+
+    with pytest.raises(ValidationError, match="draft cycles cannot be abandoned"):
+      service.abandon_cycle(discord_user.id, draft.id)
+
+    with pytest.raises(NotFoundError):
+      service.abandon_cycle(discord_user.id, draft.id + 100)
+
+  def test_add_habit_requires_draft_cycle(self, db_session, discord_user, active_habits):
+    service = HabitService(db_session)
+
+    with pytest.raises(ValidationError):
+      service.add_habit_to_cycle(discord_user.id, active_habits[0].habit_cycle_id, "Late addition")
+
+
+class TestActivateCycle:
+  """Activation is a single guarded UPDATE with precise error mapping"""
+
+  def _draft_with_habits(self, db_session, user_id, num_habits, cycle_type=CycleTypes.DAILY):
+    cycle = CycleFactory.create(db_session, user_id, cycle_type=cycle_type)
+    for i in range(num_habits):
+      HabitFactory.create(db_session, habit_cycle_id=cycle.id, name=f"Habit {i}")
+    return cycle
+
+  def test_activates_draft_in_two_queries(self, db_session, test_user, count_queries):
+    cycle_id = self._draft_with_habits(db_session, test_user.id, 3).id
+
+    with count_queries() as statements:
+      cycle = HabitService(db_session).activate_cycle(test_user.id, cycle_id)
+      assert len(cycle.habits) == 3
+
+    assert cycle.status == CycleStatuses.ACTIVE
+    assert cycle.started_at is not None
+    assert len(statements) == 2  # UPDATE ... RETURNING, then selectin load of habits
+
+  def test_requires_minimum_habits(self, db_session, test_user):
+    cycle = self._draft_with_habits(db_session, test_user.id, 2)
+
+    with pytest.raises(ValidationError, match="at least 3 habits"):
+      HabitService(db_session).activate_cycle(test_user.id, cycle.id)
+
+  def test_requires_draft_status(self, db_session, discord_user, active_habits):
+    with pytest.raises(ValidationError, match="DRAFT"):
+      HabitService(db_session).activate_cycle(discord_user.id, active_habits[0].habit_cycle_id)
+
+  def test_conflicts_with_active_cycle_of_same_type(self, db_session, discord_user, active_habits):
+    cycle = self._draft_with_habits(db_session, discord_user.id, 3)
+
+    with pytest.raises(ConflictError, match="Active daily cycle already exists"):
+      HabitService(db_session).activate_cycle(discord_user.id, cycle.id)
+
+  def test_unknown_cycle(self, db_session, test_user):
+    with pytest.raises(NotFoundError):
+      HabitService(db_session).activate_cycle(test_user.id, 999)
@@ -0,0 +1,79 @@
+from app.core.cache import TTLCache
+from app.models import AuthProvider, Providers
+from app.services.identity_cache import identity_cache, identity_key
+
+
+class FakeClock:
+  def __init__(self):
+    self.now = 0.0
+
+  def __call__(self):
+    return self.now
+
+
+class TestTTLCache:
+  """Tests for the bounded TTL cache"""
+
+  def test_entry_expires_after_ttl(self):
+    clock = FakeClock()
+    cache = TTLCache(maxsize=10, ttl=60, clock=clock)
+    cache.set("key", 1)
+
+    assert cache.get("key") == 1
+
+    clock.now = 61
+    assert cache.get("key") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+  def test_per_entry_ttl_cannot_exceed_default(self):
+    clock = FakeClock()
+    cache = TTLCache(maxsize=10, ttl=60, clock=clock)
+    cache.set("short", 1, ttl=5)
+    cache.set("long", 2, ttl=600)
+
+    clock.now = 30
+    assert cache.get("short") is None
+    assert cache.get("long") == 2
+
+    clock.now = 61
+    assert cache.get("long") is None
+
+  def test_evicts_least_recently_used(self):
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+
+class TestIdentityCache:
+  """Tests for get_discord_user identity caching"""
+
+  def test_repeat_requests_hit_cache(self, client, auth_headers):
+    params = {"discord_user_id": "cached_discord_1"}
+
+    assert client.get("/cycles", params=params, headers=auth_headers).status_code == 200
+    assert client.get("/cycles", params=params, headers=auth_headers).status_code == 200
+
+    assert identity_cache.hits == 1
+    assert identity_cache.misses == 1
+
+  def test_deleting_auth_provider_invalidates(self, client, auth_headers, db_session):
+    params = {"discord_user_id": "cached_discord_2"}
+    client.get("/cycles", params=params, headers=auth_headers)
+    token = auth_headers["Authorization"].split(" ")[1]
+    assert identity_cache.get(identity_key(token, "cached_discord_2")) is not None
+
+    provider = db_session.query(AuthProvider).filter(
+      AuthProvider.provider == Providers.DISCORD,
+      AuthProvider.provider_user_id == "cached_discord_2"
+    ).one()
+    db_session.delete(provider)
+    db_session.commit()
+
+    assert identity_cache.get(identity_key(token, "cached_discord_2")) is None
@@ -0,0 +1,82 @@
+import pytest
+import time
+from sqlalchemy import create_engine, exc, text
+from app.core.metrics import (
+  Registry, InstrumentedQueuePool, instrument_engine,
+  POOL_CHECKED_OUT, POOL_CHECKOUT_TIMEOUTS, POOL_CHECKOUT_WAIT, POOL_WAITERS, POOL_CONNECTIONS_CREATED, REQUEST_LATENCY
+)
+from app.services.habit_service import HabitService
+
+
+def test_histogram_renders_cumulative_buckets():
+  registry = Registry()
+  latency = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+  for value in (0.05, 0.5, 0.5, 3.0):
+    latency.observe(value, route='/a"b')
+
+  lines = registry.render().splitlines()
+
+  assert lines[:2] == ["# HELP latency_seconds Latency", "# TYPE latency_seconds histogram"]
+  assert 'latency_seconds_bucket{route="/a\\"b",le="0.1"} 1' in lines
+  assert 'latency_seconds_bucket{route="/a\\"b",le="1"} 3' in lines
+  assert 'latency_seconds_bucket{route="/a\\"b",le="+Inf"} 4' in lines
+  assert 'latency_seconds_sum{route="/a\\"b"} 4.05' in lines
+  assert 'latency_seconds_count{route="/a\\"b"} 4' in lines
+
+
+def test_instrumented_pool_records_checkouts_and_exhaustion(tmp_path):
+  engine = create_engine(
+    f"sqlite:///{tmp_path / 'pool.db'}",
+    poolclass=InstrumentedQueuePool,
+    pool_logging_name="test_pool",
+    pool_size=1,
+    max_overflow=0,
+    pool_timeout=0.01
+  )
+  instrument_engine(engine, "test_pool")
+  waits_before = POOL_CHECKOUT_WAIT.count(pool="test_pool")
+
+  with engine.connect() as connection:
+    connection.execute(text("SELECT 1"))
+    assert POOL_CHECKED_OUT.value(pool="test_pool") == 1
+
+    with pytest.raises(exc.TimeoutError):
+      engine.connect()
+
+  assert POOL_CHECKED_OUT.value(pool="test_pool") == 0
+  assert POOL_WAITERS.value(pool="test_pool") == 0
+  assert POOL_CHECKOUT_TIMEOUTS.value(pool="test_pool") == 1
+  assert POOL_CHECKOUT_WAIT.count(pool="test_pool") == waits_before + 2
+  assert POOL_CONNECTIONS_CREATED.value(pool="test_pool") == 1
+  engine.dispose()
+
+
+def test_metrics_endpoint_exposes_routes_and_app_exceptions(client, auth_headers, test_cycle):
+  client.get(f"/cycles/{test_cycle.id}", headers=auth_headers)
+  client.get("/cycles/999999", headers=auth_headers)
+
+  response = client.get("/metrics")
+
+  assert response.status_code == 200
+  assert response.headers["content-type"].startswith("text/plain")
+  body = response.text
+  assert 'http_request_duration_seconds_count{method="GET",route="/cycles/{cycle_id}",status="200"}' in body
+  assert 'app_exceptions_total{code="RESOURCE_NOT_FOUND",status="404"}' in body
+  assert 'db_pool_checked_out{pool="primary"}' in body
+
+
+def test_streamed_response_latency_covers_the_body(client, auth_headers, monkeypatch):
+  def slow_status(self, discord_user_ids, entry_date):
+    yield discord_user_ids[0], None, []
+    time.sleep(0.2)
+    yield discord_user_ids[1], None, []
+
+  monkeypatch.setattr(HabitService, "iter_today_status", slow_status)
+  labels = {"method": "POST", "route": "/users/status", "status": "200"}
+  state = REQUEST_LATENCY._values.get(REQUEST_LATENCY._key(labels))
+  total_before = state[1] if state else 0.0
+
+  response = client.post("/users/status", headers=auth_headers, json={"discord_user_ids": ["1", "2"]})
+
+  assert len(response.text.splitlines()) == 2
+  assert REQUEST_LATENCY._values[REQUEST_LATENCY._key(labels)][1] - total_before >= 0.2
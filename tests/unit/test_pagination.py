@@ -0,0 +1,71 @@
+import pytest
+from datetime import date, datetime
+from app.core.config import settings
+from app.core.exceptions import ValidationError
+from app.core.pagination import encode_cursor, decode_cursor
+from app.models import CycleStatuses, CycleTypes, HabitCycle
+from tests.fixtures.factories import CycleFactory, HabitFactory, EntryFactory
+
+
+def test_cursor_round_trip():
+  created_at = datetime(2025, 1, 15, 8, 30, 12, 345678)
+  cursor = encode_cursor(created_at, 42)
+
+  assert decode_cursor(cursor, datetime.fromisoformat, int) == (created_at, 42)
+
+
+def test_malformed_cursor_rejected():
+  with pytest.raises(ValidationError):
+    decode_cursor("not-a-cursor", datetime.fromisoformat, int)
+
+
+class TestKeysetPagination:
+  """Walking every page returns each row exactly once, newest first"""
+
+  def _walk(self, client, url, headers, limit):
+    items, cursor = [], None
+    while True:
+      params = {"limit": limit}
+      if cursor:
+        params["cursor"] = cursor
+      response = client.get(url, params=params, headers=headers)
+      assert response.status_code == 200
+      items.extend(response.json())
+      cursor = response.headers.get("X-Next-Cursor")
+      if cursor is None:
+        return items
+
+  def test_list_cycles_pages(self, client, auth_headers, db_session, test_user):
+    # Same created_at for several cycles exercises the id tiebreaker
+    created_at = datetime(2025, 1, 1)
+    for i, cycle_type in enumerate(CycleTypes):
+      CycleFactory.create(db_session, test_user.id, name=f"Cycle {i}", cycle_type=cycle_type, created_at=created_at)
+
+    cycles = self._walk(client, "/cycles", auth_headers, limit=3)
+
+    assert [c["id"] for c in cycles] == sorted((c["id"] for c in cycles), reverse=True)
+    assert len(cycles) == len(CycleTypes)
+
+  def test_list_cycles_pages_by_default(self, client, auth_headers, db_session, test_user):
+    # Callers that don't send limit still get a bounded page
+    total = settings.DEFAULT_PAGE_SIZE + 1
+    db_session.add_all(HabitCycle(user_id=test_user.id, name=f"Cycle {i}", cycle_type=CycleTypes.DAILY) for i in range(total))
+    db_session.commit()
+
+    response = client.get("/cycles", headers=auth_headers)
+    assert len(response.json()) == settings.DEFAULT_PAGE_SIZE
+    assert "X-Next-Cursor" in response.headers
+
+    response = client.get("/cycles", params={"unpaged": "true"}, headers=auth_headers)
+    assert len(response.json()) == total
+    assert response.headers["Deprecation"] == "true"
+
+  def test_entry_history_pages(self, client, auth_headers, db_session, test_user):
+    cycle = CycleFactory.create(db_session, test_user.id, status=CycleStatuses.ACTIVE)
+    habit = HabitFactory.create(db_session, habit_cycle_id=cycle.id, name="Read")
+    for day in range(1, 8):
+      EntryFactory.create(db_session, habit_id=habit.id, entry_date=date(2025, 1, day), completed=True)
+
+    entries = self._walk(client, f"/habits/{habit.id}/entries", auth_headers, limit=2)
+
+    assert [e["entry_date"] for e in entries] == [f"2025-01-0{day}" for day in range(7, 0, -1)]
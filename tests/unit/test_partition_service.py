@@ -0,0 +1,51 @@
+from datetime import date, datetime
+from app.models import CycleStatuses, CycleTypes
+from app.services.archive_service import ArchiveService
+from app.services.partition_service import Partition, PartitionManager, next_month, partition_name
+from tests.fixtures.factories import CycleFactory, HabitFactory, EntryFactory
+
+
+class TestPartitions:
+  """Monthly partition bookkeeping; the DDL itself only runs on PostgreSQL"""
+
+  def test_month_boundaries(self):
+    assert next_month(date(2026, 1, 1)) == date(2026, 2, 1)
+    assert next_month(date(2026, 12, 1)) == date(2027, 1, 1)
+    assert partition_name(date(2026, 3, 1)) == "habit_entries_y2026m03"
+
+    partition = Partition.for_month(date(2026, 12, 17))
+    assert partition == Partition("habit_entries_y2026m12", date(2026, 12, 1), date(2027, 1, 1))
+
+  def test_noop_when_table_is_not_partitioned(self, db_session):
+    manager = PartitionManager(db_session)
+
+    assert manager.is_partitioned() is False
+    assert manager.list_partitions() == []
+    assert manager.ensure_partitions(months_ahead=3, today=date(2026, 10, 18)) == []
+    assert manager.detach_before(date(2026, 1, 1)) == []
+    assert manager.default_partition_rows() == 0
+
+  def test_detach_skips_months_with_unarchived_entries(self, db_session, test_user, monkeypatch):
+    # A yearly cycle still running since January, and a finished cycle from February
+    running = CycleFactory.create(db_session, test_user.id, cycle_type=CycleTypes.YEARLY, status=CycleStatuses.ACTIVE)
+    finished = CycleFactory.create(
+      db_session, test_user.id, status=CycleStatuses.COMPLETED, completed_at=datetime(2025, 2, 28)
+    )
+    EntryFactory.create(db_session, habit_id=HabitFactory.create(db_session, habit_cycle_id=running.id, name="Run").id, entry_date=date(2025, 1, 10))
+    EntryFactory.create(db_session, habit_id=HabitFactory.create(db_session, habit_cycle_id=finished.id, name="Read").id, entry_date=date(2025, 2, 10))
+
+    manager = PartitionManager(db_session)
+    months = [Partition.for_month(date(2025, month, 1)) for month in (1, 2, 3)]
+    detached = []
+    monkeypatch.setattr(manager, "is_partitioned", lambda: True)
+    monkeypatch.setattr(manager, "list_partitions", lambda: months)
+    monkeypatch.setattr(manager, "_detach", lambda partition, archive_schema: detached.append(partition.name))
+
+    # February's cycle is finished but not archived yet
+    assert manager.detach_before(date(2025, 4, 1)) == ["habit_entries_y2025m03"]
+
+    ArchiveService(db_session).archive_finished(older_than_days=0)
+    assert manager.has_unarchived_entries(months[1]) is False
+    assert manager.has_unarchived_entries(months[0]) is True
+    assert manager.detach_before(date(2025, 3, 1)) == ["habit_entries_y2025m02"]
+    assert detached == ["habit_entries_y2025m03", "habit_entries_y2025m02"]
@@ -0,0 +1,59 @@
+import logging
+import app.core.middleware
+from app.core.query_counter import QueryStats, check_budget, count_queries, statement_shape
+from app.models import HabitCycle, CycleTypes
+from tests.fixtures.factories import CycleFactory, HabitFactory
+
+
+def test_statement_shape_collapses_parameter_lists():
+  assert statement_shape("SELECT * FROM habits\n WHERE id IN (?, ?, ?)") == statement_shape("SELECT * FROM habits WHERE id IN (?)")
+  assert statement_shape("SELECT 1 WHERE id IN (%(id_1)s, %(id_2)s)") == "SELECT 1 WHERE id IN (?)"
+
+
+def test_lazy_loads_are_flagged_as_repeated(db_session, test_user):
+  for cycle_type in CycleTypes:
+    cycle = CycleFactory.create(db_session, test_user.id, cycle_type=cycle_type)
+    HabitFactory.create(db_session, habit_cycle_id=cycle.id, name="Run")
+  db_session.expire_all()
+
+  with count_queries() as outer:
+    with count_queries() as stats:
+      for cycle in db_session.query(HabitCycle).all():
+        cycle.habits  # One lazy load per cycle
+
+  assert len(stats) == 1 + len(CycleTypes)
+  assert len(outer) == len(stats)
+  assert list(stats.repeated(threshold=len(CycleTypes)).values()) == [len(CycleTypes)]
+  assert stats.duration_seconds > 0
+
+
+def test_check_budget_warns(caplog):
+  stats = QueryStats(statements=["SELECT 1"] * 3 + ["SELECT 2"])
+
+  with caplog.at_level(logging.WARNING, logger="app.core.query_counter"):
+    check_budget("GET /cycles", stats, budget=3, repeat_threshold=3)
+
+  messages = [record.getMessage() for record in caplog.records]
+  assert any("ran 4 SQL statements (budget 3" in message for message in messages)
+  assert any("same statement 3 times, likely N+1: SELECT 1" in message for message in messages)
+
+
+def test_responses_carry_query_headers(client, auth_headers, test_cycle):
+  with count_queries() as stats:
+    response = client.get(f"/cycles/{test_cycle.id}", headers=auth_headers)
+
+  assert int(response.headers["X-DB-Query-Count"]) == len(stats)
+  assert float(response.headers["X-DB-Time-Ms"]) >= 0
+
+
+def test_budget_covers_streamed_bodies(client, auth_headers, test_user, monkeypatch):
+  checked = []
+  monkeypatch.setattr(app.core.middleware, "check_budget", lambda label, stats, **_: checked.append((label, len(stats))))
+
+  # POST /users/status runs its status query while the body streams, after the headers
+  with count_queries() as stats:
+    response = client.post("/users/status", headers=auth_headers, json={"discord_user_ids": ["1"]})
+
+  assert response.status_code == 200
+  assert checked == [("POST /users/status", len(stats))]
+  assert int(response.headers["X-DB-Query-Count"]) < len(stats)
@@ -0,0 +1,128 @@
+import pytest
+from datetime import date
+from app.core.cache import NullBackend
+from app.models import CycleStatuses, CycleTypes
+from app.services.entity_cache import entity_cache
+from tests.fixtures.factories import CycleFactory, HabitFactory, EntryFactory
+
+# Statements per request once the identity cache is warm. These must not grow with
+# the number of habits or entries; a lazy load in a response model shows up here.
+EXPECTED_QUERIES = {
+  "list_cycles": 1,
+  "get_cycle": 2,
+  "get_today_entry": 2,
+  "today_board": 1,
+  # Conditional GETs whose If-None-Match still matches: one aggregate, nothing loaded
+  "list_cycles_not_modified": 1,
+  "get_cycle_not_modified": 1,
+  # Writes: one round trip per mutation (plus the habit load and streak update for entries)
+  "create_cycle": 1,
+  "add_habit": 1,
+  "update_habit": 1,
+  "abandon_cycle": 5,  # UPDATE + habits, then the snapshot: entries read + two inserts
+  "add_entry": 4,  # includes the daily rollup upsert
+}
+
+
+@pytest.fixture(params=[3, 10])
+def cycles(request, db_session, test_user):
+  """Two active cycles with `param` habits each, all completed today"""
+  cycles = []
+  for cycle_type in (CycleTypes.DAILY, CycleTypes.WEEKLY):
+    cycle = CycleFactory.create(db_session, test_user.id, cycle_type=cycle_type, status=CycleStatuses.ACTIVE)
+    for i in range(request.param):
+      habit = HabitFactory.create(db_session, habit_cycle_id=cycle.id, name=f"Habit {i}")
+      EntryFactory.create(db_session, habit_id=habit.id, entry_date=date.today(), completed=True)
+    cycles.append(cycle)
+  return cycles
+
+
+@pytest.fixture(autouse=True)
+def no_entity_cache(monkeypatch):
+  """Budgets are for the database path; entity cache hits are covered in test_entity_cache"""
+  monkeypatch.setattr(entity_cache, "backend", NullBackend())
+
+
+@pytest.fixture
+def warm_client(client, auth_headers):
+  """Resolve the bot identity once so request counts exclude authentication"""
+  client.get("/cycles", headers=auth_headers)
+  return client
+
+
+class TestQueryCounts:
+  """Each endpoint fills its response model in a fixed number of queries"""
+
+  def test_list_cycles(self, warm_client, auth_headers, cycles, count_queries):
+    with count_queries() as statements:
+      assert warm_client.get("/cycles", headers=auth_headers).status_code == 200
+    assert len(statements) == EXPECTED_QUERIES["list_cycles"]
+
+  def test_get_cycle(self, warm_client, auth_headers, cycles, count_queries):
+    cycle_id, num_habits = cycles[0].id, len(cycles[0].habits)
+    with count_queries() as statements:
+      response = warm_client.get(f"/cycles/{cycle_id}", headers=auth_headers)
+    assert response.status_code == 200
+    assert len(response.json()["habits"]) == num_habits
+    assert len(statements) == EXPECTED_QUERIES["get_cycle"]
+
+  def test_not_modified(self, warm_client, auth_headers, cycles, count_queries):
+    for name, url in (("list_cycles_not_modified", "/cycles"), ("get_cycle_not_modified", f"/cycles/{cycles[0].id}")):
+      etag = warm_client.get(url, headers=auth_headers).headers["ETag"]
+      with count_queries() as statements:
+        response = warm_client.get(url, headers={**auth_headers, "If-None-Match": etag})
+      assert response.status_code == 304
+      assert len(statements) == EXPECTED_QUERIES[name]
+
+  def test_get_today_entry(self, warm_client, auth_headers, cycles, count_queries):
+    habit_id = cycles[0].habits[0].id
+    with count_queries() as statements:
+      response = warm_client.get(f"/habits/{habit_id}/entries/today", headers=auth_headers)
+    assert response.json()["habit"]["id"] == habit_id
+    assert len(statements) == EXPECTED_QUERIES["get_today_entry"]
+
+  def test_today_board(self, warm_client, auth_headers, cycles, count_queries):
+    with count_queries() as statements:
+      assert warm_client.get("/me/today", headers=auth_headers).status_code == 200
+    assert len(statements) == EXPECTED_QUERIES["today_board"]
+
+
+class TestWriteQueryCounts:
+  """Mutations fill their response from RETURNING rows instead of commit + refresh"""
+
+  def test_create_cycle(self, warm_client, auth_headers, count_queries):
+    with count_queries() as statements:
+      response = warm_client.post("/cycles", json={"name": "New", "cycle_type": "monthly"}, headers=auth_headers)
+    assert response.status_code == 201
+    assert response.json()["habits"] == []
+    assert len(statements) == EXPECTED_QUERIES["create_cycle"]
+
+  def test_add_and_update_habit(self, warm_client, auth_headers, db_session, test_user, count_queries):
+    cycle_id = CycleFactory.create(db_session, test_user.id, cycle_type=CycleTypes.YEARLY).id
+
+    with count_queries() as statements:
+      response = warm_client.post("/habits", json={"habit_cycle_id": cycle_id, "name": "Stretch"}, headers=auth_headers)
+    assert response.status_code == 201
+    assert len(statements) == EXPECTED_QUERIES["add_habit"]
+
+    with count_queries() as statements:
+      response = warm_client.patch(f"/habits/{response.json()['id']}", json={"name": "Yoga"}, headers=auth_headers)
+    assert response.json()["name"] == "Yoga"
+    assert len(statements) == EXPECTED_QUERIES["update_habit"]
+
+  def test_abandon_cycle(self, warm_client, auth_headers, cycles, count_queries):
+    cycle_id = cycles[0].id
+    with count_queries() as statements:
+      response = warm_client.post(f"/cycles/{cycle_id}/abandon", headers=auth_headers)
+    assert response.json()["status"] == "abandoned"
+    assert len(response.json()["habits"]) == len(cycles[0].habits)
+    assert len(statements) == EXPECTED_QUERIES["abandon_cycle"]
+
+  def test_add_entry(self, warm_client, auth_headers, db_session, test_user, count_queries):
+    cycle = CycleFactory.create(db_session, test_user.id, cycle_type=CycleTypes.MONTHLY, status=CycleStatuses.ACTIVE)
+    habit_id = HabitFactory.create(db_session, habit_cycle_id=cycle.id, name="Run").id
+
+    with count_queries() as statements:
+      response = warm_client.post(f"/habits/{habit_id}/complete", headers=auth_headers)
+    assert response.json()["habit"]["id"] == habit_id
+    assert len(statements) == EXPECTED_QUERIES["add_entry"]
@@ -0,0 +1,118 @@
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from starlette.requests import Request
+import app.core.database
+import app.core.middleware
+from app.core.database import ReadRouter, REPLICA_SESSION, read_key
+
+
+class FakeClock:
+  def __init__(self):
+    self.now = 1000.0
+
+  def __call__(self):
+    return self.now
+
+
+def _sessions(url):
+  return sessionmaker(bind=create_engine(url), expire_on_commit=False)
+
+
+def _database_name(db):
+  return db.execute(text("SELECT name FROM which_db")).scalar()
+
+
+def _labelled(tmp_path, name):
+  sessions = _sessions(f"sqlite:///{tmp_path / name}.db")
+  with sessions() as db:
+    db.execute(text("CREATE TABLE which_db (name TEXT)"))
+    db.execute(text("INSERT INTO which_db VALUES (:name)"), {"name": name})
+    db.commit()
+  return sessions
+
+
+class TestReadRouter:
+  """Reads go to the replica unless the client just wrote or the replica is down"""
+
+  def test_reads_use_replica_and_writers_stick_to_primary(self, tmp_path):
+    clock = FakeClock()
+    router = ReadRouter(_labelled(tmp_path, "primary"), _labelled(tmp_path, "replica"), sticky_seconds=5, clock=clock)
+
+    with router.session("bot:1") as db:
+      assert _database_name(db) == "replica"
+      assert db.info[REPLICA_SESSION]
+
+    router.pin_to_primary("bot:1")
+    with router.session("bot:1") as db:
+      assert _database_name(db) == "primary"
+      assert REPLICA_SESSION not in db.info
+    with router.session("bot:2") as db:
+      assert _database_name(db) == "replica"
+
+    clock.now += 6
+    with router.session("bot:1") as db:
+      assert _database_name(db) == "replica"
+
+  def test_falls_back_to_primary_while_replica_is_down(self, tmp_path):
+    clock = FakeClock()
+    broken = _sessions(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    router = ReadRouter(_labelled(tmp_path, "primary"), broken, retry_seconds=30, clock=clock)
+
+    with router.session() as db:
+      assert _database_name(db) == "primary"
+    assert not router.replica_available()
+    assert router.check_replica() is False
+
+    (tmp_path / "missing").mkdir()
+    clock.now += 31
+    assert router.replica_available()
+    assert router.check_replica() is True
+
+  def test_without_replica_everything_uses_primary(self, tmp_path):
+    router = ReadRouter(_labelled(tmp_path, "primary"))
+    router.pin_to_primary("bot:1")
+
+    with router.session("bot:2") as db:
+      assert _database_name(db) == "primary"
+    assert router.check_replica() is None
+
+
+def test_write_requests_pin_client_to_primary(client, auth_headers, test_cycle, tmp_path, monkeypatch):
+  router = ReadRouter(_labelled(tmp_path, "primary"), _labelled(tmp_path, "replica"))
+  monkeypatch.setattr(app.core.middleware, "read_router", router)
+
+  client.get(f"/cycles/{test_cycle.id}", headers=auth_headers)
+  assert len(router._pinned) == 0
+
+  response = client.post(f"/cycles/{test_cycle.id}/abandon", headers=auth_headers)
+  assert response.status_code == 400  # Draft cycles can't be abandoned; still a write attempt
+
+  request = Request({
+    "type": "http",
+    "headers": [(b"authorization", auth_headers["Authorization"].encode())],
+    "query_string": b""
+  })
+  with router.session(read_key(request)) as db:
+    assert _database_name(db) == "primary"
+
+
+def test_batch_writes_pin_each_discord_user(client, auth_headers, tmp_path, monkeypatch):
+  router = ReadRouter(_labelled(tmp_path, "primary"), _labelled(tmp_path, "replica"))
+  monkeypatch.setattr(app.core.middleware, "read_router", router)
+  monkeypatch.setattr(app.core.database, "read_router", router)
+
+  response = client.post("/habits/entries:batch", headers=auth_headers, json={"entries": [
+    {"discord_user_id": "111", "habit_id": 1, "completed": True},
+    {"discord_user_id": "222", "habit_id": 2, "completed": False},
+  ]})
+  assert response.status_code == 200
+
+  # The bot's follow-up reads name the Discord user in the query string
+  for discord_user_id, database in (("111", "primary"), ("222", "primary"), ("333", "replica")):
+    request = Request({
+      "type": "http",
+      "headers": [(b"authorization", auth_headers["Authorization"].encode())],
+      "query_string": f"discord_user_id={discord_user_id}".encode()
+    })
+    with router.session(read_key(request)) as db:
+      assert _database_name(db) == database
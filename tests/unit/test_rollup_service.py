@@ -0,0 +1,84 @@
+from datetime import date, datetime
+from app.models import CycleStatuses, DailyCycleRollup
+from app.schemas.habit import BatchEntryItem
+from app.services.habit_service import HabitService
+from app.services.rollup_service import RollupService
+from tests.fixtures.factories import UserFactory, AuthProviderFactory, CycleFactory, HabitFactory, EntryFactory
+
+
+def _rollups(db_session):
+  db_session.expire_all()
+  return {
+    (r.cycle_id, r.day): (r.habits_total, r.habits_completed)
+    for r in db_session.query(DailyCycleRollup)
+  }
+
+
+class TestRollups:
+  """Incremental rollups agree with a rebuild from habit_entries"""
+
+  def test_entry_writes_update_rollups_incrementally(self, db_session):
+    user = UserFactory.create(db_session)
+    AuthProviderFactory.create(db_session, user_id=user.id, provider_user_id="discord_1")
+    cycle = CycleFactory.create(db_session, user.id, status=CycleStatuses.ACTIVE)
+    habits = [HabitFactory.create(db_session, habit_cycle_id=cycle.id, name=f"Habit {i}") for i in range(4)]
+    service = HabitService(db_session)
+
+    service.add_entry(user.id, habits[0].id, completed=True)
+    service.add_entry(user.id, habits[1].id, completed=False)
+    service.add_entries_batch([
+      BatchEntryItem(discord_user_id="discord_1", habit_id=habits[2].id),
+      BatchEntryItem(discord_user_id="discord_1", habit_id=habits[3].id),
+    ])
+
+    incremental = _rollups(db_session)
+    assert incremental == {(cycle.id, date.today()): (4, 3)}
+
+    RollupService(db_session).rebuild(date.today(), date.today())
+    assert _rollups(db_session) == incremental
+
+  def test_rebuild_only_touches_range(self, db_session, test_user):
+    cycle = CycleFactory.create(db_session, test_user.id, status=CycleStatuses.ACTIVE)
+    habits = [HabitFactory.create(db_session, habit_cycle_id=cycle.id, name=f"Habit {i}") for i in range(2)]
+    for day in (1, 2, 3):
+      EntryFactory.create(db_session, habit_id=habits[0].id, entry_date=date(2025, 1, day), completed=True)
+    EntryFactory.create(db_session, habit_id=habits[1].id, entry_date=date(2025, 1, 2), completed=True)
+
+    written = RollupService(db_session).rebuild(date(2025, 1, 2), date(2025, 1, 3))
+
+    assert written == 2
+    assert _rollups(db_session) == {
+      (cycle.id, date(2025, 1, 2)): (2, 2),
+      (cycle.id, date(2025, 1, 3)): (2, 1),
+    }
+
+  def test_daily_stats_read_from_rollups(self, db_session, test_user):
+    cycle = CycleFactory.create(db_session, test_user.id, status=CycleStatuses.ACTIVE)
+    for i in range(2):
+      HabitFactory.create(db_session, habit_cycle_id=cycle.id, name=f"Habit {i}")
+    RollupService(db_session).record_completions(date(2025, 1, 1), {(test_user.id, cycle.id): 2})
+    db_session.commit()
+
+    stats = HabitService(db_session).get_cycle_daily_stats(test_user.id, cycle.id, date(2025, 1, 1), date(2025, 1, 2))
+
+    assert [d["habits_completed"] for d in stats["days"]] == [2, 0]
+    assert stats["completion_rate"] == 0.5
+
+  def test_daily_stats_of_an_abandoned_cycle_end_at_abandonment(self, db_session, test_user):
+    # Abandoned long ago: a range running to today would pass MAX_STATS_RANGE_DAYS
+    cycle = CycleFactory.create(
+      db_session,
+      test_user.id,
+      status=CycleStatuses.ABANDONED,
+      started_at=datetime(2024, 1, 1),
+      updated_at=datetime(2024, 1, 2, 18, 0)
+    )
+    HabitFactory.create(db_session, habit_cycle_id=cycle.id, name="Read")
+    for day in (1, 2):
+      RollupService(db_session).record_completions(date(2024, 1, day), {(test_user.id, cycle.id): 1})
+    db_session.commit()
+
+    stats = HabitService(db_session).get_cycle_daily_stats(test_user.id, cycle.id)
+
+    assert (stats["start"], stats["end"]) == (date(2024, 1, 1), date(2024, 1, 2))
+    assert stats["completion_rate"] == 1.0
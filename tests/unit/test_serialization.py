@@ -0,0 +1,54 @@
+import json
+from datetime import date, datetime
+from app.core.config import settings
+from app.core.serialization import to_payload
+from app.models import CycleStatuses, CycleTypes, HabitCycle
+from app.schemas.habit import CycleResponse
+from tests.fixtures.factories import CycleFactory, HabitFactory, EntryFactory
+
+
+def _both_paths(client, monkeypatch, url, headers, **params):
+  monkeypatch.setattr(settings, "FAST_JSON_ROUTERS", {"cycles", "habits"})
+  fast = client.get(url, headers=headers, params=params)
+  monkeypatch.setattr(settings, "FAST_JSON_ROUTERS", set())
+  default = client.get(url, headers=headers, params=params)
+  return fast, default
+
+
+class TestFastJSON:
+  """The fast list path sends exactly what response-model validation would"""
+
+  def test_cycle_list_matches_default(self, client, auth_headers, db_session, test_user, monkeypatch):
+    CycleFactory.create(db_session, test_user.id, name="Draft", cycle_type=CycleTypes.DAILY)
+    CycleFactory.create(
+      db_session, test_user.id, name="Wöchentlich", cycle_type=CycleTypes.WEEKLY,
+      status=CycleStatuses.ACTIVE, started_at=datetime(2025, 1, 6, 9, 30, 0, 123456)
+    )
+
+    fast, default = _both_paths(client, monkeypatch, "/cycles", auth_headers, limit=1)
+
+    assert fast.status_code == default.status_code == 200
+    assert fast.content == default.content
+    assert fast.headers["content-type"] == default.headers["content-type"]
+    assert fast.headers["X-Next-Cursor"] == default.headers["X-Next-Cursor"]
+
+  def test_entry_list_matches_default(self, client, auth_headers, db_session, test_user, monkeypatch):
+    cycle = CycleFactory.create(db_session, test_user.id, status=CycleStatuses.ACTIVE)
+    habit = HabitFactory.create(db_session, habit_cycle_id=cycle.id, name="Read")
+    for day in (1, 2, 3):
+      EntryFactory.create(db_session, habit_id=habit.id, entry_date=date(2025, 1, day), completed=day != 2)
+
+    fast, default = _both_paths(client, monkeypatch, f"/habits/{habit.id}/entries", auth_headers)
+
+    assert fast.content == default.content
+    assert json.loads(fast.content)[0]["habit"]["name"] == "Read"
+
+  def test_nested_lists(self, db_session, test_user):
+    cycle = CycleFactory.create(db_session, test_user.id)
+    HabitFactory.create(db_session, habit_cycle_id=cycle.id, name="Run")
+    cycle = db_session.get(HabitCycle, cycle.id)
+
+    payload = to_payload(CycleResponse, cycle)
+
+    assert json.loads(json.dumps(payload, default=str))["habits"][0]["name"] == "Run"
+    assert payload["status"] == "draft"
@@ -0,0 +1,95 @@
+from datetime import date, datetime, timezone
+from app.models import CycleStatuses, CycleTypes, CycleSnapshot, HabitCycle, HabitSnapshot
+from app.services.cycle_scheduler import CycleScheduler
+from app.services.habit_service import HabitService
+from app.services.snapshot_service import SnapshotService
+from tests.fixtures.factories import CycleFactory, HabitFactory, EntryFactory
+
+
+def _active_cycle(db_session, user_id, **kwargs):
+  cycle = CycleFactory.create(
+    db_session, user_id, status=CycleStatuses.ACTIVE, started_at=datetime(2025, 1, 1, 9, 0), **kwargs
+  )
+  run = HabitFactory.create(db_session, habit_cycle_id=cycle.id, name="Run")
+  read = HabitFactory.create(db_session, habit_cycle_id=cycle.id, name="Read")
+  for day in (1, 2, 3, 5):
+    EntryFactory.create(db_session, habit_id=run.id, entry_date=date(2025, 1, day), completed=True)
+  EntryFactory.create(db_session, habit_id=read.id, entry_date=date(2025, 1, 4), completed=False)
+  return cycle, run, read
+
+
+class TestSnapshots:
+  """Finished cycles get frozen stats in the transition's transaction"""
+
+  def test_complete_cycle_writes_snapshot(self, db_session, test_user):
+    cycle, run, read = _active_cycle(db_session, test_user.id)
+    HabitService(db_session).complete_cycle(test_user.id, cycle.id)
+
+    db_session.expire_all()
+    snapshot = db_session.get(CycleSnapshot, cycle.id)
+    assert snapshot.status == CycleStatuses.COMPLETED
+    # The period runs until the cycle was completed, just now
+    completed_on = db_session.get(HabitCycle, cycle.id).completed_at.date()
+    days = (completed_on - date(2025, 1, 1)).days + 1
+    assert (snapshot.period_start, snapshot.period_end, snapshot.days_in_period) == (date(2025, 1, 1), completed_on, days)
+    assert snapshot.entries_completed == 4
+    assert snapshot.completion_rate == 4 / (2 * days)
+    assert snapshot.best_streak == 3
+    assert snapshot.days_active == 5
+    assert (snapshot.first_entry_date, snapshot.last_entry_date) == (date(2025, 1, 1), date(2025, 1, 5))
+
+    habits = {h.habit_id: h for h in snapshot.habits}
+    assert habits[run.id].best_streak == 3 and habits[run.id].entries_completed == 4
+    assert habits[read.id].entries_completed == 0 and habits[read.id].days_active == 1
+
+  def test_finished_cycle_stats_come_from_snapshot(self, db_session, test_user):
+    cycle, run, _ = _active_cycle(db_session, test_user.id)
+    service = HabitService(db_session)
+    service.abandon_cycle(test_user.id, cycle.id)
+
+    # A late write to entries must not change a finished cycle's stats
+    EntryFactory.create(db_session, habit_id=run.id, entry_date=date(2025, 1, 4), completed=True)
+
+    stats = service.get_cycle_stats(test_user.id, cycle.id)
+    assert stats.status == CycleStatuses.ABANDONED
+    assert stats.entries_completed == 4
+    assert stats.best_streak == 3
+
+  def test_active_cycle_stats_are_computed(self, db_session, test_user):
+    cycle, run, _ = _active_cycle(db_session, test_user.id)
+    EntryFactory.create(db_session, habit_id=run.id, entry_date=date(2025, 1, 4), completed=True)
+
+    stats = HabitService(db_session).get_cycle_stats(test_user.id, cycle.id)
+
+    assert stats.best_streak == 5
+    assert db_session.get(CycleSnapshot, cycle.id) is None
+
+  def test_scheduler_and_backfill_write_snapshots(self, db_session, test_user):
+    scheduled, _, _ = _active_cycle(db_session, test_user.id, cycle_type=CycleTypes.DAILY)
+    legacy, _, _ = _active_cycle(db_session, test_user.id, cycle_type=CycleTypes.WEEKLY)
+    legacy.status = CycleStatuses.COMPLETED
+    legacy.completed_at = datetime(2025, 1, 8, 9, 0)
+    db_session.commit()
+
+    CycleScheduler(engine=db_session.bind).run_once(now=datetime(2025, 1, 3, 9, 0, tzinfo=timezone.utc))
+    assert SnapshotService(db_session).backfill(batch_size=1) == 1
+    assert SnapshotService(db_session).backfill() == 0
+
+    db_session.expire_all()
+    assert db_session.get(CycleSnapshot, scheduled.id).period_end == date(2025, 1, 3)
+    assert db_session.get(CycleSnapshot, legacy.id).days_in_period == 8
+    assert db_session.query(HabitSnapshot).count() == 4
+
+  def test_lazy_snapshot_tolerates_a_concurrent_write(self, db_session, test_user):
+    legacy, _, _ = _active_cycle(db_session, test_user.id)
+    legacy.status = CycleStatuses.COMPLETED
+    legacy.completed_at = datetime(2025, 1, 8, 9, 0)
+    db_session.commit()
+
+    # Both racing requests insert; the second one must not fail on the primary key
+    SnapshotService(db_session).snapshot_cycles([legacy], if_missing=True)
+    SnapshotService(db_session).snapshot_cycles([legacy], if_missing=True)
+    db_session.commit()
+
+    assert HabitService(db_session).get_cycle_stats(test_user.id, legacy.id).days_in_period == 8
+    assert db_session.query(HabitSnapshot).count() == 2
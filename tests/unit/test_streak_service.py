@@ -0,0 +1,68 @@
+from datetime import date, timedelta
+from app.models import CycleStatuses, Habit
+from app.services.habit_service import HabitService
+from app.services.streak_service import Streak, StreakService
+from tests.fixtures.factories import CycleFactory, HabitFactory, EntryFactory
+
+
+class TestStreak:
+  """Tests for the incremental streak counter"""
+
+  def test_consecutive_days_extend_streak(self):
+    streak = Streak.from_dates([date(2025, 1, 1), date(2025, 1, 2), date(2025, 1, 3)])
+
+    assert streak.current_streak == 3
+    assert streak.longest_streak == 3
+    assert streak.last_completed_date == date(2025, 1, 3)
+
+  def test_gap_resets_current_but_keeps_longest(self):
+    streak = Streak.from_dates([date(2025, 1, 1), date(2025, 1, 2), date(2025, 1, 5)])
+
+    assert streak.current_streak == 1
+    assert streak.longest_streak == 2
+
+  def test_same_day_does_not_advance(self):
+    streak = Streak.from_dates([date(2025, 1, 1)])
+
+    assert streak.advance(date(2025, 1, 1)) is False
+    assert streak.current_streak == 1
+
+  def test_current_streak_broken_after_missed_day(self):
+    streak = Streak.from_dates([date(2025, 1, 1), date(2025, 1, 2)])
+
+    assert streak.current_as_of(date(2025, 1, 3)) == 2
+    assert streak.current_as_of(date(2025, 1, 4)) == 0
+
+
+class TestStreakMaintenance:
+  """Counters maintained on write agree with a from-scratch recomputation"""
+
+  def test_add_entry_advances_counters(self, db_session, test_user):
+    cycle = CycleFactory.create(db_session, test_user.id, status=CycleStatuses.ACTIVE)
+    habit = HabitFactory.create(db_session, habit_cycle_id=cycle.id, name="Read")
+    EntryFactory.create(db_session, habit_id=habit.id, entry_date=date.today() - timedelta(days=1), completed=True)
+    habit.current_streak, habit.longest_streak, habit.last_completed_date = 1, 1, date.today() - timedelta(days=1)
+    db_session.commit()
+
+    HabitService(db_session).add_entry(user_id=test_user.id, habit_id=habit.id, completed=True)
+
+    streak = HabitService(db_session).get_streak(test_user.id, habit.id, date.today())
+    assert streak["current_streak"] == 2
+    assert streak["longest_streak"] == 2
+    assert StreakService(db_session).find_inconsistencies() == []
+
+  def test_recompute_backfills_existing_entries(self, db_session, test_user):
+    cycle = CycleFactory.create(db_session, test_user.id, status=CycleStatuses.ACTIVE)
+    habit = HabitFactory.create(db_session, habit_cycle_id=cycle.id, name="Read")
+    for day in (1, 2, 3, 5):
+      EntryFactory.create(db_session, habit_id=habit.id, entry_date=date(2025, 1, day), completed=True)
+    EntryFactory.create(db_session, habit_id=habit.id, entry_date=date(2025, 1, 6), completed=False)
+
+    service = StreakService(db_session)
+    assert len(service.find_inconsistencies()) == 1
+
+    assert service.recompute() == 1
+    db_session.expire_all()
+    habit = db_session.get(Habit, habit.id)
+    assert (habit.current_streak, habit.longest_streak, habit.last_completed_date) == (1, 3, date(2025, 1, 5))
+    assert service.find_inconsistencies() == []
@@ -1,6 +1,11 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from app.core.database import Base
 from app.services.user_service import UserService
-from app.models import AuthProvider, Providers
+from app.models import User, AuthProvider, Providers
 from tests.fixtures.factories import UserFactory, AuthProviderFactory
 
 
@@ -76,3 +81,41 @@ class TestUserService:
 
         assert auth_provider.provider == Providers.DISCORD
         assert auth_provider.provider_user_id == discord_id
+
+    def test_concurrent_first_requests_create_one_user(self, tmp_path):
+        """Parallel callers for new Discord IDs never duplicate users or hit a constraint error"""
+        engine = create_engine(
+            f"sqlite:///{tmp_path / 'concurrency.db'}",
+            connect_args={"check_same_thread": False, "timeout": 30}
+        )
+        Base.metadata.create_all(bind=engine)
+        SessionFactory = sessionmaker(bind=engine)
+
+        # Any IntegrityError (and the rollback it forces) is reported here
+        errors = []
+        event.listen(engine, "handle_error", lambda context: errors.append(context.original_exception))
+
+        discord_ids = [f"burst_{i % 4}" for i in range(24)]
+        barrier = threading.Barrier(len(discord_ids))
+
+        def resolve(discord_id):
+            db = SessionFactory()
+            try:
+                barrier.wait()
+                return discord_id, UserService(db).get_or_create_user_by_discord_id(discord_id).id
+            finally:
+                db.close()
+
+        with ThreadPoolExecutor(max_workers=len(discord_ids)) as pool:
+            results = list(pool.map(resolve, discord_ids))
+
+        user_ids = {}
+        for discord_id, user_id in results:
+            assert user_ids.setdefault(discord_id, user_id) == user_id
+
+        db = SessionFactory()
+        assert db.query(User).count() == 4
+        assert db.query(AuthProvider).count() == 4
+        db.close()
+        assert errors == []
+        engine.dispose()